@@ -9,3 +9,14 @@ class CoreConfig(AppConfig):
     def ready(self):
         # By importing the signals module in the ready() method, it ensures that the signals are registered and ready to be used when the app is loaded.
         import core.signals
+
+        # record the queries of the measured requests and of the query detector on every database connection, see core.metrics
+        # and core.query_detector
+        from django.db                  import connections
+        from django.db.backends.signals import connection_created
+        from core.metrics               import install_query_recorder
+        from core.query_detector        import install_query_detector
+        for install in (install_query_recorder, install_query_detector):
+            connection_created.connect(install, weak=False)
+            for connection in connections.all():
+                install(connection)
@@ -0,0 +1,309 @@
+# import JSONDecodeError and the Django request/response classes
+from json                               import JSONDecodeError
+from django.http                        import HttpResponse, JsonResponse
+
+# import dependencies from rest_framework
+from rest_framework.authtoken.models    import Token
+from rest_framework.exceptions          import APIException, AuthenticationFailed, NotFound
+from rest_framework                     import renderers, status
+
+# import the JSON:API renderer so that the async views return the same documents as the sync views
+from . renderers                        import JSONRenderer
+from rest_framework_json_api.utils      import get_resource_type_from_serializer
+
+# import needed serializers, models and views
+from . serializers                      import TaskSerializer, NoteSerializer, UserSerializer
+from django.contrib.auth.models         import User
+from . models                           import Task, Note
+from . views                            import CustomAuthToken, TaskViewSet, NoteViewSet, get_all_tasks, get_all_notes, get_all_users
+
+# import the token authentication, the keyset pagination, the conditional GET support and the response cache
+from . authentication                   import CachedTokenAuthentication
+from . pagination                       import KeysetPagination
+from . mixins                           import (build_etag, get_not_modified_response, add_validators, get_cached_response, astore_response)
+from . response_cache                   import get_cache, get_cache_settings, aget_response_key
+
+# import the rate limits, a request over a limit is handed to the sync view that returns the 429 error
+from . throttling                       import UserRateThrottle, LoginRateThrottle, ADMIN_THROTTLES, acheck_rate_limits, get_busy_response
+
+# import the password check on the hashing pool
+from . backends                         import aauthenticate
+from . hashing                          import HashingPoolBusy
+
+# import other dependencies
+from asgiref.sync                       import sync_to_async
+from django.db.models                   import Max, Count
+from django.utils.cache                 import patch_vary_headers
+from django.utils.translation           import gettext as _
+import json
+
+
+# Native async versions of the hot endpoints, they are routed by todoListNotes.asgi_urls when the project runs under ASGI.
+# They only handle the common case: an authenticated JSON:API request without query parameters (the admin lists also accept
+# the page parameters). Everything else (other methods, filters, sorting, includes, the browsable API, errors) is handed to
+# the sync view, so both deployments always return the same responses.
+
+MEDIA_TYPE = 'application/vnd.api+json'
+
+# the media types that are negotiated to the JSON:API renderer
+JSON_API_MEDIA_TYPES = ('*/*', 'application/*', MEDIA_TYPE)
+
+
+# the JSON:API renderer only needs the resource name of the view
+class ResourceView:
+    def __init__(self, resource_name):
+        self.resource_name = resource_name
+
+
+# renders the data as a JSON:API document, the same way as the sync views
+def render(data, resource_name, status_code=status.HTTP_200_OK):
+    content = JSONRenderer().render(data, MEDIA_TYPE, {'view': ResourceView(resource_name)})
+    response = HttpResponse(content, content_type=MEDIA_TYPE, status=status_code)
+    # the sync views offer the browsable API as well, so the response depends on the Accept header
+    patch_vary_headers(response, ('Accept',))
+    return response
+
+
+# returns True if the sync view would render the response as JSON:API
+def accepts_json_api(request):
+    accept = request.headers.get('Accept', '*/*')
+    return all(media_type.split(';')[0].strip() in JSON_API_MEDIA_TYPES for media_type in accept.split(','))
+
+
+# authenticates the token of the request, returns the user or None if the request has no valid token
+async def authenticate(request):
+    try:
+        result = await CachedTokenAuthentication().aauthenticate(request)
+    except AuthenticationFailed:
+        return None
+    if result is None:
+        return None
+    request.user = result[0]
+    return request.user
+
+
+# authenticates the request and checks the rate limit of the user, returns the user or None if the sync view has to handle it
+async def authenticate_and_throttle(request):
+    user = await authenticate(request)
+    if user is None or not await acheck_rate_limits(request, [UserRateThrottle]):
+        return None
+    return user
+
+
+# hands the request to the sync view, it runs in the thread of the sync_to_async adapter
+async def delegate(sync_view, request, **kwargs):
+    return await sync_to_async(sync_view)(request, **kwargs)
+
+
+# returns the cached list response, or runs the list query and caches its response
+async def list_resources(request, basename, queryset, fast_list_serializer):
+    key = None
+    if get_cache_settings()['ENABLED']:
+        key = await aget_response_key(request, basename, MEDIA_TYPE)
+        cached = await get_cache().aget(key)
+        if cached is not None:
+            return get_cached_response(request, cached)
+
+    # the same validators as ConditionalGetMixin, a 304 is returned without loading the rows
+    validators = await queryset.aaggregate(last_modified=Max('modified'), count=Count('pk'))
+    etag = build_etag(request, validators['last_modified'], validators['count'])
+    response = get_not_modified_response(request, etag)
+    if response is None:
+        rows = [row async for row in fast_list_serializer.values(queryset)]
+        response = render(fast_list_serializer.to_resources(rows), fast_list_serializer.resource_name)
+    add_validators(response, etag)
+
+    if key is not None and response.status_code == status.HTTP_200_OK:
+        await astore_response(key, response)
+    return response
+
+
+# returns a single object with the conditional GET validators, or None if it does not exist
+async def retrieve_resource(request, queryset, serializer_class, pk):
+    last_modified = await queryset.filter(pk=pk).values_list('modified', flat=True).afirst()
+    if last_modified is None:
+        return None
+
+    etag = build_etag(request, last_modified)
+    response = get_not_modified_response(request, etag, last_modified)
+    if response is None:
+        instance = await queryset.filter(pk=pk).afirst()
+        if instance is None:
+            # deleted after the validators were read
+            return None
+        response = render(serializer_class(instance).data, get_resource_type_from_serializer(serializer_class))
+    return add_validators(response, etag, last_modified)
+
+
+# creates an object from the request body, returns None if the body is not valid so that the sync view returns the errors
+async def create_resource(request, serializer_class, message, status_code):
+    try:
+        # parses the data from request body
+        data = json.loads(request.body)
+    except JSONDecodeError:
+        # returns a JsonResponse if there is an issue with JSON decoding
+        return JsonResponse({
+            'result': 'error',
+            'message': 'JSON decoding error'
+        }, status=400)
+
+    serializer = serializer_class(data=data)
+    try:
+        if not serializer.is_valid():
+            return None
+        # override the 'user' validated data with the current authenticated user
+        serializer.validated_data['user'] = request.user
+        # save() runs in the same thread sensitive executor as the async ORM, it raises a ValidationError for a duplicate title
+        await sync_to_async(serializer.save)()
+    except APIException:
+        return None
+
+    # dict to store the message and serialized data
+    result = {
+        'message': message,
+        'details': serializer.data
+    }
+    return render(result, get_resource_type_from_serializer(serializer_class), status_code)
+
+
+# the sync views that handle the requests the async views do not
+sync_task_list = TaskViewSet.as_view({'get': 'list', 'post': 'create'}, basename='task', detail=False)
+sync_task_detail = TaskViewSet.as_view({'get': 'retrieve', 'put': 'update', 'patch': 'partial_update', 'delete': 'destroy'}, basename='task', detail=True)
+sync_note_list = NoteViewSet.as_view({'get': 'list', 'post': 'create'}, basename='note', detail=False)
+sync_note_detail = NoteViewSet.as_view({'get': 'retrieve', 'put': 'update', 'patch': 'partial_update', 'delete': 'destroy'}, basename='note', detail=True)
+sync_login = CustomAuthToken.as_view()
+
+
+# async view for listing and creating the tasks of the authenticated user
+async def task_list(request):
+    if request.GET or not accepts_json_api(request) or await authenticate_and_throttle(request) is None:
+        return await delegate(sync_task_list, request)
+
+    queryset = Task.objects.filter(user=request.user).select_related('user')
+    if request.method == 'GET':
+        return await list_resources(request, 'task', queryset, TaskViewSet.fast_list_serializer)
+    if request.method == 'POST':
+        response = await create_resource(request, TaskSerializer, 'Successfully added a new task', status.HTTP_201_CREATED)
+        if response is not None:
+            return response
+    return await delegate(sync_task_list, request)
+
+
+# async view for retrieving a task of the authenticated user
+async def task_detail(request, pk):
+    if request.method == 'GET' and not request.GET and accepts_json_api(request) and await authenticate_and_throttle(request) is not None:
+        queryset = Task.objects.filter(user=request.user).select_related('user')
+        response = await retrieve_resource(request, queryset, TaskSerializer, pk)
+        if response is not None:
+            return response
+    return await delegate(sync_task_detail, request, pk=pk)
+
+
+# async view for listing and creating the notes of the authenticated user
+async def note_list(request):
+    if request.GET or not accepts_json_api(request) or await authenticate_and_throttle(request) is None:
+        return await delegate(sync_note_list, request)
+
+    queryset = Note.objects.filter(user=request.user).select_related('user')
+    if request.method == 'GET':
+        return await list_resources(request, 'note', queryset, NoteViewSet.fast_list_serializer)
+    if request.method == 'POST':
+        response = await create_resource(request, NoteSerializer, 'Successfully added a new note', status.HTTP_200_OK)
+        if response is not None:
+            return response
+    return await delegate(sync_note_list, request)
+
+
+# async view for retrieving a note of the authenticated user
+async def note_detail(request, pk):
+    if request.method == 'GET' and not request.GET and accepts_json_api(request) and await authenticate_and_throttle(request) is not None:
+        queryset = Note.objects.filter(user=request.user).select_related('user')
+        response = await retrieve_resource(request, queryset, NoteSerializer, pk)
+        if response is not None:
+            return response
+    return await delegate(sync_note_detail, request, pk=pk)
+
+
+# async view for the login, the password is checked on the hashing pool without blocking the event loop
+async def login(request):
+    if request.method != 'POST' or request.content_type != 'application/json':
+        return await delegate(sync_login, request)
+
+    try:
+        # parses the username and password from request body
+        data = json.loads(request.body)
+    except JSONDecodeError:
+        return await delegate(sync_login, request)
+
+    if not await acheck_rate_limits(request, [LoginRateThrottle]):
+        return await delegate(sync_login, request)
+
+    # the sync view returns the errors of a missing or invalid username or password
+    username = data.get('username') if isinstance(data, dict) else None
+    password = data.get('password') if isinstance(data, dict) else None
+    if not isinstance(username, str) or not isinstance(password, str) or not username.strip() or not password:
+        return await delegate(sync_login, request)
+
+    try:
+        # the username is trimmed like the CharField of AuthTokenSerializer
+        user = await aauthenticate(username.strip(), password)
+    except HashingPoolBusy:
+        # the hashing pool is full, the client should retry later
+        return get_busy_response()
+
+    if user is None:
+        # returns the error of AuthTokenSerializer with 400 status code
+        errors = {'non_field_errors': [_('Unable to log in with provided credentials.')]}
+        return HttpResponse(renderers.JSONRenderer().render(errors), content_type='application/json', status=status.HTTP_400_BAD_REQUEST)
+
+    # get the token of the user or create a new one if there is not existing token
+    token, created = await Token.objects.aget_or_create(user=user)
+
+    # dict to store the token, is_superuser and new_token_created
+    result = {
+        'token': token.key,
+        'is_superuser': user.is_superuser,
+        'new_token_created': created
+    }
+    return HttpResponse(renderers.JSONRenderer().render(result), content_type='application/json')
+
+
+# returns a page of the admin list, or None if the sync view has to handle the request
+async def list_all(request, resource_name, queryset, serializer_class, ordering):
+    if request.method != 'GET' or not accepts_json_api(request):
+        return None
+    # only superusers can access the admin lists, the sync view returns the error for everyone else
+    user = await authenticate(request)
+    if user is None or not user.is_superuser or not await acheck_rate_limits(request, ADMIN_THROTTLES):
+        return None
+
+    paginator = KeysetPagination(ordering=ordering)
+    try:
+        rows = await paginator.apaginate_queryset(queryset, request)
+    except NotFound:
+        return None
+    return render(paginator.get_paginated_data(serializer_class(rows, many=True).data), resource_name)
+
+
+# async view for getting all task of all users
+async def all_tasks(request):
+    response = await list_all(request, 'get_all_tasks', Task.objects.select_related('user'), TaskSerializer, ('created', 'id'))
+    return response or await delegate(get_all_tasks, request)
+
+
+# async view for getting all note of all users
+async def all_notes(request):
+    response = await list_all(request, 'get_all_notes', Note.objects.select_related('user'), NoteSerializer, ('created', 'id'))
+    return response or await delegate(get_all_notes, request)
+
+
+# async view for getting all users
+async def all_users(request):
+    response = await list_all(request, 'get_all_users', User.objects.all(), UserSerializer, ('id',))
+    return response or await delegate(get_all_users, request)
+
+
+# the async views authenticate with a token header like the sync DRF views, so they are exempt from the CSRF check.
+# csrf_exempt() does not support async views in Django 4.1, so the flag is set directly.
+for view in (task_list, task_detail, note_list, note_detail, login, all_tasks, all_notes, all_users):
+    view.csrf_exempt = True
@@ -0,0 +1,150 @@
+# import dependencies from rest_framework
+from rest_framework.authentication      import TokenAuthentication, get_authorization_header
+from rest_framework                     import exceptions
+
+# import settings and the cache registry
+from django.conf                        import settings
+from django.core.cache                  import caches
+from django.utils.translation           import gettext_lazy as _
+
+# import the timing of the request metrics
+from . metrics                          import timed
+
+# import the bounded in-process cache from utils
+from utils.cache                        import LRUCache
+
+# import other dependencies
+import copy
+
+
+# read the TOKEN_AUTH_CACHE setting with its defaults
+def get_cache_settings():
+    options = {
+        'MAX_SIZE': 10000,
+        # the TTL of the entries of the shared cache
+        'TTL': 300,
+        'CACHE_ALIAS': None,
+        # the TTL of the entries of the in-process cache
+        'LOCAL_TTL': 5,
+    }
+    options.update(getattr(settings, 'TOKEN_AUTH_CACHE', {}))
+    return options
+
+
+# the in-process cache of validated tokens, it maps a token key to the (user, token) tuple
+local_cache = LRUCache(max_size=get_cache_settings()['MAX_SIZE'], ttl=get_cache_settings()['LOCAL_TTL'])
+
+
+# returns the shared cache backend (e.g. redis or memcached) if one is configured, otherwise None
+def get_shared_cache():
+    alias = get_cache_settings()['CACHE_ALIAS']
+    return caches[alias] if alias else None
+
+
+# the TTL of an entry of the in-process cache. A token deleted or a user changed (e.g. deactivated or demoted) by another process
+# is only invalidated in the cache of that process and in the shared cache, so the other processes keep their copies for
+# LOCAL_TTL seconds only, with or without a shared cache.
+def get_local_ttl():
+    return get_cache_settings()['LOCAL_TTL']
+
+
+def get_shared_cache_key(key):
+    return f'auth-token:{key}'
+
+
+# remove a token from the local and the shared cache. Called by the signals when a token or its user changes.
+def invalidate_token(key):
+    local_cache.delete(key)
+    shared_cache = get_shared_cache()
+    if shared_cache is not None:
+        shared_cache.delete(get_shared_cache_key(key))
+
+
+# Token authentication that keeps the validated tokens in memory, so that an authenticated request does not need
+# the Token + User query on every call. Entries expire after TOKEN_AUTH_CACHE['LOCAL_TTL'] seconds in memory (TTL in the
+# shared cache) and are invalidated when the token is deleted or its user is saved, so a revoked token or a changed user is
+# never served for longer than LOCAL_TTL by another process, and never served at all by the process that made the change.
+# Without a shared cache every process validates a token against the database once per LOCAL_TTL.
+class CachedTokenAuthentication(TokenAuthentication):
+
+    def authenticate(self, request):
+        with timed('auth'):
+            return super().authenticate(request)
+
+    def authenticate_credentials(self, key):
+        # first look in the local cache, then in the shared cache
+        cached = local_cache.get(key)
+        if cached is None:
+            shared_cache = get_shared_cache()
+            if shared_cache is not None:
+                cached = shared_cache.get(get_shared_cache_key(key))
+                if cached is not None:
+                    local_cache.set(key, cached, get_local_ttl())
+
+        # on a miss validate the token against the database and store the result
+        if cached is None:
+            cached = super().authenticate_credentials(key)
+            self.store(key, cached)
+
+        return self.check(cached)
+
+    # async version of authenticate() for the async views, returns (user, token) or None when there is no token header
+    async def aauthenticate(self, request):
+        with timed('auth'):
+            return await self.aauthenticate_key(request)
+
+    async def aauthenticate_key(self, request):
+        key = self.get_key(request)
+        if key is None:
+            return None
+
+        cached = local_cache.get(key)
+        if cached is None:
+            shared_cache = get_shared_cache()
+            if shared_cache is not None:
+                cached = await shared_cache.aget(get_shared_cache_key(key))
+                if cached is not None:
+                    local_cache.set(key, cached, get_local_ttl())
+
+        if cached is None:
+            model = self.get_model()
+            try:
+                token = await model.objects.select_related('user').aget(key=key)
+            except model.DoesNotExist:
+                raise exceptions.AuthenticationFailed(_('Invalid token.'))
+            cached = (token.user, token)
+            local_cache.set(key, cached, get_local_ttl())
+            shared_cache = get_shared_cache()
+            if shared_cache is not None:
+                await shared_cache.aset(get_shared_cache_key(key), cached, get_cache_settings()['TTL'])
+
+        return self.check(cached)
+
+    # returns the token key of the Authorization header, the same parsing as TokenAuthentication.authenticate()
+    def get_key(self, request):
+        auth = get_authorization_header(request).split()
+
+        if not auth or auth[0].lower() != self.keyword.lower().encode():
+            return None
+        if len(auth) != 2:
+            raise exceptions.AuthenticationFailed(_('Invalid token header.'))
+        try:
+            return auth[1].decode()
+        except UnicodeError:
+            raise exceptions.AuthenticationFailed(_('Invalid token header. Token string should not contain invalid characters.'))
+
+    # stores a validated token in the local and the shared cache
+    def store(self, key, cached):
+        local_cache.set(key, cached, get_local_ttl())
+        shared_cache = get_shared_cache()
+        if shared_cache is not None:
+            shared_cache.set(get_shared_cache_key(key), cached, get_cache_settings()['TTL'])
+
+    def check(self, cached):
+        user, token = cached
+
+        if not user.is_active:
+            raise exceptions.AuthenticationFailed(_('User inactive or deleted.'))
+
+        # return a copy of the user so that a request can never modify the cached instance
+        return (copy.copy(user), token)
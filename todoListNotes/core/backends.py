@@ -0,0 +1,42 @@
+# import the model backend and the user model
+from django.contrib.auth.backends       import ModelBackend
+from django.contrib.auth                import get_user_model
+
+# import the password checks of the hashing pool
+from . hashing                          import check_user_password, acheck_user_password
+
+
+UserModel = get_user_model()
+
+
+# The model backend with the password check on the hashing pool (see core.hashing), used by the login endpoints of the API
+# (LoginSerializer and the async login view), which answer 503 when it raises HashingPoolBusy. It is not in
+# AUTHENTICATION_BACKENDS, so the admin site and the other authenticate() callers keep ModelBackend and never see that error.
+class PooledModelBackend(ModelBackend):
+
+    def authenticate(self, request, username=None, password=None, **kwargs):
+        if username is None:
+            username = kwargs.get(UserModel.USERNAME_FIELD)
+        if username is None or password is None:
+            return None
+        try:
+            user = UserModel._default_manager.get_by_natural_key(username)
+        except UserModel.DoesNotExist:
+            # hashes the password anyway, so that a missing user takes as long as a wrong password
+            check_user_password(None, password)
+            return None
+        if check_user_password(user, password) and self.user_can_authenticate(user):
+            return user
+        return None
+
+
+# the same check for the async login view, returns the user or None if the credentials are not valid
+async def aauthenticate(username, password):
+    try:
+        user = await UserModel._default_manager.aget(**{UserModel.USERNAME_FIELD: username})
+    except UserModel.DoesNotExist:
+        await acheck_user_password(None, password)
+        return None
+    if await acheck_user_password(user, password) and PooledModelBackend().user_can_authenticate(user):
+        return user
+    return None
@@ -0,0 +1,189 @@
+# import dependencies from django
+from django.contrib.auth.hashers        import make_password
+from django.db                          import connection, connections
+from django.test                        import Client
+
+# import needed model/s
+from django.contrib.auth.models         import User
+from rest_framework.authtoken.models    import Token
+from . models                           import Task, Note
+
+# import the reconciliation of the per user counters
+from . counters                         import reconcile_counters
+
+# import other dependencies
+from concurrent.futures                 import ThreadPoolExecutor
+from datetime                           import date, timedelta
+import json
+import math
+import threading
+import time
+import uuid
+
+
+# Load test of the API routes. seed() creates benchmark users with their tasks and notes, run_endpoint() sends the requests of
+# an endpoint from concurrent clients (one thread and one database connection per client) through the whole Django stack
+# except the network, and summarize() turns the latency and query count of every request into the report of the endpoint.
+# See the benchmark_api command.
+
+PASSWORD = 'benchmark-password'
+STATUSES = ['Pending', 'In progress', 'Done']
+COLORS = ['blue', 'red', 'green', 'yellow', None]
+
+
+# creates the benchmark users with their tokens, tasks and notes, the first user is a superuser for the admin routes.
+# Returns a dict per user with its token and the ids of its tasks and notes.
+def seed(prefix, users, tasks, notes, rng):
+    # hashing a password is slow on purpose, so every user shares the same hash
+    password = make_password(PASSWORD)
+    User.objects.bulk_create([
+        User(username=f'{prefix}-{index}', password=password, is_superuser=index == 0, is_staff=index == 0)
+        for index in range(users)
+    ])
+    created = list(User.objects.filter(username__startswith=f'{prefix}-').order_by('id'))
+    # bulk_create does not send post_save, so the tokens are created here
+    Token.objects.bulk_create([Token(user=user, key=Token.generate_key()) for user in created])
+
+    today = date.today()
+    Task.objects.bulk_create([
+        Task(
+            user=user, title=f'Task {index}', description=f'Description of task {index}',
+            status=rng.choice(STATUSES), is_active=rng.random() > 0.2, color=rng.choice(COLORS),
+            deadline=today + timedelta(days=rng.randint(-30, 60)),
+        )
+        for user in created for index in range(tasks)
+    ], batch_size=1000)
+    Note.objects.bulk_create([
+        Note(user=user, title=f'Note {index}', description=f'Content of note {index}', color=rng.choice(COLORS))
+        for user in created for index in range(notes)
+    ], batch_size=1000)
+    reconcile_counters([user.pk for user in created])
+
+    tokens = dict(Token.objects.filter(user__in=created).values_list('user_id', 'key'))
+    task_ids = {}
+    for user_id, pk in Task.objects.filter(user__in=created).values_list('user_id', 'pk'):
+        task_ids.setdefault(user_id, []).append(pk)
+    note_ids = {}
+    for user_id, pk in Note.objects.filter(user__in=created).values_list('user_id', 'pk'):
+        note_ids.setdefault(user_id, []).append(pk)
+    return [
+        {'username': user.username, 'token': tokens[user.pk], 'tasks': task_ids.get(user.pk, []), 'notes': note_ids.get(user.pk, [])}
+        for user in created
+    ]
+
+
+# the request of a new task, the title is unique per client and request
+def new_task(user, index):
+    deadline = (date.today() + timedelta(days=7)).strftime('%Y-%m-%d')
+    return {'title': f'Benchmark {uuid.uuid4().hex}', 'description': 'desc', 'deadline': deadline, 'color': 'blue'}
+
+
+# the request of an update of an existing task
+def task_update(user, index):
+    data = new_task(user, index)
+    data['status'] = STATUSES[index % len(STATUSES)]
+    return data
+
+
+# the benchmarked endpoints: (method, path of the index-th request of a user, body or None, only for the superuser).
+# The names are the URL names of the routes, so they match the request metrics of /metrics.
+ENDPOINTS = {
+    'login': ('post', lambda user, index: '/users/login', lambda user, index: {'username': user['username'], 'password': PASSWORD}, False),
+    'task-list': ('get', lambda user, index: '/task/', None, False),
+    'task-detail': ('get', lambda user, index: f'/task/{user["tasks"][index % len(user["tasks"])]}/', None, False),
+    'task-search': ('get', lambda user, index: f'/task/?filter[search]=Task {index % 10}', None, False),
+    'task-filter': ('get', lambda user, index: '/task/?filter[status]=Pending&filter[is_active]=true', None, False),
+    'task-create': ('post', lambda user, index: '/task/', new_task, False),
+    'task-update': ('put', lambda user, index: f'/task/{user["tasks"][index % len(user["tasks"])]}/', task_update, False),
+    'note-list': ('get', lambda user, index: '/note/', None, False),
+    'note-detail': ('get', lambda user, index: f'/note/{user["notes"][index % len(user["notes"])]}/', None, False),
+    'sync': ('get', lambda user, index: '/sync', None, False),
+    'stats': ('get', lambda user, index: '/stats', None, False),
+    'counters': ('get', lambda user, index: '/counters', None, False),
+    'all_task': ('get', lambda user, index: '/all_tasks', None, True),
+    'all_notes': ('get', lambda user, index: '/all_notes', None, True),
+    'all_users': ('get', lambda user, index: '/all_users', None, True),
+    'all_stats': ('get', lambda user, index: '/all_stats?source=live', None, True),
+}
+
+
+# sends `requests` requests of an endpoint as `user` and returns (latency in seconds, number of queries, status code) per request
+def send_requests(name, user, requests, offset):
+    method, get_path, get_data, _ = ENDPOINTS[name]
+    client = Client(HTTP_AUTHORIZATION=f'Token {user["token"]}')
+    queries = [0]
+
+    # counts the queries of the client thread, each thread has its own connection
+    def count_query(execute, sql, params, many, context):
+        queries[0] += 1
+        return execute(sql, params, many, context)
+
+    results = []
+    with connection.execute_wrapper(count_query):
+        for index in range(offset, offset + requests):
+            kwargs = {}
+            if get_data is not None:
+                kwargs = {'data': json.dumps(get_data(user, index)), 'content_type': 'application/json'}
+            queries[0] = 0
+            start = time.perf_counter()
+            response = getattr(client, method)(get_path(user, index), **kwargs)
+            results.append((time.perf_counter() - start, queries[0], response.status_code))
+    return results
+
+
+# sends `requests` requests of an endpoint split between `clients` concurrent clients, every client uses another user.
+# Returns the results of all requests and the wall time of the run.
+def run_endpoint(name, users, clients, requests):
+    if ENDPOINTS[name][3]:
+        # the admin routes are only allowed for the superuser
+        users = users[:1]
+    per_client = [requests // clients + (1 if index < requests % clients else 0) for index in range(clients)]
+
+    def run_client(index):
+        try:
+            return send_requests(name, users[index % len(users)], per_client[index], sum(per_client[:index]))
+        finally:
+            # the connection of the client thread is not closed by a request_finished signal of the main thread
+            if threading.current_thread() is not threading.main_thread():
+                connections.close_all()
+
+    start = time.perf_counter()
+    if clients == 1:
+        results = run_client(0)
+    else:
+        with ThreadPoolExecutor(max_workers=clients) as executor:
+            results = [result for client_results in executor.map(run_client, range(clients)) for result in client_results]
+    return results, time.perf_counter() - start
+
+
+# the value below which `percent` percent of the sorted values are (nearest rank)
+def percentile(values, percent):
+    if not values:
+        return None
+    rank = max(math.ceil(percent / 100 * len(values)) - 1, 0)
+    return values[rank]
+
+
+# the report of an endpoint, the latencies are in milliseconds
+def summarize(results, elapsed):
+    latencies = sorted(latency * 1000 for latency, _, _ in results)
+    queries = [count for _, count, _ in results]
+    errors = sum(1 for _, _, status_code in results if status_code >= 400)
+    return {
+        'requests': len(results),
+        'errors': errors,
+        'throughput': round(len(results) / elapsed, 2) if elapsed else None,
+        'mean_ms': round(sum(latencies) / len(latencies), 3) if latencies else None,
+        'p50_ms': round(percentile(latencies, 50), 3) if latencies else None,
+        'p95_ms': round(percentile(latencies, 95), 3) if latencies else None,
+        'p99_ms': round(percentile(latencies, 99), 3) if latencies else None,
+        'max_ms': round(latencies[-1], 3) if latencies else None,
+        'queries_mean': round(sum(queries) / len(queries), 2) if queries else None,
+        'queries_max': max(queries) if queries else None,
+    }
+
+
+# deletes the benchmark users, their tokens, tasks, notes and counters are deleted with them
+def cleanup(prefix):
+    User.objects.filter(username__startswith=f'{prefix}-').delete()
+
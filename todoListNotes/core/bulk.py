@@ -0,0 +1,202 @@
+# import dependencies from rest_framework
+from rest_framework.exceptions          import APIException
+
+# import dependencies from django
+from django.db                          import transaction, IntegrityError
+from django.utils                       import timezone
+
+# import the invalidation of the cached list responses
+from . response_cache                   import bump_list_version
+
+# import the per user counters, they are updated in the same transaction as the tasks and notes
+from . counters                         import get_counts, get_count_changes, add_counts, adjust_counters, reconcile_counters
+
+# import other dependencies
+import uuid
+
+
+# Handles the bulk create, update and delete of tasks and notes for a single user.
+# Every operation validates all the items first and only writes if all of them are valid, using a single
+# bulk_create / bulk_update / delete query inside one transaction. Invalid items are reported as JSON:API error objects
+# whose pointer is the index of the item in the request, e.g. /data/3/attributes/title.
+class BulkHandler:
+
+    def __init__(self, model, serializer_class, create_fields, update_fields):
+        self.model = model
+        self.serializer_class = serializer_class
+        # the model fields that are written on create and on update
+        self.create_fields = create_fields
+        self.update_fields = update_fields
+        self.name = model._meta.verbose_name.lower()
+
+    # accepts either a plain list of items or a JSON:API document with a 'data' list
+    def get_items(self, data):
+        if isinstance(data, dict):
+            data = data.get('data')
+        if not isinstance(data, list):
+            return None
+        return data
+
+    # returns the id and the attributes of an item, which can be a JSON:API resource object or a plain dict
+    def split_item(self, item):
+        if not isinstance(item, dict):
+            return item, {}
+        if 'attributes' in item:
+            return item.get('id'), dict(item['attributes'] or {})
+        attributes = dict(item)
+        return attributes.pop('id', None), attributes
+
+    # builds a JSON:API error object for an item
+    def error(self, index, detail, field=None, status='400'):
+        pointer = f'/data/{index}/attributes/{field}' if field else f'/data/{index}'
+        return {'status': status, 'detail': str(detail), 'source': {'pointer': pointer}}
+
+    # converts the errors of a serializer to JSON:API error objects
+    def serializer_errors(self, index, errors):
+        result = []
+        for field, messages in errors.items():
+            field = None if field == 'non_field_errors' else field
+            for message in messages if isinstance(messages, list) else [messages]:
+                result.append(self.error(index, message, field))
+        return result
+
+    # runs the serializer validation of an item and returns its validated data and errors
+    def validate(self, index, attributes, instance=None):
+        serializer = self.serializer_class(instance, data=attributes, partial=instance is not None)
+        try:
+            if serializer.is_valid():
+                return serializer.validated_data, []
+            return None, self.serializer_errors(index, serializer.errors)
+        except APIException as exc:
+            # custom exceptions raised by validate(), e.g. DateIsInPastException
+            return None, [self.error(index, exc.detail)]
+
+    # checks the titles of all items with a single query, `titles` maps the index of an item to its title
+    def title_errors(self, user, titles, exclude=()):
+        errors = []
+        message = f'Operation failed, there is an existing {self.name} with the same title.'
+        existing = set(
+            self.model.objects.filter(user=user, title__in=set(titles.values()))
+            .exclude(pk__in=exclude)
+            .values_list('title', flat=True)
+        )
+        seen = set()
+        for index, title in titles.items():
+            if title in existing or title in seen:
+                errors.append(self.error(index, message, 'title'))
+            seen.add(title)
+        return errors
+
+    # returns the ids of the items and the errors for the ids that are missing or not valid UUIDs
+    def parse_ids(self, items):
+        ids = {}
+        errors = []
+        for index, item in enumerate(items):
+            pk, _ = self.split_item(item)
+            try:
+                ids[index] = uuid.UUID(str(pk))
+            except ValueError:
+                errors.append(self.error(index, f'A valid {self.name} id is required'))
+        return ids, errors
+
+    def create(self, user, items):
+        validated = {}
+        errors = []
+        for index, item in enumerate(items):
+            _, attributes = self.split_item(item)
+            data, item_errors = self.validate(index, attributes)
+            if data is not None:
+                validated[index] = data
+            errors += item_errors
+
+        errors += self.title_errors(user, {index: data['title'] for index, data in validated.items()})
+        if errors:
+            return None, errors
+
+        objects = [
+            self.model(user=user, **{field: data.get(field) for field in self.create_fields})
+            for data in validated.values()
+        ]
+        try:
+            with transaction.atomic():
+                self.model.objects.bulk_create(objects)
+                add_counts(objects)
+                # bulk_create does not send post_save, so the cached lists are invalidated here
+                bump_list_version(user.pk)
+        except IntegrityError:
+            # another request created one of the titles after the check
+            return None, [{'status': '409', 'detail': f'Operation failed, there is an existing {self.name} with the same title.'}]
+        return objects, []
+
+    def update(self, user, items):
+        ids, errors = self.parse_ids(items)
+        # the instances are locked until the end of the update, so that the counters before the update are the ones of the
+        # stored rows and a concurrent update or delete of the same rows waits for this one
+        with transaction.atomic():
+            # fetch all the instances of the user with a single query, only the rows of the model are locked
+            instances = self.model.objects.filter(user=user).select_related('user').select_for_update(of=('self',)).in_bulk(ids.values())
+
+            titles = {}
+            updated = []
+            # the counters of the updated instances before the update
+            counts = []
+            for index, pk in ids.items():
+                instance = instances.get(pk)
+                if instance is None:
+                    errors.append(self.error(index, f'{self.name.capitalize()} not found', status='404'))
+                    continue
+                _, attributes = self.split_item(items[index])
+                data, item_errors = self.validate(index, attributes, instance)
+                errors += item_errors
+                if data is None:
+                    continue
+                counts.append(get_counts(instance))
+                for field in self.update_fields:
+                    setattr(instance, field, data.get(field, getattr(instance, field)))
+                titles[index] = instance.title
+                updated.append(instance)
+
+            if len(set(ids.values())) != len(ids):
+                errors.append({'status': '400', 'detail': f'Each {self.name} can only be updated once per request'})
+            errors += self.title_errors(user, titles, exclude=ids.values())
+            if errors:
+                return None, errors
+
+            # bulk_update does not call save(), so the modification date has to be set here
+            now = timezone.now()
+            for instance in updated:
+                instance.modified = now
+            try:
+                with transaction.atomic():
+                    self.model.objects.bulk_update(updated, self.update_fields + ['modified'])
+                    changes = {}
+                    for before, instance in zip(counts, updated):
+                        for field, change in get_count_changes(before, get_counts(instance)).items():
+                            changes[field] = changes.get(field, 0) + change
+                    adjust_counters(user.pk, **changes)
+                    # bulk_update does not send post_save, so the cached lists are invalidated here
+                    bump_list_version(user.pk)
+            except IntegrityError:
+                return None, [{'status': '409', 'detail': f'Operation failed, there is an existing {self.name} with the same title.'}]
+            return updated, []
+
+    def delete(self, user, items):
+        ids, errors = self.parse_ids(items)
+        queryset = self.model.objects.filter(user=user, pk__in=ids.values())
+
+        with transaction.atomic():
+            # the instances are locked and loaded to remove their counters, e.g. whether each task is active or pending, so that a
+            # concurrent delete of the same rows waits for this one and deletes nothing
+            existing = queryset.select_for_update().in_bulk()
+            for index, pk in ids.items():
+                if pk not in existing:
+                    errors.append(self.error(index, f'{self.name.capitalize()} not found', status='404'))
+            if errors:
+                return None, errors
+            count, deleted = queryset.delete()
+            if deleted.get(self.model._meta.label, 0) == len(existing):
+                add_counts(existing.values(), sign=-1)
+            else:
+                # the database does not lock the rows (SQLite) and a concurrent request deleted some of them first
+                reconcile_counters([user.pk])
+        return count, []
@@ -0,0 +1,117 @@
+# import dependencies from django
+from django.db.models                   import Count, F, Q
+
+# import needed model/s
+from . models                           import Task, Note, UserCounters
+
+
+# Per user counters of tasks and notes. Every write of the API calls one of these functions after the write, inside the same
+# transaction, so the counters are committed or rolled back together with the rows. Writes that do not go through the API
+# (e.g. the Django admin or a manual SQL update) are repaired by the reconcile_counters command.
+
+# the status counted by pending_tasks
+PENDING_STATUS = 'Pending'
+
+COUNTER_FIELDS = ('tasks', 'active_tasks', 'pending_tasks', 'notes')
+
+
+# the counters a single task or note adds to its user
+def get_counts(instance):
+    if isinstance(instance, Task):
+        return {'tasks': 1, 'active_tasks': int(instance.is_active), 'pending_tasks': int(instance.status == PENDING_STATUS)}
+    return {'notes': 1}
+
+
+# the difference between the counters of two states of the same task or note
+def get_count_changes(before, after):
+    return {field: after.get(field, 0) - before.get(field, 0) for field in COUNTER_FIELDS}
+
+
+# adds the changes to the counters of the user with a single UPDATE. A user without counters yet (e.g. created before the
+# counters existed) is reconciled instead, which already includes the write since it runs after it.
+def adjust_counters(user_id, **changes):
+    changes = {field: change for field, change in changes.items() if change}
+    if user_id is None or not changes:
+        return
+    updated = UserCounters.objects.filter(user_id=user_id).update(**{field: F(field) + change for field, change in changes.items()})
+    if not updated:
+        reconcile_counters([user_id])
+
+
+# deletes a task or note and removes it from the counters of its user, scaled by the number of rows actually deleted, so that a
+# concurrent delete of the same row is not subtracted twice. The row is locked and read again first, so the counters removed
+# are the ones of the deleted row and not of an older copy. Call it inside a transaction, returns the number of deleted rows.
+def delete_counted(instance):
+    model = type(instance)
+    current = model.objects.select_for_update().filter(pk=instance.pk).first()
+    if current is None:
+        return 0
+    deleted = current.delete()[1].get(model._meta.label, 0)
+    adjust_counters(current.user_id, **{field: -count * deleted for field, count in get_counts(current).items()})
+    return deleted
+
+
+# adds (sign=1) or removes (sign=-1) the counters of many tasks or notes, grouped by user
+def add_counts(instances, sign=1):
+    totals = {}
+    for instance in instances:
+        user_totals = totals.setdefault(instance.user_id, dict.fromkeys(COUNTER_FIELDS, 0))
+        for field, count in get_counts(instance).items():
+            user_totals[field] += sign * count
+    for user_id, changes in totals.items():
+        adjust_counters(user_id, **changes)
+
+
+# the actual counters of the users, computed with one grouped query per table
+def count_rows(user_ids=None):
+    tasks = Task.objects.exclude(user=None)
+    notes = Note.objects.exclude(user=None)
+    if user_ids is not None:
+        tasks = tasks.filter(user_id__in=user_ids)
+        notes = notes.filter(user_id__in=user_ids)
+
+    counters = {user_id: dict.fromkeys(COUNTER_FIELDS, 0) for user_id in user_ids or []}
+    task_rows = tasks.values('user_id').annotate(
+        total=Count('pk'),
+        active=Count('pk', filter=Q(is_active=True)),
+        pending=Count('pk', filter=Q(status=PENDING_STATUS)),
+    ).order_by()
+    for row in task_rows:
+        counters.setdefault(row['user_id'], dict.fromkeys(COUNTER_FIELDS, 0)).update(
+            tasks=row['total'], active_tasks=row['active'], pending_tasks=row['pending'])
+    for row in notes.values('user_id').annotate(total=Count('pk')).order_by():
+        counters.setdefault(row['user_id'], dict.fromkeys(COUNTER_FIELDS, 0))['notes'] = row['total']
+    return counters
+
+
+# recomputes the counters of the given users (all users with tasks or notes if None) and returns the ids of the users whose
+# counters were missing or wrong
+def reconcile_counters(user_ids=None):
+    actual = count_rows(user_ids)
+    stored = UserCounters.objects.all() if user_ids is None else UserCounters.objects.filter(user_id__in=user_ids)
+    stored = {counters.user_id: counters for counters in stored}
+
+    repaired = []
+    for user_id, values in actual.items():
+        counters = stored.pop(user_id, None)
+        if counters is None:
+            UserCounters.objects.create(user_id=user_id, **values)
+        elif any(getattr(counters, field) != value for field, value in values.items()):
+            UserCounters.objects.filter(user_id=user_id).update(**values)
+        else:
+            continue
+        repaired.append(user_id)
+
+    # users that have counters but no task or note left
+    empty = [user_id for user_id, counters in stored.items() if any(getattr(counters, field) for field in COUNTER_FIELDS)]
+    UserCounters.objects.filter(user_id__in=empty).update(**dict.fromkeys(COUNTER_FIELDS, 0))
+    return repaired + empty
+
+
+# returns the counters of a user, they are computed once for a user that has none yet
+def get_counters(user):
+    counters = UserCounters.objects.filter(user=user).first()
+    if counters is None:
+        reconcile_counters([user.pk])
+        counters = UserCounters.objects.get(user=user)
+    return {field: getattr(counters, field) for field in COUNTER_FIELDS}
@@ -0,0 +1,65 @@
+# import the JSON encoder of rest_framework, it handles dates, UUIDs and decimals like the API responses
+from rest_framework.utils.encoders      import JSONEncoder
+
+# import needed serializers and models
+from django.contrib.auth.models         import User
+from . models                           import Task, Note
+from . serializers                      import TaskSerializer, NoteSerializer, UserSerializer
+
+# import other dependencies
+from itertools                          import islice
+import json
+
+
+# the resources that can be exported, with the queryset and the serializer of each one.
+# The querysets are ordered by an indexed column so that the database can stream the rows without sorting the table.
+EXPORTS = {
+    'tasks': (lambda: Task.objects.select_related('user').order_by('created', 'id'), TaskSerializer),
+    'notes': (lambda: Note.objects.select_related('user').order_by('created', 'id'), NoteSerializer),
+    'users': (lambda: User.objects.order_by('id'), UserSerializer),
+}
+
+# the content types of the export formats
+CONTENT_TYPES = {
+    'json': 'application/json',
+    'ndjson': 'application/x-ndjson',
+}
+
+
+# yields the serialized rows of the queryset, one chunk at a time.
+# iterator() uses a server-side cursor where the database supports it, so only one chunk of instances and serialized
+# dicts is in memory at any time, whatever the size of the table.
+def iter_rows(queryset, serializer_class, chunk_size):
+    rows = queryset.iterator(chunk_size=chunk_size)
+    while True:
+        chunk = list(islice(rows, chunk_size))
+        if not chunk:
+            return
+        for row, data in zip(chunk, serializer_class(chunk, many=True).data):
+            yield dict(data, id=str(row.pk))
+
+
+def encode(data):
+    return json.dumps(data, cls=JSONEncoder, ensure_ascii=False, separators=(',', ':'))
+
+
+# streams the rows as a single JSON array
+def stream_json(queryset, serializer_class, chunk_size):
+    separator = '['
+    for data in iter_rows(queryset, serializer_class, chunk_size):
+        yield (separator + encode(data)).encode('utf-8')
+        separator = ',\n'
+    # an empty export is still a valid document
+    yield b'[]' if separator == '[' else b']'
+
+
+# streams the rows as newline delimited JSON, one object per line
+def stream_ndjson(queryset, serializer_class, chunk_size):
+    for data in iter_rows(queryset, serializer_class, chunk_size):
+        yield (encode(data) + '\n').encode('utf-8')
+
+
+STREAMS = {
+    'json': stream_json,
+    'ndjson': stream_ndjson,
+}
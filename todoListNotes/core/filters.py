@@ -0,0 +1,95 @@
+# import dependencies from rest_framework and django-filter
+from rest_framework.filters             import SearchFilter
+from django_filters.rest_framework      import FilterSet
+
+# import the full-text search and trigram expressions of Postgres
+from django.contrib.postgres.search     import SearchQuery, SearchRank, SearchVector, TrigramWordSimilarity
+from django.contrib.postgres.lookups    import TrigramWordSimilar
+
+# import dependencies from django
+from django.db                          import connections
+from django.db.models                   import F, Q, Value
+
+# import needed model/s
+from . models                           import Task, Note
+
+
+# the text search configuration of the search vectors, it has to match the one of the search indexes (migration 0021)
+SEARCH_CONFIG = 'english'
+
+
+# the search vector of the search fields, the first field (the title) ranks higher than the others.
+# The GIN indexes of migration 0021 are built on the same expression, so that Postgres can use them.
+def get_search_vector(search_fields):
+    vector = SearchVector(search_fields[0], weight='A', config=SEARCH_CONFIG)
+    for field in search_fields[1:]:
+        vector += SearchVector(field, weight='B', config=SEARCH_CONFIG)
+    return vector
+
+
+# Full-text search on the `search_fields` of a viewset with the filter[search] query parameter.
+# On Postgres the search matches the words of the search fields (websearch syntax, e.g. "groceries -milk") with the tsvector
+# GIN index, or the title with the trigram GIN index so that prefixes and typos still match, and the results are ranked by
+# relevance unless the request has a 'sort' parameter. Other databases (SQLite in the tests) fall back to the icontains search
+# of rest_framework's SearchFilter.
+class FullTextSearchFilter(SearchFilter):
+
+    def filter_queryset(self, request, queryset, view):
+        search_fields = self.get_search_fields(view, request)
+        term = ' '.join(self.get_search_terms(request))
+        if not search_fields or not term:
+            return queryset
+        if connections[queryset.db].vendor != 'postgresql':
+            return super().filter_queryset(request, queryset, view)
+
+        vector = get_search_vector(search_fields)
+        query = SearchQuery(term, config=SEARCH_CONFIG, search_type='websearch')
+        title = search_fields[0]
+        queryset = queryset.annotate(search=vector).filter(
+            Q(search=query) | Q(TrigramWordSimilar(F(title), Value(term)))
+        )
+
+        # keep the ordering asked by the client, otherwise the best matches come first
+        if request.query_params.get('sort'):
+            return queryset
+        rank = SearchRank(vector, query) + TrigramWordSimilarity(Value(term), title)
+        return queryset.annotate(rank=rank).order_by('-rank', *queryset.model._meta.ordering)
+
+
+# the lookups of the date range filters, e.g. filter[deadline.gte]=2023-04-01&filter[deadline.lt]=2023-05-01
+RANGE_LOOKUPS = ['exact', 'lt', 'lte', 'gt', 'gte']
+
+
+# filter[...] filters of the task list. The lists are always filtered by user, and every filter is served by an index that
+# starts with the user:
+#   status                  task_user_status_idx (user, status)
+#   is_active               task_user_active_deadline_idx (user, is_active, deadline), also with a deadline range
+#   deadline                task_user_deadline_idx (user, deadline)
+#   color                   task_user_color_idx (user, color)
+#   created                 task_user_created_idx (user, created, id)
+#   modified                task_user_modified_idx (user, modified)
+class TaskFilterSet(FilterSet):
+    class Meta:
+        model = Task
+        fields = {
+            'status': ['exact', 'in'],
+            'is_active': ['exact'],
+            'deadline': RANGE_LOOKUPS,
+            'color': ['exact', 'in'],
+            'created': RANGE_LOOKUPS,
+            'modified': RANGE_LOOKUPS,
+        }
+
+
+# filter[...] filters of the note list, served by the indexes:
+#   color                   note_user_color_idx (user, color)
+#   created                 note_user_created_idx (user, created, id)
+#   modified                note_user_modified_idx (user, modified)
+class NoteFilterSet(FilterSet):
+    class Meta:
+        model = Note
+        fields = {
+            'color': ['exact', 'in'],
+            'created': RANGE_LOOKUPS,
+            'modified': RANGE_LOOKUPS,
+        }
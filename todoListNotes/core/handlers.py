@@ -0,0 +1,45 @@
+# import the ASGI handler of django
+from django.core.handlers.asgi          import ASGIHandler
+
+# import other dependencies
+from asgiref.sync                       import sync_to_async
+
+
+# the end of a streaming response, next() cannot raise StopIteration into the coroutine of sync_to_async
+END = object()
+
+
+# The ASGI handler of the ASGI deployment (see todoListNotes/asgi.py).
+# Django 4.1 iterates the content of a StreamingHttpResponse on the event loop, so a stream that reads the database (the
+# exports read the rows with iterator()) raises SynchronousOnlyOperation after the headers are sent and the client gets a cut
+# body. This handler reads every part of a streaming response in the thread of the sync views, the same thread keeps the
+# cursor of the stream from the first part to the last one and closes the response.
+class StreamingASGIHandler(ASGIHandler):
+
+    async def send_response(self, response, send):
+        if not response.streaming:
+            return await super().send_response(response, send)
+
+        # collect the headers and cookies like ASGIHandler.send_response()
+        response_headers = []
+        for header, value in response.items():
+            if isinstance(header, str):
+                header = header.encode('ascii')
+            if isinstance(value, str):
+                value = value.encode('latin1')
+            response_headers.append((bytes(header), bytes(value)))
+        for cookie in response.cookies.values():
+            response_headers.append((b'Set-Cookie', cookie.output(header='').encode('ascii').strip()))
+        await send({'type': 'http.response.start', 'status': response.status_code, 'headers': response_headers})
+
+        # access __iter__ and not streaming_content directly in case it has been overridden in a subclass
+        parts = await sync_to_async(iter, thread_sensitive=True)(response)
+        read = sync_to_async(next, thread_sensitive=True)
+        while True:
+            part = await read(parts, END)
+            if part is END:
+                break
+            for chunk, _ in self.chunk_bytes(part):
+                await send({'type': 'http.response.body', 'body': chunk, 'more_body': True})
+        await send({'type': 'http.response.body'})
+        await sync_to_async(response.close, thread_sensitive=True)()
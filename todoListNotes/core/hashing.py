@@ -0,0 +1,177 @@
+# import settings and the password hashers of django
+from django.conf                        import settings
+from django.contrib.auth                import hashers
+
+# import other dependencies
+from asgiref.sync                       import sync_to_async
+from concurrent.futures                 import ProcessPoolExecutor
+from concurrent.futures.process         import BrokenProcessPool
+import asyncio
+import multiprocessing
+import os
+import threading
+
+
+# Password hashing on a bounded process pool.
+#
+# Hashing or checking a password runs the PASSWORD_HASHERS on purpose slowly (tens of milliseconds of CPU for PBKDF2). The
+# login and the register endpoints send that work to a pool of PASSWORD_HASHING['WORKERS'] processes, so that it runs on all the
+# cores, the event loop of the async views keeps serving the other requests while a password is checked, and a burst of logins
+# cannot take the CPU of every request thread. At most MAX_PENDING passwords are hashed or waiting in the pool, a password over
+# that raises HashingPoolBusy right away and the endpoints answer 503 with Retry-After instead of queueing it.
+# With WORKERS = 0 the passwords are hashed in the calling thread, e.g. for a single core or the development server.
+
+
+# read the PASSWORD_HASHING setting with its defaults
+def get_hashing_settings():
+    options = {
+        # the number of worker processes, 0 hashes in the calling thread
+        'WORKERS': os.cpu_count() or 1,
+        # the number of passwords hashed or waiting in the pool, None for 4 per worker
+        'MAX_PENDING': None,
+    }
+    options.update(getattr(settings, 'PASSWORD_HASHING', {}))
+    return options
+
+
+# raised when MAX_PENDING passwords are already hashed or waiting in the pool
+class HashingPoolBusy(Exception):
+    pass
+
+
+# the initializer of the worker processes, the hashers read PASSWORD_HASHERS from the settings of the project. The workers are
+# started with spawn, they do not inherit the threads and the database connections of the web process.
+def setup_worker(settings_module):
+    if settings_module:
+        os.environ.setdefault('DJANGO_SETTINGS_MODULE', settings_module)
+
+
+# returns (valid, must_update) of a password, must_update is True when the hash uses an older hasher or fewer iterations than
+# the current ones. The check of a missing user (encoded None) hashes the password anyway, so that it takes as long as the check
+# of an existing user.
+def verify_password(password, encoded):
+    if encoded is None:
+        hashers.make_password(password)
+        return False, False
+    updates = []
+    valid = hashers.check_password(password, encoded, setter=updates.append)
+    return valid, bool(updates)
+
+
+class HashingPool:
+
+    def __init__(self, workers, max_pending):
+        self.workers = workers
+        self.max_pending = max_pending
+        self.slots = threading.BoundedSemaphore(max_pending)
+        self.lock = threading.Lock()
+        self.executor = None
+
+    def get_executor(self):
+        with self.lock:
+            if self.executor is None:
+                self.executor = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context('spawn'),
+                    initializer=setup_worker,
+                    initargs=(os.environ.get('DJANGO_SETTINGS_MODULE'),),
+                )
+            return self.executor
+
+    # starts a pool again when a worker died, e.g. killed by the OOM killer
+    def restart(self, broken):
+        with self.lock:
+            if self.executor is broken:
+                self.executor = None
+        broken.shutdown(wait=False)
+
+    # runs function(*args) in a worker and returns its future, raises HashingPoolBusy when the pool is full
+    def submit(self, function, *args):
+        if not self.slots.acquire(blocking=False):
+            raise HashingPoolBusy()
+        try:
+            executor = self.get_executor()
+            try:
+                future = executor.submit(function, *args)
+            except BrokenProcessPool:
+                self.restart(executor)
+                future = self.get_executor().submit(function, *args)
+        except BaseException:
+            self.slots.release()
+            raise
+        future.add_done_callback(lambda future: self.slots.release())
+        return future
+
+    def shutdown(self):
+        with self.lock:
+            executor, self.executor = self.executor, None
+        if executor is not None:
+            executor.shutdown(wait=True)
+
+
+# the pool of the process, created on first use and again when the setting changes
+pools = {}
+pools_lock = threading.Lock()
+
+
+# returns the pool of the PASSWORD_HASHING setting, or None when the passwords are hashed in the calling thread
+def get_pool():
+    options = get_hashing_settings()
+    workers = options['WORKERS']
+    if not workers:
+        return None
+    key = (workers, options['MAX_PENDING'] or 4 * workers)
+    with pools_lock:
+        if key not in pools:
+            for pool in pools.values():
+                pool.shutdown()
+            pools.clear()
+            pools[key] = HashingPool(*key)
+        return pools[key]
+
+
+# runs function(*args) in the pool and waits for its result, the request thread does not use the CPU meanwhile
+def run(function, *args):
+    pool = get_pool()
+    if pool is None:
+        return function(*args)
+    return pool.submit(function, *args).result()
+
+
+# runs function(*args) in the pool without blocking the event loop
+async def arun(function, *args):
+    pool = get_pool()
+    if pool is None:
+        return function(*args)
+    return await asyncio.wrap_future(pool.submit(function, *args))
+
+
+# the hash of a new password, e.g. user.password = make_password(password)
+def make_password(password):
+    return run(hashers.make_password, password)
+
+
+# checks the password of a user (or of a missing user, None) and upgrades its hash to the current hasher like
+# user.check_password(), returns True if the password is valid
+def check_user_password(user, password):
+    valid, must_update = run(verify_password, password, user.password if user is not None else None)
+    if valid and must_update:
+        user.password = make_password(password)
+        user.save(update_fields=['password'])
+    return valid
+
+
+async def acheck_user_password(user, password):
+    valid, must_update = await arun(verify_password, password, user.password if user is not None else None)
+    if valid and must_update:
+        user.password = await arun(hashers.make_password, password)
+        await sync_to_async(user.save)(update_fields=['password'])
+    return valid
+
+
+# stops the worker processes, e.g. at the end of a benchmark or of the tests
+def shutdown_pools():
+    with pools_lock:
+        for pool in pools.values():
+            pool.shutdown()
+        pools.clear()
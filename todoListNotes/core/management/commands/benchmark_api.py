@@ -0,0 +1,104 @@
+# import dependencies for management commands
+from django.conf                        import settings
+from django.core.management.base        import BaseCommand, CommandError
+from django.db                          import connection
+from django.test                        import override_settings
+from django.utils                       import timezone
+
+# import the load test of the API routes
+from core.benchmark                     import ENDPOINTS, seed, run_endpoint, summarize, cleanup
+
+# import other dependencies
+import json
+import random
+import subprocess
+import uuid
+
+
+# Load test of the API routes: seeds --users users with --tasks tasks and --notes notes each, then sends --requests requests to
+# every endpoint from --clients concurrent clients and reports the throughput, the p50/p95/p99 latencies and the number of
+# queries per request. The results are written as JSON with --output, and --compare prints the change from an earlier result
+# file, e.g. the one of the parent commit. The benchmark users are deleted at the end unless --keep is given.
+# Run it against SQLite or a local Postgres, never against production data.
+#
+#   python manage.py benchmark_api --users 20 --tasks 500 --notes 200 --clients 8 --requests 400 --output results.json
+#   python manage.py benchmark_api --endpoints task-list,task-detail --compare results.json
+class Command(BaseCommand):
+    help = 'Load test the API routes and report the throughput, latency percentiles and query counts per endpoint'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=10, help='number of seeded users, the first one is a superuser')
+        parser.add_argument('--tasks', type=int, default=200, help='number of tasks per user')
+        parser.add_argument('--notes', type=int, default=100, help='number of notes per user')
+        parser.add_argument('--clients', type=int, default=4, help='number of concurrent clients')
+        parser.add_argument('--requests', type=int, default=200, help='number of requests per endpoint')
+        parser.add_argument('--endpoints', default=','.join(ENDPOINTS), help='comma separated endpoints to run')
+        parser.add_argument('--seed', type=int, default=0, help='seed of the random data')
+        parser.add_argument('--response-cache', action='store_true', help='enable the list response cache')
+        parser.add_argument('--limits', action='store_true', help='keep the rate limits and concurrency limits enabled')
+        parser.add_argument('--output', help='write the results to this JSON file')
+        parser.add_argument('--compare', help='compare the results with this JSON file of an earlier run')
+        parser.add_argument('--keep', action='store_true', help='do not delete the benchmark users at the end')
+
+    def handle(self, *args, **options):
+        endpoints = [name.strip() for name in options['endpoints'].split(',') if name.strip()]
+        unknown = [name for name in endpoints if name not in ENDPOINTS]
+        if unknown:
+            raise CommandError(f'Unknown endpoint(s): {", ".join(unknown)}, use one of: {", ".join(ENDPOINTS)}')
+        if options['users'] < 1 or options['tasks'] < 1 or options['notes'] < 1 or options['clients'] < 1:
+            raise CommandError('--users, --tasks, --notes and --clients should be at least 1')
+
+        previous = None
+        if options['compare']:
+            with open(options['compare']) as file:
+                previous = json.load(file)
+
+        prefix = f'benchmark-{uuid.uuid4().hex[:8]}'
+        users = seed(prefix, options['users'], options['tasks'], options['notes'], random.Random(options['seed']))
+        try:
+            # the response cache would answer the repeated reads without reaching the database. The benchmark runs in a single
+            # process, so it can be enabled with a local memory cache.
+            benchmark_settings = {'RESPONSE_CACHE': dict(settings.RESPONSE_CACHE, ENABLED=options['response_cache'])}
+            # every client has the same address and the requests are much faster than a real client's
+            if not options['limits']:
+                benchmark_settings.update(RATE_LIMITS={'ENABLED': False}, CONCURRENCY_LIMITS={})
+            with override_settings(**benchmark_settings):
+                results = {}
+                for name in endpoints:
+                    results[name] = summarize(*run_endpoint(name, users, options['clients'], options['requests']))
+                    self.report(name, results[name], previous)
+        finally:
+            if not options['keep']:
+                cleanup(prefix)
+
+        if options['output']:
+            document = {
+                'created': timezone.now().isoformat(),
+                'commit': self.get_commit(),
+                'database': connection.vendor,
+                'options': {key: options[key] for key in ('users', 'tasks', 'notes', 'clients', 'requests', 'seed', 'response_cache', 'limits')},
+                'endpoints': results,
+            }
+            with open(options['output'], 'w') as file:
+                json.dump(document, file, indent=2)
+            self.stdout.write(f'Results written to {options["output"]}')
+
+    # prints the results of an endpoint, with the change from the previous run if there is one
+    def report(self, name, result, previous):
+        line = (
+            f'{name:<12} {result["throughput"]:>9.1f} req/s  p50 {result["p50_ms"]:>8.2f}ms  p95 {result["p95_ms"]:>8.2f}ms  '
+            f'p99 {result["p99_ms"]:>8.2f}ms  {result["queries_mean"]:>5.1f} queries  {result["errors"]} error(s)'
+        )
+        before = (previous or {}).get('endpoints', {}).get(name)
+        if before and before.get('throughput') and before.get('p95_ms'):
+            throughput = (result['throughput'] / before['throughput'] - 1) * 100
+            p95 = (result['p95_ms'] / before['p95_ms'] - 1) * 100
+            line += f'  (throughput {throughput:+.1f}%, p95 {p95:+.1f}%, queries {result["queries_mean"] - before["queries_mean"]:+.1f})'
+        self.stdout.write(line)
+
+    # the commit of the benchmarked code, if the project is a git checkout
+    def get_commit(self):
+        try:
+            return subprocess.run(['git', 'rev-parse', 'HEAD'], capture_output=True, text=True, check=True).stdout.strip()
+        except (OSError, subprocess.CalledProcessError):
+            return None
@@ -0,0 +1,62 @@
+# import dependencies for management commands
+from django.core.management.base        import BaseCommand, CommandError
+from django.db                          import connection, close_old_connections
+from django.test                        import Client, override_settings
+
+# import needed model/s
+from django.contrib.auth.models         import User
+from rest_framework.authtoken.models    import Token
+
+# import other dependencies
+from collections                        import Counter
+import time
+import uuid
+
+
+# Measures the requests per second of the task list endpoint with a new database connection per request (DB_CONN_MAX_AGE=0)
+# and with a persistent connection. The requests go through the whole Django stack, including the request_finished signal
+# that closes the connection, but not through the network. Run it against the real database, e.g. Postgres with TLS.
+#
+#   python manage.py benchmark_connections --requests 500 --conn-max-age 600
+class Command(BaseCommand):
+    help = 'Benchmark the requests per second with and without persistent database connections'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=500, help='number of requests per run')
+        parser.add_argument('--conn-max-age', type=int, default=600, help='CONN_MAX_AGE of the persistent run')
+
+    def handle(self, *args, **options):
+        # a temporary user so that the benchmark never reads real data
+        user = User.objects.create_user(username=f'benchmark-{uuid.uuid4().hex[:8]}')
+        token = Token.objects.get(user=user)
+        try:
+            for conn_max_age in (0, options['conn_max_age']):
+                elapsed = self.run(token.key, conn_max_age, options['requests'])
+                self.stdout.write(f'CONN_MAX_AGE={conn_max_age}: {options["requests"]} requests in {elapsed:.2f}s ({options["requests"] / elapsed:.0f} req/s)')
+        finally:
+            user.delete()
+
+    # the response cache is disabled so that every request reaches the database, and the rate limits and concurrency limits
+    # so that every request is a task list and not a 429
+    @override_settings(RESPONSE_CACHE={'ENABLED': False}, RATE_LIMITS={'ENABLED': False}, CONCURRENCY_LIMITS={})
+    def run(self, key, conn_max_age, requests):
+        client = Client(HTTP_AUTHORIZATION=f'Token {key}')
+        # the connection reads CONN_MAX_AGE when it is opened
+        connection.close()
+        original = connection.settings_dict['CONN_MAX_AGE']
+        connection.settings_dict['CONN_MAX_AGE'] = conn_max_age
+        try:
+            statuses = Counter()
+            start = time.perf_counter()
+            for _ in range(requests):
+                statuses[client.get('/task/').status_code] += 1
+                # closes the connection unless it is persistent and still usable
+                close_old_connections()
+            elapsed = time.perf_counter() - start
+            # the timing of failed requests would not measure the connections
+            if set(statuses) != {200}:
+                raise CommandError(f'CONN_MAX_AGE={conn_max_age}: the requests returned {dict(statuses)}')
+            return elapsed
+        finally:
+            connection.settings_dict['CONN_MAX_AGE'] = original
+            connection.close()
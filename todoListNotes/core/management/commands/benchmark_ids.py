@@ -0,0 +1,68 @@
+# import dependencies for management commands
+from django.core.management.base        import BaseCommand
+from django.db                          import connection, transaction
+
+# import the id generators
+from utils.ids                          import uuid7
+
+# import other dependencies
+import time
+import uuid
+
+
+# Compares the insert throughput and the primary key index size of random (uuid4) and time ordered (uuid7) ids.
+# Every run inserts into a temporary table so that the real tables are never touched.
+#
+#   python manage.py benchmark_ids --rows 200000 --batch-size 1000
+class Command(BaseCommand):
+    help = 'Benchmark the insert throughput and primary key index size of uuid4 and uuid7 ids'
+
+    generators = {
+        'uuid4': uuid.uuid4,
+        'uuid7': uuid7,
+    }
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=100000, help='number of rows to insert per generator')
+        parser.add_argument('--batch-size', type=int, default=1000, help='number of rows per INSERT batch')
+
+    def handle(self, *args, **options):
+        rows = options['rows']
+        batch_size = options['batch_size']
+
+        for name, generator in self.generators.items():
+            elapsed, index_size = self.run(generator, rows, batch_size)
+            index_size = f'{index_size / 1024:.0f} KiB' if index_size is not None else 'n/a'
+            self.stdout.write(f'{name}: {rows} rows in {elapsed:.2f}s ({rows / elapsed:.0f} rows/s), primary key index {index_size}')
+
+    def run(self, generator, rows, batch_size):
+        postgres = connection.vendor == 'postgresql'
+        # use the same column type as Django uses for a UUIDField on this database
+        id_type = 'uuid' if postgres else 'char(32)'
+
+        with transaction.atomic(), connection.cursor() as cursor:
+            cursor.execute(f'CREATE TEMPORARY TABLE id_benchmark (id {id_type} PRIMARY KEY, payload varchar(255))')
+            try:
+                start = time.perf_counter()
+                for offset in range(0, rows, batch_size):
+                    batch = [
+                        (str(generator()) if postgres else generator().hex, 'payload')
+                        for _ in range(min(batch_size, rows - offset))
+                    ]
+                    cursor.executemany('INSERT INTO id_benchmark (id, payload) VALUES (%s, %s)', batch)
+                elapsed = time.perf_counter() - start
+                return elapsed, self.get_index_size(cursor, postgres)
+            finally:
+                cursor.execute('DROP TABLE id_benchmark')
+
+    # size of the primary key index in bytes, None if the database cannot report it
+    def get_index_size(self, cursor, postgres):
+        if postgres:
+            cursor.execute("SELECT pg_relation_size('id_benchmark_pkey')")
+            return cursor.fetchone()[0]
+        try:
+            cursor.execute("SELECT SUM(pgsize) FROM dbstat('temp') WHERE name LIKE 'sqlite_autoindex_id_benchmark%%'")
+            return cursor.fetchone()[0]
+        except Exception:
+            # sqlite was compiled without the dbstat virtual table
+            return None
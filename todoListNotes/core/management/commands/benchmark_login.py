@@ -0,0 +1,58 @@
+# import dependencies for management commands
+from django.core.management.base        import BaseCommand, CommandError
+from django.test                        import override_settings
+
+# import the load test of the API routes and the password hashing pool
+from core.benchmark                     import seed, run_endpoint, summarize, cleanup
+from core.hashing                       import shutdown_pools
+
+# import other dependencies
+import os
+import random
+import uuid
+
+
+# Login throughput with an increasing number of password hashing workers (see core.hashing): for every --workers count, sends
+# --requests logins from --clients concurrent clients and reports the throughput and its speedup over the first count. 0 workers
+# hashes in the request threads. The throughput should grow with the workers up to the number of cores.
+# The rate limits and the concurrency limits are disabled, and the pool accepts a password of every client.
+#
+#   python manage.py benchmark_login --workers 0,1,2,4 --clients 16 --requests 400
+class Command(BaseCommand):
+    help = 'Measure the login throughput with an increasing number of password hashing workers'
+
+    def add_arguments(self, parser):
+        cores = os.cpu_count() or 1
+        workers = sorted({0, cores} | {2 ** power for power in range(cores.bit_length()) if 2 ** power <= cores})
+        parser.add_argument('--workers', default=','.join(str(count) for count in workers), help='comma separated numbers of workers')
+        parser.add_argument('--clients', type=int, default=2 * cores, help='number of concurrent clients')
+        parser.add_argument('--requests', type=int, default=200, help='number of logins per number of workers')
+
+    def handle(self, *args, **options):
+        try:
+            counts = [int(count) for count in options['workers'].split(',') if count.strip()]
+        except ValueError:
+            raise CommandError('--workers should be comma separated numbers')
+        if not counts or min(counts) < 0 or options['clients'] < 1 or options['requests'] < 1:
+            raise CommandError('--workers should be at least 0, --clients and --requests at least 1')
+
+        prefix = f'benchmark-{uuid.uuid4().hex[:8]}'
+        # one user per client, the logins do not read the tasks and notes
+        users = seed(prefix, options['clients'], 1, 1, random.Random(0))
+        try:
+            with override_settings(RATE_LIMITS={'ENABLED': False}, CONCURRENCY_LIMITS={}):
+                baseline = None
+                for count in counts:
+                    hashing = {'WORKERS': count, 'MAX_PENDING': max(options['clients'], 4 * count)}
+                    with override_settings(PASSWORD_HASHING=hashing):
+                        # starts the worker processes before the measure
+                        run_endpoint('login', users, options['clients'], options['clients'])
+                        result = summarize(*run_endpoint('login', users, options['clients'], options['requests']))
+                    baseline = baseline or result['throughput']
+                    self.stdout.write(
+                        f'{count:>3} worker(s) {result["throughput"]:>9.1f} logins/s  x{result["throughput"] / baseline:<5.2f} '
+                        f'p50 {result["p50_ms"]:>8.2f}ms  p95 {result["p95_ms"]:>8.2f}ms  {result["errors"]} error(s)'
+                    )
+        finally:
+            shutdown_pools()
+            cleanup(prefix)
@@ -0,0 +1,30 @@
+# import dependencies for management commands
+from django.core.management.base        import BaseCommand
+from django.conf                        import settings
+
+# import the bulk CSV export
+from core.transfer                      import MODELS, stream_csv
+
+# import other dependencies
+import sys
+
+
+# Writes all the tasks or notes to a CSV file, in the format read by the import_csv command and the /import/<resource> route.
+#
+#   python manage.py export_csv tasks --output tasks.csv
+class Command(BaseCommand):
+    help = 'Export all the tasks or notes to a CSV file'
+
+    def add_arguments(self, parser):
+        parser.add_argument('resource', choices=list(MODELS))
+        parser.add_argument('--output', help='path of the CSV file, the standard output by default')
+        parser.add_argument('--chunk-size', type=int, default=settings.EXPORT_CHUNK_SIZE, help='number of rows read per chunk')
+
+    def handle(self, *args, **options):
+        output = open(options['output'], 'wb') if options['output'] else sys.stdout.buffer
+        try:
+            for chunk in stream_csv(MODELS[options['resource']], options['chunk_size']):
+                output.write(chunk)
+        finally:
+            if options['output']:
+                output.close()
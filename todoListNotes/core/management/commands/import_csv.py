@@ -0,0 +1,30 @@
+# import dependencies for management commands
+from django.core.management.base        import BaseCommand, CommandError
+from django.conf                        import settings
+
+# import the bulk CSV import
+from core.transfer                      import MODELS, CSVImportError, import_csv
+
+# import other dependencies
+import time
+
+
+# Loads the tasks or notes of a CSV file written by the export_csv command, either every row or none of them.
+#
+#   python manage.py import_csv tasks tasks.csv --batch-size 5000
+class Command(BaseCommand):
+    help = 'Import tasks or notes from a CSV file'
+
+    def add_arguments(self, parser):
+        parser.add_argument('resource', choices=list(MODELS))
+        parser.add_argument('path', help='path of the CSV file')
+        parser.add_argument('--batch-size', type=int, default=settings.IMPORT_BATCH_SIZE, help='number of rows inserted per statement')
+
+    def handle(self, *args, **options):
+        start = time.perf_counter()
+        with open(options['path'], newline='', encoding='utf-8') as lines:
+            try:
+                count = import_csv(MODELS[options['resource']], lines, options['batch_size'])
+            except CSVImportError as exc:
+                raise CommandError(str(exc))
+        self.stdout.write(f'Imported {count} {options["resource"]} in {time.perf_counter() - start:.2f}s')
@@ -0,0 +1,25 @@
+# import dependencies for management commands
+from django.core.management.base        import BaseCommand
+from django.conf                        import settings
+from django.utils                       import timezone
+
+# import needed model/s
+from core.models                        import Tombstone
+
+# import other dependencies
+from datetime                           import timedelta
+
+
+# Deletes the tombstones older than the sync retention. Clients with an older watermark get a full sync instead.
+#
+#   python manage.py prune_tombstones --days 30
+class Command(BaseCommand):
+    help = 'Delete the tombstones of deleted tasks and notes that are older than the sync retention'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, default=settings.SYNC_TOMBSTONE_RETENTION_DAYS, help='number of days to keep')
+
+    def handle(self, *args, **options):
+        cutoff = timezone.now() - timedelta(days=options['days'])
+        count, _ = Tombstone.objects.filter(deleted__lt=cutoff).delete()
+        self.stdout.write(f'Deleted {count} tombstone(s) older than {cutoff.isoformat()}')
@@ -0,0 +1,28 @@
+# import dependencies for management commands
+from django.core.management.base        import BaseCommand
+from django.db                          import transaction
+
+# import the reconciliation of the per user counters
+from core.counters                      import reconcile_counters
+
+# import other dependencies
+import time
+
+
+# Recomputes the per user counters of tasks and notes from the tables and repairs the ones that drifted, e.g. after rows were
+# changed in the Django admin or with SQL. The API keeps the counters up to date by itself, so run it after such changes or
+# periodically as a safety net.
+#
+#   python manage.py reconcile_counters
+#   python manage.py reconcile_counters --user 1 --user 2
+class Command(BaseCommand):
+    help = 'Recompute the per user counters of tasks and notes'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--user', dest='users', type=int, action='append', help='Only reconcile the counters of this user id')
+
+    def handle(self, *args, **options):
+        start = time.perf_counter()
+        with transaction.atomic():
+            repaired = reconcile_counters(options['users'])
+        self.stdout.write(f'Repaired the counters of {len(repaired)} user(s) in {time.perf_counter() - start:.2f}s')
@@ -0,0 +1,20 @@
+# import dependencies for management commands
+from django.core.management.base        import BaseCommand
+
+# import the summary of the admin statistics
+from core.stats                         import refresh_summary
+
+# import other dependencies
+import time
+
+
+# Rebuilds the summary tables read by the admin statistics when STATS_USE_SUMMARY is enabled. Run it periodically, e.g. from cron.
+#
+#   python manage.py refresh_stats
+class Command(BaseCommand):
+    help = 'Rebuild the summary tables of the admin statistics'
+
+    def handle(self, *args, **options):
+        start = time.perf_counter()
+        task_rows, note_rows = refresh_summary()
+        self.stdout.write(f'Refreshed {task_rows} task and {note_rows} note summary row(s) in {time.perf_counter() - start:.2f}s')
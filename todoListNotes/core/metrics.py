@@ -0,0 +1,188 @@
+# import dependencies from django
+from django.conf                        import settings
+
+# import other dependencies
+from contextlib                         import contextmanager
+import bisect
+import contextvars
+import logging
+import threading
+import time
+
+
+# Per endpoint performance metrics of the API. MetricsMiddleware (core.middleware) measures a sample of the requests and adds
+# them to the registry of the process, keyed by the URL name of the view:
+#   - the latency of the request, as a histogram
+#   - the number and total time of the SQL queries, recorded by an execute wrapper installed on every database connection
+#   - the time spent in the token authentication, the serializers and the renderer, recorded with timed()
+#   - the size of the response body
+# The registry is exposed in the Prometheus text format by the /metrics endpoint, and every measured request can also be
+# logged on the core.metrics logger. A request that is not sampled only costs a random() call.
+
+logger = logging.getLogger('core.metrics')
+
+# the upper bounds of the latency histogram buckets, in seconds
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
+# the phases measured with timed(), in the order of the exported metrics
+PHASES = ('auth', 'serializer', 'render')
+
+
+# read the METRICS setting with its defaults
+def get_metrics_settings():
+    options = {
+        'ENABLED': True,
+        # the fraction of the requests that are measured, from 0 to 1, off unless a deployment opts in
+        'SAMPLE_RATE': 0.0,
+        # log a line per measured request on the core.metrics logger
+        'LOG': False,
+        'BUCKETS': DEFAULT_BUCKETS,
+    }
+    options.update(getattr(settings, 'METRICS', {}))
+    return options
+
+
+# the measurements of the request being handled, None when it is not sampled. The context is copied by sync_to_async, so the
+# queries of the async views that run in the executor thread are added to the same request.
+current_request = contextvars.ContextVar('current_request', default=None)
+
+
+class RequestMetrics:
+    __slots__ = ('sql_queries', 'sql_time', 'phases')
+
+    def __init__(self):
+        self.sql_queries = 0
+        self.sql_time = 0.0
+        self.phases = dict.fromkeys(PHASES, 0.0)
+
+
+# adds the time spent in the block to a phase of the current request
+@contextmanager
+def timed(phase):
+    metrics = current_request.get()
+    if metrics is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        metrics.phases[phase] += time.perf_counter() - start
+
+
+# execute wrapper that counts the queries of the current request and their time
+def record_query(execute, sql, params, many, context):
+    metrics = current_request.get()
+    if metrics is None:
+        return execute(sql, params, many, context)
+    start = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        metrics.sql_queries += 1
+        metrics.sql_time += time.perf_counter() - start
+
+
+# installs record_query on a database connection, it is connected to the connection_created signal in CoreConfig.ready().
+# The wrappers of a connection object are kept when it reconnects, so it is only added once.
+def install_query_recorder(connection, **kwargs):
+    if record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(record_query)
+
+
+# the totals of the measured requests of an endpoint
+class EndpointStats:
+
+    def __init__(self, buckets):
+        # requests per latency bucket, the last one is +Inf
+        self.buckets = [0] * (len(buckets) + 1)
+        self.requests = 0
+        self.latency = 0.0
+        self.sql_queries = 0
+        self.sql_time = 0.0
+        self.phases = dict.fromkeys(PHASES, 0.0)
+        self.response_bytes = 0
+
+
+class MetricsRegistry:
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.endpoints = {}
+
+    def record(self, endpoint, latency, metrics, response_bytes):
+        buckets = get_metrics_settings()['BUCKETS']
+        with self.lock:
+            stats = self.endpoints.get(endpoint)
+            if stats is None:
+                stats = self.endpoints[endpoint] = EndpointStats(buckets)
+            stats.buckets[bisect.bisect_left(buckets, latency)] += 1
+            stats.requests += 1
+            stats.latency += latency
+            stats.sql_queries += metrics.sql_queries
+            stats.sql_time += metrics.sql_time
+            for phase, seconds in metrics.phases.items():
+                stats.phases[phase] += seconds
+            stats.response_bytes += response_bytes
+
+    def reset(self):
+        with self.lock:
+            self.endpoints = {}
+
+    # the metrics of all the endpoints in the Prometheus text exposition format
+    def render_prometheus(self):
+        buckets = get_metrics_settings()['BUCKETS']
+        with self.lock:
+            endpoints = sorted(self.endpoints.items())
+
+        lines = [
+            '# HELP api_request_duration_seconds Latency of the sampled requests',
+            '# TYPE api_request_duration_seconds histogram',
+        ]
+        for endpoint, stats in endpoints:
+            cumulative = 0
+            for bound, count in zip(list(buckets) + ['+Inf'], stats.buckets):
+                cumulative += count
+                lines.append(f'api_request_duration_seconds_bucket{{endpoint="{endpoint}",le="{bound}"}} {cumulative}')
+            lines.append(f'api_request_duration_seconds_sum{{endpoint="{endpoint}"}} {stats.latency:.6f}')
+            lines.append(f'api_request_duration_seconds_count{{endpoint="{endpoint}"}} {stats.requests}')
+
+        counters = [
+            ('api_sql_queries_total', 'SQL queries of the sampled requests', lambda stats: stats.sql_queries),
+            ('api_sql_duration_seconds_total', 'Time spent in SQL queries', lambda stats: f'{stats.sql_time:.6f}'),
+        ] + [
+            (f'api_{phase}_duration_seconds_total', f'Time spent in the {phase} phase', lambda stats, phase=phase: f'{stats.phases[phase]:.6f}')
+            for phase in PHASES
+        ] + [
+            ('api_response_bytes_total', 'Size of the response bodies, streaming responses are not counted', lambda stats: stats.response_bytes),
+        ]
+        for name, help_text, value in counters:
+            lines += [f'# HELP {name} {help_text}', f'# TYPE {name} counter']
+            lines += [f'{name}{{endpoint="{endpoint}"}} {value(stats)}' for endpoint, stats in endpoints]
+        return '\n'.join(lines) + '\n'
+
+
+# the registry of the process, every worker process has its own
+registry = MetricsRegistry()
+
+
+# the label of a request: the URL name of its view, or its route for the unnamed routes
+def get_endpoint(request):
+    match = getattr(request, 'resolver_match', None)
+    if match is None:
+        return '<unresolved>'
+    return match.url_name or match.route
+
+
+# adds a measured request to the registry and logs it if LOG is enabled
+def record_request(request, response, metrics, latency, log):
+    endpoint = get_endpoint(request)
+    response_bytes = 0 if response.streaming else len(response.content)
+    registry.record(endpoint, latency, metrics, response_bytes)
+    if log:
+        logger.info(
+            '%s %s %s %d %.1fms sql=%d/%.1fms auth=%.1fms serializer=%.1fms render=%.1fms bytes=%d',
+            endpoint, request.method, request.path, response.status_code, latency * 1000,
+            metrics.sql_queries, metrics.sql_time * 1000, metrics.phases['auth'] * 1000,
+            metrics.phases['serializer'] * 1000, metrics.phases['render'] * 1000, response_bytes,
+        )
@@ -0,0 +1,141 @@
+# import the request metrics and the query detector
+from . metrics                          import RequestMetrics, current_request, get_metrics_settings, get_endpoint, record_request
+from . query_detector                   import QueryDetector, current_detector, get_detector_settings, log_problems
+from . throttling                       import limiter, get_busy_response
+
+# import the base class of the hook based middlewares
+from django.utils.deprecation           import MiddlewareMixin
+
+# import other dependencies
+import asyncio
+import random
+import time
+
+
+# Base class of the middlewares that measure a sample of the requests. It supports both sync and async requests, so that it
+# does not force the async views of the ASGI deployment to run in a thread. The subclasses return the state of a sampled
+# request from start(), it is set in `context_var` while the request is handled and passed to finish() with the response.
+class SampledMiddleware:
+    sync_capable = True
+    async_capable = True
+    context_var = None
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.is_async = asyncio.iscoroutinefunction(get_response)
+        if self.is_async:
+            # mark the instance as a coroutine function, the same way as Django's MiddlewareMixin
+            self._is_coroutine = asyncio.coroutines._is_coroutine
+
+    # returns the state of the request if it is sampled, otherwise None
+    def start(self, request):
+        raise NotImplementedError
+
+    def finish(self, request, response, state, elapsed):
+        raise NotImplementedError
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+        state = self.start(request)
+        if state is None:
+            return self.get_response(request)
+
+        token = self.context_var.set(state)
+        start = time.perf_counter()
+        try:
+            response = self.get_response(request)
+        finally:
+            self.context_var.reset(token)
+        self.finish(request, response, state, time.perf_counter() - start)
+        return response
+
+    async def __acall__(self, request):
+        state = self.start(request)
+        if state is None:
+            return await self.get_response(request)
+
+        token = self.context_var.set(state)
+        start = time.perf_counter()
+        try:
+            response = await self.get_response(request)
+        finally:
+            self.context_var.reset(token)
+        self.finish(request, response, state, time.perf_counter() - start)
+        return response
+
+
+# Measures a sample of the requests and adds them to the metrics registry (see core.metrics)
+class MetricsMiddleware(SampledMiddleware):
+    context_var = current_request
+
+    def start(self, request):
+        options = get_metrics_settings()
+        if not options['ENABLED'] or random.random() >= options['SAMPLE_RATE']:
+            return None
+        return RequestMetrics()
+
+    def finish(self, request, response, metrics, elapsed):
+        record_request(request, response, metrics, elapsed, get_metrics_settings()['LOG'])
+
+
+# Checks the queries of a sample of the requests and logs their problems with the endpoint and the call site
+# (see core.query_detector)
+class QueryDetectorMiddleware(SampledMiddleware):
+    context_var = current_detector
+
+    def start(self, request):
+        if random.random() >= get_detector_settings()['SAMPLE_RATE']:
+            return None
+        return QueryDetector()
+
+    def finish(self, request, response, detector, elapsed):
+        problems = detector.get_problems()
+        if problems:
+            log_problems(get_endpoint(request), request, problems)
+
+
+# Sheds the requests of a limited endpoint class (CONCURRENCY_LIMITS) with 503 Service Unavailable when the process is already
+# running `limit` requests of that class, so that a burst of expensive requests fails fast instead of taking every worker thread.
+# The slot of a request is released with its response, or when a streaming response has been sent.
+class ConcurrencyLimitMiddleware(MiddlewareMixin):
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        semaphore = limiter.get_semaphore(request.resolver_match.url_name)
+        if semaphore is None:
+            return None
+        if not semaphore.acquire(blocking=False):
+            return get_busy_response()
+        request.concurrency_slot = semaphore
+        return None
+
+    def process_response(self, request, response):
+        semaphore = getattr(request, 'concurrency_slot', None)
+        if semaphore is None:
+            return response
+        del request.concurrency_slot
+        if response.streaming:
+            response.streaming_content = ReleaseOnClose(response.streaming_content, semaphore)
+        else:
+            semaphore.release()
+        return response
+
+
+# the chunks of a streaming response, the slot is released when the server closes the response after sending it (or when the
+# client disconnects), even if the chunks were never read
+class ReleaseOnClose:
+
+    def __init__(self, chunks, semaphore):
+        self.chunks = iter(chunks)
+        self.semaphore = semaphore
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        return next(self.chunks)
+
+    def close(self):
+        if self.semaphore is not None:
+            self.semaphore.release()
+            self.semaphore = None
@@ -0,0 +1,21 @@
+# Generated by Django 4.1.3 on 2026-10-18 19:58
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0015_alter_task_status'),
+    ]
+
+    operations = [
+        migrations.AddConstraint(
+            model_name='note',
+            constraint=models.UniqueConstraint(fields=('user', 'title'), name='unique_note_title_per_user'),
+        ),
+        migrations.AddConstraint(
+            model_name='task',
+            constraint=models.UniqueConstraint(fields=('user', 'title'), name='unique_task_title_per_user'),
+        ),
+    ]
@@ -0,0 +1,37 @@
+# Generated by Django 4.1.3 on 2026-10-18 20:01
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0017_created_id_index'),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name='note',
+            options={'ordering': ['created', 'id'], 'verbose_name': 'Note', 'verbose_name_plural': 'Notes'},
+        ),
+        migrations.AlterModelOptions(
+            name='task',
+            options={'ordering': ['created', 'id'], 'verbose_name': 'Task', 'verbose_name_plural': 'Tasks'},
+        ),
+        migrations.AddIndex(
+            model_name='note',
+            index=models.Index(fields=['user', 'created', 'id'], name='note_user_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(fields=['user', 'created', 'id'], name='task_user_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(fields=['user', 'is_active', 'deadline'], name='task_user_active_deadline_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(fields=['user', 'status'], name='task_user_status_idx'),
+        ),
+    ]
@@ -0,0 +1,24 @@
+# Generated by Django 4.1.3 on 2026-10-18 20:01
+
+from django.db import migrations, models
+import utils.ids
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0018_user_list_indexes'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='note',
+            name='id',
+            field=models.UUIDField(default=utils.ids.generate_id, primary_key=True, serialize=False),
+        ),
+        migrations.AlterField(
+            model_name='task',
+            name='id',
+            field=models.UUIDField(default=utils.ids.generate_id, primary_key=True, serialize=False),
+        ),
+    ]
@@ -0,0 +1,49 @@
+# Full-text search indexes of tasks and notes, used by core.filters.FullTextSearchFilter.
+# The indexes are Postgres only, so they are created here instead of in Meta.indexes, which would also create them on SQLite.
+
+from django.contrib.postgres.indexes import GinIndex, OpClass
+from django.contrib.postgres.operations import TrigramExtension
+from django.contrib.postgres.search import SearchVector
+from django.db import migrations
+
+
+# the same expression as core.filters.get_search_vector(['title', 'description'])
+def get_search_indexes(prefix):
+    vector = SearchVector('title', weight='A', config='english') + SearchVector('description', weight='B', config='english')
+    return [
+        # words of the title and the description, for filter[search]
+        GinIndex(vector, name=f'{prefix}_search_idx'),
+        # trigrams of the title, for the prefix and fuzzy matches of filter[search]
+        GinIndex(OpClass('title', name='gin_trgm_ops'), name=f'{prefix}_title_trgm_idx'),
+    ]
+
+
+def create_search_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for model_name in ('Task', 'Note'):
+        model = apps.get_model('core', model_name)
+        for index in get_search_indexes(model_name.lower()):
+            schema_editor.add_index(model, index)
+
+
+def drop_search_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for model_name in ('Task', 'Note'):
+        model = apps.get_model('core', model_name)
+        for index in get_search_indexes(model_name.lower()):
+            schema_editor.remove_index(model, index)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0020_tombstone'),
+    ]
+
+    operations = [
+        # does nothing on other databases than Postgres
+        TrigramExtension(),
+        migrations.RunPython(create_search_indexes, drop_search_indexes),
+    ]
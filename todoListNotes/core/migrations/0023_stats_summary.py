@@ -0,0 +1,50 @@
+# Generated by Django 4.1.3 on 2026-10-18 20:29
+
+from django.db import migrations, models
+import utils.ids
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0022_filter_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='NoteSummary',
+            fields=[
+                ('id', models.UUIDField(default=utils.ids.generate_id, primary_key=True, serialize=False)),
+                ('color', models.CharField(max_length=50, null=True)),
+                ('count', models.PositiveIntegerField()),
+                ('refreshed', models.DateTimeField()),
+            ],
+            options={
+                'verbose_name': 'Note summary',
+                'verbose_name_plural': 'Note summaries',
+            },
+        ),
+        migrations.CreateModel(
+            name='TaskSummary',
+            fields=[
+                ('id', models.UUIDField(default=utils.ids.generate_id, primary_key=True, serialize=False)),
+                ('status', models.CharField(max_length=50)),
+                ('is_active', models.BooleanField()),
+                ('deadline', models.DateField()),
+                ('count', models.PositiveIntegerField()),
+                ('refreshed', models.DateTimeField()),
+            ],
+            options={
+                'verbose_name': 'Task summary',
+                'verbose_name_plural': 'Task summaries',
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='tasksummary',
+            constraint=models.UniqueConstraint(fields=('status', 'is_active', 'deadline'), name='unique_task_summary'),
+        ),
+        migrations.AddConstraint(
+            model_name='notesummary',
+            constraint=models.UniqueConstraint(fields=('color',), name='unique_note_summary'),
+        ),
+    ]
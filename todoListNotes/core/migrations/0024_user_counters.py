@@ -0,0 +1,30 @@
+# Generated by Django 4.1.3 on 2026-10-18 20:31
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auth', '0012_alter_user_first_name_max_length'),
+        ('core', '0023_stats_summary'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='UserCounters',
+            fields=[
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='counters', serialize=False, to=settings.AUTH_USER_MODEL)),
+                ('tasks', models.IntegerField(default=0)),
+                ('active_tasks', models.IntegerField(default=0)),
+                ('pending_tasks', models.IntegerField(default=0)),
+                ('notes', models.IntegerField(default=0)),
+            ],
+            options={
+                'verbose_name': 'User counters',
+                'verbose_name_plural': 'User counters',
+            },
+        ),
+    ]
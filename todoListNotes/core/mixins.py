@@ -0,0 +1,140 @@
+# import dependencies from django
+from django.db.models                   import Max, Count
+from django.utils.cache                 import get_conditional_response, patch_cache_control, patch_vary_headers
+from django.utils.http                  import http_date
+from django.http                        import HttpResponse
+
+# import dependencies from rest_framework
+from rest_framework.response            import Response
+from rest_framework_json_api.renderers  import JSONRenderer
+
+# import the per user list response cache
+from . response_cache                   import get_cache, get_cache_settings, get_response_key
+
+# import other dependencies
+import hashlib
+
+
+# weak ETag built from the validators, the user and the full path so that different filters or pages never share an ETag
+def build_etag(request, *validators):
+    value = ':'.join([str(request.user.pk), request.get_full_path()] + [str(validator) for validator in validators])
+    return 'W/"%s"' % hashlib.md5(value.encode('utf-8')).hexdigest()
+
+
+# returns a 304 response if the client copy is still valid, otherwise None
+def get_not_modified_response(request, etag, last_modified=None):
+    timestamp = int(last_modified.timestamp()) if last_modified else None
+    return get_conditional_response(request, etag=etag, last_modified=timestamp)
+
+
+# adds the validators and the cache headers to a 200 or 304 response
+def add_validators(response, etag, last_modified=None):
+    if response.status_code in (200, 304):
+        response['ETag'] = etag
+        if last_modified:
+            response['Last-Modified'] = http_date(int(last_modified.timestamp()))
+        # the responses are per user, so only the client may keep them and it has to revalidate them
+        patch_cache_control(response, private=True, no_cache=True)
+        patch_vary_headers(response, ('Authorization',))
+    return response
+
+
+# the headers that are stored with a cached list response
+CACHED_HEADERS = ('Content-Type', 'ETag', 'Last-Modified', 'Cache-Control', 'Vary')
+
+
+# builds the response of a cached list, or a 304 if the ETag of the cached list matches
+def get_cached_response(request, cached):
+    content, headers = cached
+    response = get_conditional_response(request, etag=headers.get('ETag'))
+    if response is None:
+        response = HttpResponse(content)
+    for header, value in headers.items():
+        response[header] = value
+    return response
+
+
+# stores a rendered list response in the response cache
+def store_response(key, response):
+    get_cache().set(key, get_cached_value(response), get_cache_settings()['TIMEOUT'])
+
+
+# same as store_response for the async views
+async def astore_response(key, response):
+    await get_cache().aset(key, get_cached_value(response), get_cache_settings()['TIMEOUT'])
+
+
+# the content and the headers that are stored for a list response
+def get_cached_value(response):
+    return (response.content, {header: response[header] for header in CACHED_HEADERS if response.has_header(header)})
+
+
+# Adds ETag / If-None-Match and Last-Modified / If-Modified-Since support to the list and retrieve actions of a viewset.
+# The validators are computed with a single aggregate query over the 'modified' column instead of the serialized response,
+# so a request that matches returns 304 Not Modified without running the serializer or the renderer.
+class ConditionalGetMixin:
+
+    # returns (last_modified, count) of the rows behind the list response
+    def get_list_validators(self):
+        queryset = self.filter_queryset(self.get_queryset())
+        result = queryset.aggregate(last_modified=Max('modified'), count=Count('pk'))
+        return result['last_modified'], result['count']
+
+    # returns the modified date of the requested object, or None if it does not exist
+    def get_detail_validators(self):
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        queryset = self.get_queryset().filter(**{self.lookup_field: self.kwargs[lookup_url_kwarg]})
+        return queryset.values_list('modified', flat=True).first()
+
+    # returns a 304 response if the client copy is still valid, otherwise runs the action and adds the validators to its response
+    def conditional_response(self, action, etag, last_modified, request, *args, **kwargs):
+        response = get_not_modified_response(request, etag, last_modified)
+        if response is None:
+            response = action(request, *args, **kwargs)
+        return add_validators(response, etag, last_modified)
+
+    def list(self, request, *args, **kwargs):
+        last_modified, count = self.get_list_validators()
+        # Last-Modified is not sent for lists since deleting a row does not change max(modified), the ETag includes the count
+        return self.conditional_response(super().list, build_etag(request, last_modified, count), None, request, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        last_modified = self.get_detail_validators()
+        if last_modified is None:
+            # let the default retrieve return the 404 error
+            return super().retrieve(request, *args, **kwargs)
+        return self.conditional_response(super().retrieve, build_etag(request, last_modified), last_modified, request, *args, **kwargs)
+
+
+# Caches the rendered response of the list action per user, query parameters and media type. The cached responses of a user
+# are invalidated by bumping its list version (see core.response_cache.bump_list_version), so a repeated read is answered
+# from the cache without running any query, the serializer or the renderer. It must come before ConditionalGetMixin so that
+# a cached ETag is also answered without a query.
+class ResponseCacheMixin:
+
+    def list(self, request, *args, **kwargs):
+        if not get_cache_settings()['ENABLED']:
+            return super().list(request, *args, **kwargs)
+
+        key = get_response_key(request, self.basename)
+        cached = get_cache().get(key)
+        if cached is not None:
+            return get_cached_response(request, cached)
+
+        response = super().list(request, *args, **kwargs)
+        if response.status_code == 200:
+            # store the response once it has been rendered
+            response.add_post_render_callback(lambda rendered: store_response(key, rendered))
+        return response
+
+
+# Serializes the list action with the FastListSerializer of the viewset (fast_list_serializer) when the response is rendered as
+# JSON:API and not paginated, which covers every request of the clients. The browsable API keeps using the serializer_class.
+class FastListMixin:
+    fast_list_serializer = None
+
+    def list(self, request, *args, **kwargs):
+        if self.fast_list_serializer is None or self.paginator is not None or not isinstance(request.accepted_renderer, JSONRenderer):
+            return super().list(request, *args, **kwargs)
+        queryset = self.filter_queryset(self.get_queryset())
+        return Response(self.fast_list_serializer.serialize(queryset))
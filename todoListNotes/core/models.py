@@ -36,8 +36,25 @@ class Task(
         verbose_name = "Task"
         # verbose_name for multiple objects
         verbose_name_plural = "Tasks"
-        # default ordering
-        ordering = ["id"]
+        # default ordering, by creation date with the id as tie breaker so that the order is stable and served by an index
+        ordering = ["created", "id"]
+        # enforce unique titles per user with an index instead of scanning every title on save
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'title'], name='unique_task_title_per_user'),
+        ]
+        indexes = [
+            # index for the keyset pagination of the admin listing
+            models.Index(fields=['created', 'id'], name='task_created_id_idx'),
+            # indexes for the per user queries, the list endpoint and the filters on is_active/deadline and status
+            models.Index(fields=['user', 'created', 'id'], name='task_user_created_idx'),
+            models.Index(fields=['user', 'is_active', 'deadline'], name='task_user_active_deadline_idx'),
+            models.Index(fields=['user', 'status'], name='task_user_status_idx'),
+            # index for the "modified since" query of the sync endpoint
+            models.Index(fields=['user', 'modified'], name='task_user_modified_idx'),
+            # indexes for the deadline and color filters of the list endpoint, see core.filters.TaskFilterSet
+            models.Index(fields=['user', 'deadline'], name='task_user_deadline_idx'),
+            models.Index(fields=['user', 'color'], name='task_user_color_idx'),
+        ]
 
     # additional fields
     status = models.CharField(max_length=50, default='Pending')
@@ -62,8 +79,22 @@ class Note(
         verbose_name =  "Note"
         # verbose_name for multiple objects
         verbose_name_plural = "Notes"
-        # default ordering
-        ordering = ["id"]
+        # default ordering, by creation date with the id as tie breaker so that the order is stable and served by an index
+        ordering = ["created", "id"]
+        # enforce unique titles per user with an index instead of scanning every title on save
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'title'], name='unique_note_title_per_user'),
+        ]
+        indexes = [
+            # index for the keyset pagination of the admin listing
+            models.Index(fields=['created', 'id'], name='note_created_id_idx'),
+            # index for the per user list endpoint
+            models.Index(fields=['user', 'created', 'id'], name='note_user_created_idx'),
+            # index for the "modified since" query of the sync endpoint
+            models.Index(fields=['user', 'modified'], name='note_user_modified_idx'),
+            # index for the color filter of the list endpoint, see core.filters.NoteFilterSet
+            models.Index(fields=['user', 'color'], name='note_user_color_idx'),
+        ]
 
     # additional fields
     user = models.ForeignKey(User, on_delete=models.CASCADE, null=True, blank=True)
@@ -73,3 +104,100 @@ class Note(
     def __str__(self):
         return f'{self.title} {self.description}'
 
+
+
+# Tombstone model that records the deletion of a task or note, so that the sync endpoint can report deletions incrementally
+class Tombstone(Model):
+
+    RESOURCE_CHOICES = (
+        ('task', 'Task'),
+        ('note', 'Note'),
+    )
+
+    class Meta:
+        # verbose_name for single object
+        verbose_name = "Tombstone"
+        # verbose_name for multiple objects
+        verbose_name_plural = "Tombstones"
+        # default ordering
+        ordering = ["deleted"]
+        indexes = [
+            # index for the "deleted since" query of the sync endpoint
+            models.Index(fields=['user', 'deleted'], name='tombstone_user_deleted_idx'),
+        ]
+
+    user = models.ForeignKey(User, on_delete=models.CASCADE)
+    resource = models.CharField(max_length=20, choices=RESOURCE_CHOICES)
+    # id of the deleted task or note
+    object_id = models.UUIDField()
+    deleted = models.DateTimeField(auto_now_add=True)
+
+    # generate string representation
+    def __str__(self):
+        return f'{self.resource} {self.object_id}'
+
+
+# Summary of all the tasks, the number of tasks per status, is_active and deadline. It is rebuilt by the refresh_stats command
+# and read by the admin stats endpoint instead of aggregating the whole task table, see core.stats
+class TaskSummary(Model):
+
+    class Meta:
+        # verbose_name for single object
+        verbose_name = "Task summary"
+        # verbose_name for multiple objects
+        verbose_name_plural = "Task summaries"
+        constraints = [
+            models.UniqueConstraint(fields=['status', 'is_active', 'deadline'], name='unique_task_summary'),
+        ]
+
+    status = models.CharField(max_length=50)
+    is_active = models.BooleanField()
+    deadline = models.DateField()
+    count = models.PositiveIntegerField()
+    refreshed = models.DateTimeField()
+
+    # generate string representation
+    def __str__(self):
+        return f'{self.status} {self.is_active} {self.deadline}: {self.count}'
+
+
+# Summary of all the notes, the number of notes per color. It is rebuilt together with TaskSummary
+class NoteSummary(Model):
+
+    class Meta:
+        # verbose_name for single object
+        verbose_name = "Note summary"
+        # verbose_name for multiple objects
+        verbose_name_plural = "Note summaries"
+        constraints = [
+            models.UniqueConstraint(fields=['color'], name='unique_note_summary'),
+        ]
+
+    color = models.CharField(max_length=50, null=True)
+    count = models.PositiveIntegerField()
+    refreshed = models.DateTimeField()
+
+    # generate string representation
+    def __str__(self):
+        return f'{self.color}: {self.count}'
+
+
+# Number of tasks and notes of a user, updated in the same transaction as every write of the API (see core.counters), so that
+# the counts of a user are read with a single primary key lookup. The reconcile_counters command repairs them.
+class UserCounters(models.Model):
+
+    class Meta:
+        # verbose_name for single object
+        verbose_name = "User counters"
+        # verbose_name for multiple objects
+        verbose_name_plural = "User counters"
+
+    user = models.OneToOneField(User, on_delete=models.CASCADE, primary_key=True, related_name='counters')
+    tasks = models.IntegerField(default=0)
+    active_tasks = models.IntegerField(default=0)
+    pending_tasks = models.IntegerField(default=0)
+    notes = models.IntegerField(default=0)
+
+    # generate string representation
+    def __str__(self):
+        return f'{self.user_id}: {self.tasks} task(s), {self.notes} note(s)'
@@ -0,0 +1,138 @@
+# import dependencies from rest_framework
+from rest_framework.pagination          import BasePagination
+from rest_framework.response            import Response
+from rest_framework.exceptions          import NotFound
+from rest_framework.utils.urls          import remove_query_param, replace_query_param
+
+# import settings and Q for building the keyset filter
+from django.conf                        import settings
+from django.db.models                   import Q
+from django.core.exceptions             import ValidationError
+
+# import other dependencies
+from collections                        import OrderedDict
+from base64                             import urlsafe_b64decode, urlsafe_b64encode
+import binascii
+import json
+
+
+# keyset (a.k.a. seek) pagination. Instead of an OFFSET, every page continues right after the last row of the previous page,
+# so a deep page costs the same as the first one as long as there is an index on the ordering fields.
+class KeysetPagination(BasePagination):
+    cursor_query_param = 'page[cursor]'
+    page_size_query_param = 'page[size]'
+    invalid_cursor_message = 'Invalid cursor'
+
+    def __init__(self, ordering=('created', 'id')):
+        # the ordering must end with a unique field so that the position of a row is never ambiguous
+        self.ordering = tuple(ordering)
+        self.page_size = getattr(settings, 'PAGINATION_PAGE_SIZE', 100)
+        self.max_page_size = getattr(settings, 'PAGINATION_MAX_PAGE_SIZE', 1000)
+
+    def paginate_queryset(self, queryset, request, view=None):
+        queryset = self.get_page_queryset(queryset, request)
+        try:
+            rows = list(queryset)
+        except (ValidationError, ValueError):
+            # the cursor decoded fine but holds values that do not fit the ordering fields
+            raise NotFound(self.invalid_cursor_message)
+        return self.set_page(rows)
+
+    # same as paginate_queryset for the async views
+    async def apaginate_queryset(self, queryset, request):
+        queryset = self.get_page_queryset(queryset, request)
+        try:
+            rows = [row async for row in queryset]
+        except (ValidationError, ValueError):
+            raise NotFound(self.invalid_cursor_message)
+        return self.set_page(rows)
+
+    # returns the queryset of the requested page
+    def get_page_queryset(self, queryset, request):
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        position = self.decode_cursor(request)
+
+        queryset = queryset.order_by(*self.ordering)
+        if position is not None:
+            try:
+                queryset = queryset.filter(self.get_keyset_filter(position))
+            except (ValidationError, ValueError):
+                raise NotFound(self.invalid_cursor_message)
+
+        # fetch one extra row to know if there is a next page without running a COUNT
+        return queryset[:self.page_size + 1]
+
+    def set_page(self, rows):
+        self.has_next = len(rows) > self.page_size
+        self.page = rows[:self.page_size]
+        return self.page
+
+    def get_paginated_response(self, data):
+        return Response(self.get_paginated_data(data))
+
+    # the paginated document, the JSON:API renderer moves 'meta' and 'links' to the top level
+    def get_paginated_data(self, data):
+        return {
+            'results': data,
+            'meta': {
+                'pagination': OrderedDict([
+                    ('size', self.page_size),
+                    ('count', len(self.page)),
+                ])
+            },
+            'links': OrderedDict([
+                ('first', self.get_first_link()),
+                ('next', self.get_next_link()),
+            ])
+        }
+
+    # the page size can be lowered or raised by the client, but never above max_page_size
+    def get_page_size(self, request):
+        try:
+            page_size = int(request.GET[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        if page_size <= 0:
+            return self.page_size
+        return min(page_size, self.max_page_size)
+
+    # builds a >= x AND ((a > x) OR (a = x AND b > y) OR ...) for the ordering fields. The first bound is redundant, but the
+    # database can only turn it (and not the OR expansion) into the start of a range scan of the (a, b, ...) index.
+    def get_keyset_filter(self, position):
+        keyset_filter = Q()
+        for index, field in enumerate(self.ordering):
+            condition = Q(**{f'{field}__gt': position[index]})
+            for previous_field, value in zip(self.ordering[:index], position):
+                condition &= Q(**{previous_field: value})
+            keyset_filter |= condition
+        if len(self.ordering) > 1:
+            keyset_filter = Q(**{f'{self.ordering[0]}__gte': position[0]}) & keyset_filter
+        return keyset_filter
+
+    def get_first_link(self):
+        return remove_query_param(self.request.build_absolute_uri(), self.cursor_query_param)
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        last = self.page[-1]
+        position = [getattr(last, field) for field in self.ordering]
+        return replace_query_param(self.request.build_absolute_uri(), self.cursor_query_param, self.encode_cursor(position))
+
+    # the cursor is an opaque base64 string so clients do not depend on the ordering fields
+    def encode_cursor(self, position):
+        values = [value.isoformat() if hasattr(value, 'isoformat') else str(value) for value in position]
+        return urlsafe_b64encode(json.dumps(values).encode('utf-8')).decode('ascii')
+
+    def decode_cursor(self, request):
+        encoded = request.GET.get(self.cursor_query_param)
+        if encoded is None:
+            return None
+        try:
+            position = json.loads(urlsafe_b64decode(encoded.encode('ascii')).decode('utf-8'))
+        except (TypeError, ValueError, UnicodeError, binascii.Error):
+            raise NotFound(self.invalid_cursor_message)
+        if not isinstance(position, list) or len(position) != len(self.ordering):
+            raise NotFound(self.invalid_cursor_message)
+        return position
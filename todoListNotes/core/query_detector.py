@@ -0,0 +1,163 @@
+# import dependencies from django
+from django.conf                        import settings
+
+# import other dependencies
+from contextlib                         import contextmanager
+import contextvars
+import logging
+import os
+import re
+import time
+import traceback
+
+
+# Detects the query problems of a request or of a block of code:
+#   - repeated: the same query shape (the SQL with its parameters left out) runs many times, e.g. an N+1 query in a serializer
+#   - slow: a query takes longer than a threshold
+#   - rows: a query returns more rows than a threshold (only on databases that report the row count of a SELECT, e.g. Postgres)
+# Every problem has the call site of the query in the project code. The queries are seen through an execute wrapper installed on
+# every database connection (see CoreConfig.ready()) that checks the detector of the current context, so the queries of the async
+# views that run in the sync_to_async thread are seen as well. QueryDetectorMiddleware runs the detector on a sample of the
+# requests and logs the problems on the core.queries logger, and QueryAssertionsMixin turns them into test failures.
+
+logger = logging.getLogger('core.queries')
+
+
+# read the QUERY_DETECTOR setting with its defaults
+def get_detector_settings():
+    options = {
+        # the fraction of the requests that are checked by QueryDetectorMiddleware, from 0 to 1
+        'SAMPLE_RATE': 0.0,
+        # the number of runs of the same query shape that is reported
+        'REPEATED_QUERIES': 5,
+        'SLOW_QUERY_MS': 100,
+        'MAX_ROWS': 1000,
+    }
+    options.update(getattr(settings, 'QUERY_DETECTOR', {}))
+    return options
+
+
+# the detector of the current request or block, None when the queries are not checked
+current_detector = contextvars.ContextVar('current_detector', default=None)
+
+# the runs of placeholders of an IN (...) list, so that lists of different lengths have the same shape
+IN_LIST = re.compile(r'\(\s*%s(?:\s*,\s*%s)+\s*\)')
+
+# the directory of the project, the call site is the innermost frame of the project code outside of the execute wrappers
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+WRAPPER_FILES = {os.path.abspath(__file__), os.path.join(os.path.dirname(os.path.abspath(__file__)), 'metrics.py')}
+
+
+# the SQL of a query without its parameters
+def get_shape(sql):
+    return IN_LIST.sub('(%s, ...)', sql)
+
+
+# the innermost frame of the project code that ran the query, e.g. "core/views.py:123 in sync"
+def get_call_site():
+    for frame in reversed(traceback.extract_stack()):
+        filename = os.path.abspath(frame.filename)
+        if filename.startswith(PROJECT_DIR) and filename not in WRAPPER_FILES and '-packages' not in filename:
+            return f'{os.path.relpath(filename, PROJECT_DIR)}:{frame.lineno} in {frame.name}'
+    return None
+
+
+class QueryDetector:
+
+    def __init__(self, repeated_queries=None, slow_query_ms=None, max_rows=None):
+        options = get_detector_settings()
+        self.repeated_queries = repeated_queries or options['REPEATED_QUERIES']
+        self.slow_query_ms = slow_query_ms if slow_query_ms is not None else options['SLOW_QUERY_MS']
+        self.max_rows = max_rows if max_rows is not None else options['MAX_ROWS']
+        self.queries = 0
+        # the number of runs and the call site of every query shape
+        self.shapes = {}
+        # the slow queries and the queries with too many rows
+        self.problems = []
+
+    def record(self, sql, duration, rowcount):
+        self.queries += 1
+        shape = get_shape(sql)
+        runs = self.shapes.get(shape)
+        if runs is None:
+            self.shapes[shape] = [1, None]
+        else:
+            runs[0] += 1
+            # the call site of the second run is the one of the loop
+            if runs[1] is None:
+                runs[1] = get_call_site()
+
+        duration_ms = duration * 1000
+        if duration_ms > self.slow_query_ms:
+            self.problems.append({'kind': 'slow', 'sql': shape, 'duration_ms': round(duration_ms, 3), 'call_site': get_call_site()})
+        if rowcount is not None and rowcount > self.max_rows:
+            self.problems.append({'kind': 'rows', 'sql': shape, 'rows': rowcount, 'call_site': get_call_site()})
+
+    # all the problems, the repeated query shapes first
+    def get_problems(self):
+        repeated = [
+            {'kind': 'repeated', 'sql': shape, 'count': runs, 'call_site': call_site}
+            for shape, (runs, call_site) in self.shapes.items() if runs >= self.repeated_queries
+        ]
+        return repeated + self.problems
+
+
+# execute wrapper that records the queries in the detector of the current context
+def detect_query(execute, sql, params, many, context):
+    detector = current_detector.get()
+    if detector is None:
+        return execute(sql, params, many, context)
+    start = time.perf_counter()
+    result = execute(sql, params, many, context)
+    duration = time.perf_counter() - start
+    # the row count of a SELECT is -1 on the databases that do not report it
+    rowcount = getattr(context['cursor'], 'rowcount', -1)
+    detector.record(sql, duration, rowcount if rowcount is not None and rowcount >= 0 else None)
+    return result
+
+
+# installs detect_query on a database connection, it is connected to the connection_created signal in CoreConfig.ready()
+def install_query_detector(connection, **kwargs):
+    if detect_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(detect_query)
+
+
+# checks the queries of the block, e.g.
+#   with detect_queries() as detector:
+#       ...
+#   detector.get_problems()
+@contextmanager
+def detect_queries(**options):
+    detector = QueryDetector(**options)
+    token = current_detector.set(detector)
+    try:
+        yield detector
+    finally:
+        current_detector.reset(token)
+
+
+# logs the problems of a request with its endpoint
+def log_problems(endpoint, request, problems):
+    for problem in problems:
+        details = ', '.join(f'{key}={value}' for key, value in problem.items() if key not in ('kind', 'sql', 'call_site'))
+        logger.warning(
+            '%s query in %s %s %s (%s) at %s: %s',
+            problem['kind'], endpoint, request.method, request.path, details, problem['call_site'], problem['sql'],
+        )
+
+
+# test case mixin that fails when the code of the block has query problems, e.g.
+#   with self.assertNoQueryProblems(repeated_queries=3):
+#       self.client.get('/task/')
+class QueryAssertionsMixin:
+
+    @contextmanager
+    def assertNoQueryProblems(self, **options):
+        with detect_queries(**options) as detector:
+            yield detector
+        problems = detector.get_problems()
+        if problems:
+            self.fail('\n'.join(
+                [f'{len(problems)} query problem(s):'] +
+                [f'  {problem["kind"]} at {problem["call_site"]}: {problem["sql"]}' for problem in problems]
+            ))
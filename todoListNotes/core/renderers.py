@@ -0,0 +1,13 @@
+# import the JSON:API renderer
+from rest_framework_json_api            import renderers
+
+# import the timing of the request metrics
+from . metrics                          import timed
+
+
+# JSON:API renderer that adds its rendering time to the request metrics
+class JSONRenderer(renderers.JSONRenderer):
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        with timed('render'):
+            return super().render(data, accepted_media_type, renderer_context)
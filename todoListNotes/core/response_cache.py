@@ -0,0 +1,82 @@
+# import dependencies from django
+from django.conf                        import settings
+from django.core.cache                  import caches
+from django.db                          import transaction
+
+# import other dependencies
+import hashlib
+import time
+
+
+# read the RESPONSE_CACHE setting with its defaults
+def get_cache_settings():
+    options = {
+        'CACHE_ALIAS': 'default',
+        'TIMEOUT': 300,
+        'ENABLED': True,
+    }
+    options.update(getattr(settings, 'RESPONSE_CACHE', {}))
+    return options
+
+
+def get_cache():
+    return caches[get_cache_settings()['CACHE_ALIAS']]
+
+
+def get_version_key(user_id):
+    return f'list-version:{user_id}'
+
+
+# returns the current list version of a user. A missing version (never set or evicted) is initialized with the current time,
+# so that it can never go back to a version that still has cached responses.
+def get_list_version(user_id):
+    cache = get_cache()
+    key = get_version_key(user_id)
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, time.time_ns(), None)
+        version = cache.get(key)
+    return version
+
+
+# same as get_list_version for the async views
+async def aget_list_version(user_id):
+    cache = get_cache()
+    key = get_version_key(user_id)
+    version = await cache.aget(key)
+    if version is None:
+        await cache.aadd(key, time.time_ns(), None)
+        version = await cache.aget(key)
+    return version
+
+
+# invalidates all the cached list responses of a user by moving to a new version. The version is bumped once the
+# transaction is committed, otherwise a concurrent read could cache the old rows under the new version.
+def bump_list_version(user_id):
+    if user_id is None:
+        return
+
+    def bump():
+        cache = get_cache()
+        try:
+            cache.incr(get_version_key(user_id))
+        except ValueError:
+            # the version is not in the cache, the next read starts a new one
+            pass
+
+    transaction.on_commit(bump)
+
+
+# builds the cache key of a list response from the user, its list version, the full path and the negotiated media type
+def get_response_key(request, resource):
+    return build_response_key(request, resource, get_list_version(request.user.pk), request.accepted_media_type)
+
+
+# same as get_response_key for the async views, which always render JSON:API
+async def aget_response_key(request, resource, media_type):
+    return build_response_key(request, resource, await aget_list_version(request.user.pk), media_type)
+
+
+def build_response_key(request, resource, version, media_type):
+    variant = f'{request.get_full_path()}:{media_type}'
+    return f'list-response:{resource}:{request.user.pk}:{version}:{hashlib.md5(variant.encode("utf-8")).hexdigest()}'
@@ -1,14 +1,32 @@
 # import dependencies from rest_framework
 from rest_framework                 import serializers, status
-from rest_framework.exceptions      import APIException
+from rest_framework.exceptions      import APIException, NotFound
 
 # import needed models
 from django.contrib.auth.models     import User
 from . models                       import Task, Note
 
+# import transaction and IntegrityError to turn unique constraint violations into validation errors
+from django.db                      import transaction, IntegrityError
+
+# import the per user counters, they are updated in the same transaction as the tasks and notes
+from . counters                     import get_counts, get_count_changes, adjust_counters
+
+# import the password hashing pool and the backend of the API login
+from . hashing                      import make_password
+from . backends                     import PooledModelBackend
+from rest_framework.authtoken.serializers import AuthTokenSerializer
+from django.utils.translation       import gettext_lazy as _
+
+# import the timing of the request metrics
+from . metrics                      import timed
+
 # import OrderedDict
 from collections                    import OrderedDict
 
+# import the JSON:API helpers to build the same resource objects as the renderer
+from rest_framework_json_api.utils  import get_resource_type_from_serializer, format_field_names
+
 # import date dependencies
 from datetime                       import datetime, date
 
@@ -20,6 +38,19 @@ from django.core.validators         import validate_email
 from django.forms import            EmailField
 
 
+# adds the time spent in .data to the serializer time of the request metrics (core.metrics)
+class TimedDataMixin:
+    @property
+    def data(self):
+        with timed('serializer'):
+            return super().data
+
+
+# list serializer of the serializers with many=True, the items are serialized by to_representation() so they are not timed twice
+class TimedListSerializer(TimedDataMixin, serializers.ListSerializer):
+    pass
+
+
 # custom serializer to remove leading and trailing whitespace, period and comma on CharFields
 class StrippedCharField(serializers.CharField):
     def to_internal_value(self, data):
@@ -59,6 +90,25 @@ class DateIsInPastException(APIException):
     default_code = 'invalid'
 
 
+# serializer for the login, the same as AuthTokenSerializer with the password checked on the hashing pool. It raises
+# HashingPoolBusy when the pool is full.
+class LoginSerializer(AuthTokenSerializer):
+
+    def validate(self, attrs):
+        username = attrs.get('username')
+        password = attrs.get('password')
+
+        if not username or not password:
+            raise serializers.ValidationError(_('Must include "username" and "password".'), code='authorization')
+
+        user = PooledModelBackend().authenticate(self.context.get('request'), username=username, password=password)
+        if not user:
+            raise serializers.ValidationError(_('Unable to log in with provided credentials.'), code='authorization')
+
+        attrs['user'] = user
+        return attrs
+
+
 # serializer for Registration
 class RegistrationSerializer(serializers.ModelSerializer):
 
@@ -101,8 +151,8 @@ class RegistrationSerializer(serializers.ModelSerializer):
                 'password': 'Sorry, the password did not match'
             })
 
-        # If they do, it sets the password using user.set_password(password)
-        user.set_password(password)
+        # If they do, it hashes the password on the hashing pool, it raises HashingPoolBusy when the pool is full
+        user.password = make_password(password)
 
         # saves the user using user.save()
         user.save()
@@ -112,7 +162,7 @@ class RegistrationSerializer(serializers.ModelSerializer):
 
 
 # serializer for Task
-class TaskSerializer(serializers.ModelSerializer):
+class TaskSerializer(TimedDataMixin, serializers.ModelSerializer):
 
     # declare user as read-only so that it is not required during deserialization
     user = serializers.ReadOnlyField(source='user.username', required=False)
@@ -129,6 +179,7 @@ class TaskSerializer(serializers.ModelSerializer):
         fields = ['title', 'description', 'status',
                   'deadline', 'color', 'created', 'modified', 'user', 'is_active']
         read_only_fields = ('user',)
+        list_serializer_class = TimedListSerializer
 
     # override the validate method
     def validate(self, res: OrderedDict):
@@ -145,22 +196,9 @@ class TaskSerializer(serializers.ModelSerializer):
 
     # override the save method
     def save(self):
-        # get the 'title' validated data
-        title = self.validated_data['title']
-        # get all titles from Task model
-        all_titles = Task.objects.values_list('title', flat=True)
-
-        # loop through the all_titles list
-        for titles in all_titles:
-            # if the title is already existing
-            if title == titles:
-                # raise a ValidationError
-                raise serializers.ValidationError(
-                    {'title': 'Operation failed, there is an existing task with the same title.'})
-
         # create the task instance and populate the fields
         task = Task(
-            title=title,
+            title=self.validated_data['title'],
             description=self.validated_data['description'],
             deadline=self.validated_data['deadline'],
             color=self.validated_data['color'],
@@ -168,39 +206,91 @@ class TaskSerializer(serializers.ModelSerializer):
             user=self.validated_data['user']
         )
 
-        # save the created task
-        task.save()
+        try:
+            # save the created task, the savepoint keeps an outer transaction usable if the insert fails
+            with transaction.atomic():
+                task.save()
+                adjust_counters(task.user_id, **get_counts(task))
+        except IntegrityError:
+            # the (user, title) unique constraint was violated, the title is already existing for this user
+            raise serializers.ValidationError(
+                {'title': 'Operation failed, there is an existing task with the same title.'})
+
+        # return the created task
+        return task
 
     # override the update method
     def update(self, instance, validated_data):
-        # get the fields you want to update
-        title = validated_data.get('title', instance.title)
-        description = validated_data.get('description', instance.description)
-        status = validated_data.get('status', instance.status)
-        deadline = validated_data.get('deadline', instance.deadline)
-        color = validated_data.get('color', instance.color)
-
-        # Check if there is a task with the same title, except for the current instance
-        if Task.objects.filter(title=title).exclude(pk=instance.pk).exists():
-            raise serializers.ValidationError(
-                {'title': 'Operation failed, there is an existing task with the same title.'})
+        # only the fields of the request are written, so that a concurrent archive or status change of the task is not
+        # overwritten with the values read before it
+        fields = [field for field in TASK_UPDATE_FIELDS if field in validated_data]
 
         # update the instance fields
-        instance.title = title
-        instance.description = description
-        instance.status = status
-        instance.deadline = deadline
-        instance.color = color
-
-        # save the instance
-        instance.save()
+        for field in fields:
+            setattr(instance, field, validated_data[field])
+
+        try:
+            # save the instance, the (user, title) unique constraint rejects a title used by another task of the same user
+            with transaction.atomic():
+                # lock the task and take the counters of the stored row, so that a concurrent change is not counted twice
+                stored = Task.objects.select_for_update().filter(pk=instance.pk).values('is_active', 'status').first()
+                if stored is None:
+                    raise NotFound('Task not found')
+                counts = get_counts(Task(**stored))
+                instance.is_active = stored['is_active']
+                if 'status' not in validated_data:
+                    instance.status = stored['status']
+                instance.save(update_fields=fields + ['modified'])
+                adjust_counters(instance.user_id, **get_count_changes(counts, get_counts(instance)))
+        except IntegrityError:
+            raise serializers.ValidationError(
+                {'title': 'Operation failed, there is an existing task with the same title.'})
 
         # return the updated instance
         return instance
 
 
+# the fields written by TaskSerializer.update()
+TASK_UPDATE_FIELDS = ['title', 'description', 'status', 'deadline', 'color']
+
+
+# serializer for the batch archive and activate of tasks, selects the tasks either by ids or by filters
+class TaskBatchSerializer(serializers.Serializer):
+    ids = serializers.ListField(child=serializers.UUIDField(), required=False, allow_empty=False)
+    overdue = serializers.BooleanField(required=False)
+    deadline_before = StrippedDateField(required=False)
+    status = StrippedCharField(required=False)
+
+    # require at least one selector so that a request without a body (or only with "overdue": false) does not update every task
+    # of the user. overdue and deadline_before are both a deadline filter, the second one would replace the first one.
+    def validate(self, res: OrderedDict):
+        if 'overdue' in res and 'deadline_before' in res:
+            raise serializers.ValidationError('Provide either overdue or deadline_before, not both')
+        if not self.build_filters(res):
+            raise serializers.ValidationError('Provide the ids of the tasks or at least one filter (overdue, deadline_before, status)')
+        return res
+
+    # converts the data into queryset filters
+    @staticmethod
+    def build_filters(data):
+        filters = {}
+        if 'ids' in data:
+            filters['id__in'] = data['ids']
+        if data.get('overdue'):
+            filters['deadline__lt'] = datetime.now().date()
+        if 'deadline_before' in data:
+            filters['deadline__lt'] = data['deadline_before']
+        if 'status' in data:
+            filters['status'] = data['status']
+        return filters
+
+    # converts the validated data into queryset filters
+    def get_filters(self):
+        return self.build_filters(self.validated_data)
+
+
 # serializer for Note
-class NoteSerializer(serializers.ModelSerializer):
+class NoteSerializer(TimedDataMixin, serializers.ModelSerializer):
 
     # declare user as read-only so that it is not required during deserialization
     title = StrippedCharField(required=True)
@@ -214,60 +304,107 @@ class NoteSerializer(serializers.ModelSerializer):
         # define the fields to be serialize/deserialize
         fields = ['title', 'content', 'color', 'created', 'modified', 'user']
         read_only_fields = ('user',)
+        list_serializer_class = TimedListSerializer
 
     # override the save method
     def save(self):
-        # get the 'title' validated data
-        title = self.validated_data['title']
-        # get all titles from Note model
-        all_titles = Note.objects.values_list('title', flat=True)
-
-        # loop through the all_titles list
-        for titles in all_titles:
-            # if the title is already existing
-            if title == titles:
-                # raise a ValidationError
-                raise serializers.ValidationError({'title': 'Operation failed, there is an existing note with the same title.'})
-            
         # create the note instance and populate the fields
         note = Note (
-            title = title,
+            title = self.validated_data['title'],
             description = self.validated_data['description'],
             color = self.validated_data['color'],
             user = self.validated_data['user']
         )
 
-        # save the created note
-        note.save()
+        try:
+            # save the created note, the savepoint keeps an outer transaction usable if the insert fails
+            with transaction.atomic():
+                note.save()
+                adjust_counters(note.user_id, **get_counts(note))
+        except IntegrityError:
+            # the (user, title) unique constraint was violated, the title is already existing for this user
+            raise serializers.ValidationError({'title': 'Operation failed, there is an existing note with the same title.'})
+
+        # return the created note
+        return note
 
     # override the update method
     def update(self, instance, validated_data):
-        # get the fields you want to update
-        title = validated_data.get('title', instance.title)
-        description = validated_data.get('description', instance.description)
-        color = validated_data.get('color', instance.color)
-
-        # Check if there is a note with the same title, except for the current instance
-        if Note.objects.filter(title=title).exclude(pk=instance.pk).exists():
-            raise serializers.ValidationError({'title', 'Operation failed, there is an existing note with the same title'})
-        
-        # update the instance fields
-        instance.title = title
-        instance.description = description
-        instance.color = color
+        # only the fields of the request are written, so that the values read before a concurrent change are not written back
+        fields = [field for field in ('title', 'description', 'color') if field in validated_data]
 
-        # save the instance
-        instance.save()
+        # update the instance fields
+        for field in fields:
+            setattr(instance, field, validated_data[field])
+
+        try:
+            # save the instance, the (user, title) unique constraint rejects a title used by another note of the same user
+            with transaction.atomic():
+                # lock the note, a note deleted by a concurrent request is not found instead of failing the save
+                if not Note.objects.select_for_update().filter(pk=instance.pk).exists():
+                    raise NotFound('Note not found')
+                instance.save(update_fields=fields + ['modified'])
+        except IntegrityError:
+            raise serializers.ValidationError({'title': 'Operation failed, there is an existing note with the same title.'})
 
         # return the updated instance
         return instance
     
 
 # serializer for user
-class UserSerializer(serializers.ModelSerializer):
+class UserSerializer(TimedDataMixin, serializers.ModelSerializer):
 
     class Meta:
         # define model
         model = User
         # define the fields to be serialize/deserialize
-        fields = ['username', 'first_name', 'last_name', 'email', 'is_superuser']
\ No newline at end of file
+        fields = ['username', 'first_name', 'last_name', 'email', 'is_superuser']
+        list_serializer_class = TimedListSerializer
+
+# read-only serializer for the list endpoints. It outputs the same JSON:API resource objects as the JSON:API renderer does with
+# the given serializer, but it reads .values() rows and uses a mapping of the fields that is computed once, instead of creating
+# a model instance and calling every field of the serializer and the renderer for every row.
+# The rows have to be rendered by the JSON:API renderer as plain data, e.g. Response(FastListSerializer(...).serialize(queryset))
+class FastListSerializer:
+
+    # fields whose to_representation() returns the value read from the database as it is
+    passthrough_fields = (serializers.CharField, serializers.ReadOnlyField, serializers.BooleanField)
+
+    def __init__(self, serializer_class):
+        self.resource_name = get_resource_type_from_serializer(serializer_class)
+        # (attribute name, lookup of .values(), converter or None, skip the attribute when the related object is missing)
+        self.fields = []
+        for name, field in serializer_class().fields.items():
+            if field.write_only or name == 'id':
+                continue
+            converter = None if isinstance(field, self.passthrough_fields) else field.to_representation
+            # like Field.get_attribute(), an attribute of a missing related object is left out
+            skip_missing = len(field.source_attrs) > 1 and not field.required and not field.allow_null
+            self.fields.append((name, '__'.join(field.source_attrs), converter, skip_missing))
+        self.names = list(format_field_names(OrderedDict((name, None) for name, _, _, _ in self.fields)))
+        self.lookups = ['pk'] + [lookup for _, lookup, _, _ in self.fields]
+
+    # the .values() queryset with the columns of the fields
+    def values(self, queryset):
+        return queryset.values(*self.lookups)
+
+    # builds the resource object of a .values() row
+    def to_resource(self, row):
+        attributes = OrderedDict()
+        for output_name, (_, lookup, converter, skip_missing) in zip(self.names, self.fields):
+            value = row[lookup]
+            if value is None:
+                if skip_missing:
+                    continue
+            elif converter is not None:
+                value = converter(value)
+            attributes[output_name] = value
+        return OrderedDict([('type', self.resource_name), ('id', str(row['pk'])), ('attributes', attributes)])
+
+    def to_resources(self, rows):
+        with timed('serializer'):
+            return [self.to_resource(row) for row in rows]
+
+    def serialize(self, queryset):
+        # the rows are read first so that the query is not counted in the serializer time
+        return self.to_resources(list(self.values(queryset)))
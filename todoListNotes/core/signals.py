@@ -1,17 +1,67 @@
 # import dependencies for postSave
-from django.db.models.signals           import post_save
+from django.db.models.signals           import post_save, post_delete
 from django.dispatch                    import receiver
 
 # import needed models
 from django.contrib.auth.models         import User
+from . models                           import Task, Note, Tombstone, UserCounters
 
 # import Token model from rest_framework
 from rest_framework.authtoken.models    import Token
 
+# import the cache invalidation of the token authentication and of the list responses
+from . authentication                   import invalidate_token
+from . response_cache                   import bump_list_version
+
 # This code sets up a signal handler using the @receiver decorator. The signal handler is triggered whenever a User instance is saved (either created or updated), and creates a new Token instance for that user
 @receiver(post_save, sender=User, weak=False)
 def generate_auth_token(sender, instance=None, created=False, **kwargs):
 
     # If the User instance was just created (i.e., created is True), the function creates a new Token instance for that user by calling Token.objects.create(user=instance). This creates a new token associated with the given user and saves it to the database.
     if created:
-        Token.objects.create(user=instance)
\ No newline at end of file
+        Token.objects.create(user=instance)
+
+
+# When a user is created, create its counters of tasks and notes so that the writes of the user only have to update them
+@receiver(post_save, sender=User, weak=False)
+def create_user_counters(sender, instance=None, created=False, **kwargs):
+    if created:
+        UserCounters.objects.create(user=instance)
+
+
+# When a token is rotated or deleted, remove it from the token authentication cache so that it cannot be used anymore
+@receiver(post_save, sender=Token, weak=False)
+@receiver(post_delete, sender=Token, weak=False)
+def invalidate_cached_token(sender, instance=None, **kwargs):
+    invalidate_token(instance.key)
+
+
+# When a user is updated (e.g. set_as_admin, set_as_normal_user or deactivated), remove the cached tokens of the user so that the next request loads the updated user
+@receiver(post_save, sender=User, weak=False)
+def invalidate_cached_user_tokens(sender, instance=None, created=False, **kwargs):
+    # a new user has no cached token yet
+    if not created:
+        for key in Token.objects.filter(user=instance).values_list('key', flat=True):
+            invalidate_token(key)
+        # the username is part of the cached task and note lists
+        bump_list_version(instance.pk)
+
+
+
+# When a task or note is deleted, record a tombstone so that the sync endpoint can tell the clients about the deletion
+@receiver(post_delete, sender=Task, weak=False)
+@receiver(post_delete, sender=Note, weak=False)
+def record_tombstone(sender, instance=None, origin=None, **kwargs):
+    # skip the rows without a user and the rows deleted together with their user, the user has no client left to sync
+    if instance.user_id is None or isinstance(origin, User) or getattr(origin, 'model', None) is User:
+        return
+    Tombstone.objects.create(user_id=instance.user_id, resource=sender._meta.model_name, object_id=instance.pk)
+
+
+# When a task or note is created, updated or deleted, invalidate the cached list responses of its user
+@receiver(post_save, sender=Task, weak=False)
+@receiver(post_save, sender=Note, weak=False)
+@receiver(post_delete, sender=Task, weak=False)
+@receiver(post_delete, sender=Note, weak=False)
+def invalidate_cached_lists(sender, instance=None, **kwargs):
+    bump_list_version(instance.user_id)
@@ -0,0 +1,99 @@
+# import dependencies from django
+from django.db                          import transaction
+from django.db.models                   import Count, Q, Sum
+from django.utils                       import timezone
+
+# import needed model/s
+from . models                           import Task, Note, TaskSummary, NoteSummary
+
+# import other dependencies
+from datetime                           import timedelta
+
+
+# Statistics of the task dashboards. Each table is aggregated with a single grouped query, either over the tasks and notes
+# themselves (Count) or over the summary tables (Sum of their count column), which have the same status/is_active/deadline
+# and color columns, so both sources go through the same functions.
+
+
+# the conditional aggregates of the tasks, grouped by status
+def get_task_stats(queryset, count, today):
+    # the current week ends on Sunday
+    end_of_week = today + timedelta(days=6 - today.weekday())
+    rows = queryset.values('status').annotate(
+        total=count(),
+        active=count(filter=Q(is_active=True)),
+        overdue=count(filter=Q(is_active=True, deadline__lt=today)),
+        due_this_week=count(filter=Q(is_active=True, deadline__gte=today, deadline__lte=end_of_week)),
+    ).order_by('status')
+
+    stats = {'total': 0, 'active': 0, 'archived': 0, 'overdue': 0, 'due_this_week': 0, 'by_status': {}}
+    for row in rows:
+        # Sum() of no rows is None
+        values = {key: row[key] or 0 for key in ('total', 'active', 'overdue', 'due_this_week')}
+        stats['by_status'][row['status']] = values['total']
+        stats['total'] += values['total']
+        stats['active'] += values['active']
+        stats['archived'] += values['total'] - values['active']
+        stats['overdue'] += values['overdue']
+        stats['due_this_week'] += values['due_this_week']
+    return stats
+
+
+# the number of notes, grouped by color
+def get_note_stats(queryset, count):
+    rows = queryset.values('color').annotate(total=count()).order_by('color')
+    by_color = {row['color']: row['total'] or 0 for row in rows}
+    return {'total': sum(by_color.values()), 'by_color': by_color}
+
+
+def count_rows(**kwargs):
+    return Count('pk', **kwargs)
+
+
+def sum_counts(**kwargs):
+    return Sum('count', **kwargs)
+
+
+# the statistics of the tasks and notes of a user
+def get_user_stats(user):
+    today = timezone.localdate()
+    return {
+        'tasks': get_task_stats(Task.objects.filter(user=user), count_rows, today),
+        'notes': get_note_stats(Note.objects.filter(user=user), count_rows),
+    }
+
+
+# the statistics of all the tasks and notes, from the summary tables if use_summary is True
+def get_global_stats(use_summary):
+    today = timezone.localdate()
+    if not use_summary:
+        return {
+            'tasks': get_task_stats(Task.objects.all(), count_rows, today),
+            'notes': get_note_stats(Note.objects.all(), count_rows),
+        }
+    return {
+        'tasks': get_task_stats(TaskSummary.objects.all(), sum_counts, today),
+        'notes': get_note_stats(NoteSummary.objects.all(), sum_counts),
+        # the summary is as recent as its last refresh
+        'refreshed': TaskSummary.objects.order_by('-refreshed').values_list('refreshed', flat=True).first(),
+    }
+
+
+# rebuilds the summary tables with one grouped query per table, the readers see either the old or the new summary
+def refresh_summary():
+    now = timezone.now()
+    task_rows = Task.objects.values('status', 'is_active', 'deadline').annotate(total=Count('pk')).order_by()
+    note_rows = Note.objects.values('color').annotate(total=Count('pk')).order_by()
+
+    with transaction.atomic():
+        TaskSummary.objects.all().delete()
+        NoteSummary.objects.all().delete()
+        TaskSummary.objects.bulk_create([
+            TaskSummary(status=row['status'], is_active=row['is_active'], deadline=row['deadline'], count=row['total'], refreshed=now)
+            for row in task_rows
+        ])
+        NoteSummary.objects.bulk_create([
+            NoteSummary(color=row['color'], count=row['total'], refreshed=now)
+            for row in note_rows
+        ])
+    return len(task_rows), len(note_rows)
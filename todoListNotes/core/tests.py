@@ -1,3 +1,1215 @@
-from django.test import TestCase
+# import dependencies for testing
+from django.test                        import TestCase, RequestFactory, override_settings
+from django.core.cache                  import cache
+from django.urls                        import reverse, resolve
+from django.utils                       import timezone
+from django.db                          import connection, transaction
+from django.db.models                   import QuerySet
+from django.test.utils                  import CaptureQueriesContext
+from django.core.management             import call_command
 
-# Create your tests here.
+# import dependencies from rest_framework
+from rest_framework.test                import APIClient
+from rest_framework.authtoken.models    import Token
+
+# import needed model/s
+from django.contrib.auth.models         import User
+from . models                           import Task, Note, Tombstone
+from . authentication                   import local_cache
+from . serializers                      import TaskSerializer, FastListSerializer
+from . views                            import TaskViewSet, NoteViewSet, set_task_active
+from . counters                         import delete_counted
+from . metrics                          import registry
+from . middleware                       import MetricsMiddleware
+from . throttling                       import get_store, limiter
+from . query_detector                   import QueryAssertionsMixin, detect_queries, detect_query
+from . hashing                          import get_pool, shutdown_pools
+from . handlers                         import StreamingASGIHandler
+from django.core.signals                import request_started, request_finished
+from django.db                          import close_old_connections
+from django.contrib.auth.hashers        import make_password
+from django.contrib.auth                import authenticate
+
+# import the id generators from utils
+from utils.ids                          import uuid7, generate_id
+
+# import other dependencies
+from datetime                           import date, timedelta
+from io                                 import StringIO
+from unittest                           import mock
+from asgiref.sync                       import async_to_sync
+import csv
+import io
+import json
+import os
+import time
+
+
+# base test case that creates an authenticated client for a normal user
+# the list response cache is disabled since TestCase never commits, see ResponseCacheTests for the cache itself
+# the rate limits are disabled so that a test can send many requests, see RateLimitTests for the limits themselves
+@override_settings(RESPONSE_CACHE={'ENABLED': False}, RATE_LIMITS={'ENABLED': False})
+class APITestBase(QueryAssertionsMixin, TestCase):
+    def setUp(self):
+        # start every test with empty token authentication and response caches, and full rate limit buckets
+        local_cache.clear()
+        cache.clear()
+        get_store().clear()
+        # the post_save signal creates the token of the user
+        self.user = User.objects.create_user(username='johndoe', password='johndoe1')
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION=f'Token {Token.objects.get(user=self.user).key}')
+        self.deadline = (date.today() + timedelta(days=7)).strftime('%Y-%m-%d')
+
+    # helper to send a JSON body to the views that parse the request body themselves
+    def send(self, method, url, data):
+        return getattr(self.client, method)(url, data=json.dumps(data), content_type='application/json')
+
+    # helper that sends a GET request through the ASGI handler of the ASGI deployment, returns (status, body)
+    def asgi_get(self, path, query_string=''):
+        scope = {
+            'type': 'http', 'asgi': {'version': '3.0'}, 'http_version': '1.1', 'method': 'GET', 'scheme': 'http',
+            'path': path, 'raw_path': path.encode('ascii'), 'query_string': query_string.encode('ascii'), 'root_path': '',
+            'headers': [(b'host', b'testserver'), (b'authorization', self.client._credentials['HTTP_AUTHORIZATION'].encode('ascii'))],
+            'client': ('127.0.0.1', 0), 'server': ('testserver', 80),
+        }
+        messages = []
+
+        async def receive():
+            return {'type': 'http.request', 'body': b'', 'more_body': False}
+
+        async def send(message):
+            messages.append(message)
+
+        # like the test client, the handler must not close the connection of the test transaction
+        request_started.disconnect(close_old_connections)
+        request_finished.disconnect(close_old_connections)
+        try:
+            async_to_sync(StreamingASGIHandler())(scope, receive, send)
+        finally:
+            request_started.connect(close_old_connections)
+            request_finished.connect(close_old_connections)
+        body = b''.join(message.get('body', b'') for message in messages if message['type'] == 'http.response.body')
+        return messages[0]['status'], body
+
+    # helper that sends the same GET request before and after add_rows() is called and asserts that
+    # the number of queries does not grow with the number of rows, i.e. there is no N+1 query
+    def assertQueryCountIsConstant(self, url, add_rows, max_queries=None):
+        # warm up the token authentication cache so that both requests are measured the same way
+        self.client.get(url)
+        with CaptureQueriesContext(connection) as before:
+            self.assertEqual(self.client.get(url).status_code, 200)
+        add_rows()
+        with CaptureQueriesContext(connection) as after:
+            self.assertEqual(self.client.get(url).status_code, 200)
+        self.assertEqual(len(before), len(after), f'{url} ran {len(after)} queries instead of {len(before)}')
+        if max_queries is not None:
+            self.assertLessEqual(len(after), max_queries)
+
+    # helper to create a task through the API
+    def create_task(self, title, **kwargs):
+        data = {'title': title, 'description': 'desc', 'deadline': self.deadline, 'color': 'blue'}
+        data.update(kwargs)
+        return self.send('post', reverse('task-list'), data)
+
+    # helper to create a note through the API
+    def create_note(self, title, **kwargs):
+        data = {'title': title, 'content': 'content', 'color': 'blue'}
+        data.update(kwargs)
+        return self.send('post', reverse('note-list'), data)
+
+
+# tests for the (user, title) unique constraint on tasks and notes
+class TitleUniquenessTests(APITestBase):
+    def test_duplicate_task_title_is_rejected_for_the_same_user(self):
+        self.assertEqual(self.create_task('Wash the dishes').status_code, 201)
+        response = self.create_task('Wash the dishes')
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(Task.objects.filter(user=self.user).count(), 1)
+
+    def test_same_task_title_is_allowed_for_another_user(self):
+        other = User.objects.create_user(username='janedoe', password='janedoe1')
+        Task.objects.create(title='Wash the dishes', deadline=date.today(), user=other)
+        self.assertEqual(self.create_task('Wash the dishes').status_code, 201)
+
+    def test_updating_task_to_an_existing_title_is_rejected(self):
+        self.create_task('Wash the dishes')
+        self.create_task('Cook dinner')
+        task = Task.objects.get(title='Cook dinner')
+        response = self.send('patch', reverse('task-detail', args=[task.pk]), {'title': 'Wash the dishes'})
+        self.assertEqual(response.status_code, 400)
+        task.refresh_from_db()
+        self.assertEqual(task.title, 'Cook dinner')
+
+    def test_duplicate_note_title_is_rejected_for_the_same_user(self):
+        self.assertEqual(self.create_note('Django tips').status_code, 200)
+        self.assertEqual(self.create_note('Django tips').status_code, 400)
+        self.assertEqual(Note.objects.filter(user=self.user).count(), 1)
+
+
+# tests for the keyset pagination of the admin endpoints
+class AdminPaginationTests(APITestBase):
+    def setUp(self):
+        super().setUp()
+        self.user.is_superuser = True
+        self.user.save()
+        for index in range(5):
+            Task.objects.create(title=f'Task {index}', deadline=date.today(), user=self.user)
+        # identical created timestamps force the id to break the ties
+        Task.objects.update(created=timezone.now())
+
+    def test_pages_follow_the_next_link_until_exhausted(self):
+        seen = []
+        url = reverse('all_task') + '?page[size]=2'
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            body = response.json()
+            self.assertLessEqual(len(body['data']), 2)
+            seen += [item['attributes']['title'] for item in body['data']]
+            url = body['links']['next']
+        self.assertEqual(sorted(seen), [f'Task {index}' for index in range(5)])
+
+    def test_invalid_cursor_returns_404(self):
+        response = self.client.get(reverse('all_task') + '?page[cursor]=not-a-cursor')
+        self.assertEqual(response.status_code, 404)
+
+    def test_page_size_is_capped(self):
+        with self.settings(PAGINATION_MAX_PAGE_SIZE=3):
+            response = self.client.get(reverse('all_task') + '?page[size]=50')
+        self.assertEqual(len(response.json()['data']), 3)
+
+    def test_next_page_starts_a_range_scan_of_the_index(self):
+        url = self.client.get(reverse('all_task') + '?page[size]=2').json()['links']['next']
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get(url)
+        sql = next(query['sql'] for query in queries if 'FROM "core_task"' in query['sql'])
+        # the redundant bound on the first ordering field, the OR expansion alone cannot start an index scan
+        self.assertIn('"core_task"."created" >= ', sql)
+        if connection.vendor == 'sqlite':
+            with connection.cursor() as cursor:
+                cursor.execute('EXPLAIN QUERY PLAN ' + sql)
+                plan = ' '.join(row[-1] for row in cursor.fetchall())
+            self.assertIn('USING INDEX task_created_id_idx (created>?)', plan)
+
+
+# tests for the number of queries of the list endpoints
+class QueryCountTests(APITestBase):
+    def setUp(self):
+        super().setUp()
+        self.user.is_superuser = True
+        self.user.save()
+        self.count = 0
+
+    def add_tasks(self):
+        for _ in range(3):
+            self.count += 1
+            Task.objects.create(title=f'Task {self.count}', deadline=date.today(), user=self.user)
+
+    def add_notes(self):
+        for _ in range(3):
+            self.count += 1
+            Note.objects.create(title=f'Note {self.count}', user=self.user)
+
+    def test_task_list(self):
+        self.add_tasks()
+        self.assertQueryCountIsConstant(reverse('task-list'), self.add_tasks, max_queries=2)
+
+    def test_note_list(self):
+        self.add_notes()
+        self.assertQueryCountIsConstant(reverse('note-list'), self.add_notes, max_queries=2)
+
+    def test_all_tasks(self):
+        self.add_tasks()
+        self.assertQueryCountIsConstant(reverse('all_task'), self.add_tasks, max_queries=1)
+
+    def test_all_notes(self):
+        self.add_notes()
+        self.assertQueryCountIsConstant(reverse('all_notes'), self.add_notes, max_queries=1)
+
+    def test_task_retrieve(self):
+        task = Task.objects.create(title='Task', deadline=date.today(), user=self.user)
+        # authentication, conditional GET validator and the task itself
+        with self.assertNumQueries(3):
+            self.client.get(reverse('task-detail', args=[task.pk]))
+
+
+# tests for the cached token authentication
+class CachedTokenAuthenticationTests(APITestBase):
+    def test_cached_token_skips_the_database(self):
+        self.client.get(reverse('task-list'))
+        # only the conditional GET validator and the task query are left once the token is cached
+        with self.assertNumQueries(2):
+            self.client.get(reverse('task-list'))
+
+    def test_deleted_token_is_rejected(self):
+        self.assertEqual(self.client.get(reverse('task-list')).status_code, 200)
+        Token.objects.filter(user=self.user).delete()
+        # queryset.delete() sends post_delete for every token
+        self.assertEqual(self.client.get(reverse('task-list')).status_code, 401)
+
+    def test_user_changes_invalidate_the_cache(self):
+        self.assertEqual(self.client.get(reverse('all_task')).status_code, 403)
+        self.user.is_superuser = True
+        self.user.save()
+        self.assertEqual(self.client.get(reverse('all_task')).status_code, 200)
+        self.user.is_active = False
+        self.user.save()
+        self.assertEqual(self.client.get(reverse('task-list')).status_code, 401)
+
+    def test_shared_cache_invalidation_reaches_the_other_processes(self):
+        with self.settings(TOKEN_AUTH_CACHE={'CACHE_ALIAS': 'default', 'TTL': 300, 'LOCAL_TTL': 5}):
+            self.assertEqual(self.client.get(reverse('task-list')).status_code, 200)
+            # another process deletes the token, only the shared cache is invalidated
+            key = Token.objects.get(user=self.user).key
+            Token.objects.filter(key=key)._raw_delete(connection.alias)
+            cache.delete(f'auth-token:{key}')
+            # the copy of this process expires after LOCAL_TTL instead of TTL
+            now = time.monotonic()
+            with mock.patch('utils.cache.time.monotonic', return_value=now + 6):
+                self.assertEqual(self.client.get(reverse('task-list')).status_code, 401)
+
+    def test_demotion_by_another_process_expires_without_a_shared_cache(self):
+        self.user.is_superuser = True
+        self.user.save()
+        self.assertEqual(self.client.get(reverse('all_task')).status_code, 200)
+        # another process demotes the user, the save() signal only invalidates the cache of that process
+        User.objects.filter(pk=self.user.pk).update(is_superuser=False)
+        now = time.monotonic()
+        with mock.patch('utils.cache.time.monotonic', return_value=now + 6):
+            self.assertEqual(self.client.get(reverse('all_task')).status_code, 403)
+
+
+# tests for the ordering of the list endpoints
+class ListOrderingTests(APITestBase):
+    def test_tasks_are_listed_by_creation_date(self):
+        for title in ['First', 'Second', 'Third']:
+            Task.objects.create(title=title, deadline=date.today(), user=self.user)
+        response = self.client.get(reverse('task-list'))
+        self.assertEqual([item['attributes']['title'] for item in response.json()['data']], ['First', 'Second', 'Third'])
+
+
+# tests for the time ordered primary keys
+class TimeOrderedIdTests(TestCase):
+    def test_uuid7_is_sorted_by_creation(self):
+        ids = [uuid7() for _ in range(10000)]
+        self.assertEqual(ids, sorted(ids))
+        self.assertEqual(len(set(ids)), len(ids))
+        self.assertTrue(all(value.version == 7 for value in ids))
+
+    def test_uuid4_can_be_restored(self):
+        with self.settings(MODEL_ID_VERSION='uuid4'):
+            self.assertEqual(generate_id().version, 4)
+
+    def test_tasks_get_uuid7_ids_and_keep_the_uuid_routes(self):
+        task = Task.objects.create(title='Task', deadline=date.today())
+        self.assertEqual(task.id.version, 7)
+        self.assertEqual(resolve(f'/tasks/archive/{task.id}').kwargs['pk'], task.id)
+
+
+# tests for the bulk task and note endpoints
+class BulkTests(APITestBase):
+    def task(self, title, **kwargs):
+        data = {'title': title, 'description': 'desc', 'deadline': self.deadline, 'color': 'blue'}
+        data.update(kwargs)
+        return data
+
+    def test_bulk_create_writes_all_tasks_in_a_fixed_number_of_queries(self):
+        self.client.get(reverse('task-list'))
+        items = [{'type': 'Task', 'attributes': self.task(f'Task {index}')} for index in range(20)]
+        # title check, savepoint, insert, counters update, release
+        with self.assertNumQueries(5):
+            response = self.send('post', reverse('task-bulk'), {'data': items})
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(Task.objects.filter(user=self.user).count(), 20)
+
+    def test_bulk_create_reports_errors_per_item_and_writes_nothing(self):
+        Task.objects.create(title='Existing', deadline=date.today(), user=self.user)
+        items = [self.task('New'), self.task('Existing'), self.task('Past', deadline='2000-01-01'), self.task('New')]
+        response = self.send('post', reverse('task-bulk'), items)
+        self.assertEqual(response.status_code, 400)
+        pointers = [error['source']['pointer'] for error in response.json()['errors']]
+        self.assertEqual(pointers, ['/data/1/attributes/title', '/data/2', '/data/3/attributes/title'])
+        self.assertEqual(Task.objects.filter(user=self.user).count(), 1)
+
+    def test_bulk_update_and_delete(self):
+        first = Task.objects.create(title='First', deadline=date.today(), user=self.user)
+        second = Task.objects.create(title='Second', deadline=date.today(), user=self.user)
+        response = self.send('patch', reverse('task-bulk'), [
+            {'id': str(first.id), 'status': 'Completed'},
+            {'id': str(second.id), 'title': 'Renamed'},
+        ])
+        self.assertEqual(response.status_code, 200)
+        first.refresh_from_db()
+        second.refresh_from_db()
+        self.assertEqual((first.status, second.title), ('Completed', 'Renamed'))
+        self.assertGreater(first.modified, first.created)
+
+        response = self.send('delete', reverse('task-bulk'), {'data': [{'type': 'Task', 'id': str(first.id)}, str(second.id)]})
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(Task.objects.exists())
+
+    def test_bulk_operations_only_touch_the_tasks_of_the_user(self):
+        other = User.objects.create_user(username='janedoe', password='janedoe1')
+        task = Task.objects.create(title='Other', deadline=date.today(), user=other)
+        response = self.send('delete', reverse('task-bulk'), [str(task.id)])
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json()['errors'][0]['status'], '404')
+        self.assertTrue(Task.objects.filter(pk=task.pk).exists())
+
+    def test_bulk_create_notes(self):
+        items = [{'title': f'Note {index}', 'content': 'content', 'color': 'red'} for index in range(3)]
+        response = self.send('post', reverse('note-bulk'), items)
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(list(Note.objects.values_list('description', flat=True)), ['content'] * 3)
+
+
+# tests for the archive and activate endpoints
+class ArchiveTests(APITestBase):
+    def setUp(self):
+        super().setUp()
+        self.overdue = Task.objects.create(title='Overdue', deadline=date.today() - timedelta(days=1), user=self.user)
+        self.upcoming = Task.objects.create(title='Upcoming', deadline=date.today() + timedelta(days=1), user=self.user)
+
+    def test_batch_archive_of_overdue_tasks_is_a_single_update(self):
+        self.client.get(reverse('task-list'))
+        # savepoint, the update of the tasks and of the counters, release
+        with self.assertNumQueries(4):
+            response = self.send('patch', reverse('archive_tasks'), {'overdue': True})
+        self.assertEqual(response.json()['data']['count'], 1)
+        self.assertEqual(list(Task.objects.filter(is_active=False)), [self.overdue])
+
+    def test_batch_activate_by_ids_counts_only_changed_tasks(self):
+        Task.objects.update(is_active=False)
+        response = self.send('patch', reverse('activate_tasks'), {'ids': [str(self.overdue.id), str(self.upcoming.id)]})
+        self.assertEqual(response.json()['data']['count'], 2)
+        response = self.send('patch', reverse('activate_tasks'), {'ids': [str(self.overdue.id)]})
+        self.assertEqual(response.json()['data']['count'], 0)
+
+    def test_batch_requires_a_selector(self):
+        self.assertEqual(self.send('patch', reverse('archive_tasks'), {}).status_code, 400)
+        # a false overdue is not a filter
+        self.assertEqual(self.send('patch', reverse('archive_tasks'), {'overdue': False}).status_code, 400)
+        # both are a deadline filter
+        data = {'overdue': True, 'deadline_before': self.deadline}
+        self.assertEqual(self.send('patch', reverse('archive_tasks'), data).status_code, 400)
+        self.assertEqual(Task.objects.filter(is_active=True).count(), 2)
+
+    def test_single_archive_is_limited_to_the_tasks_of_the_user(self):
+        other = User.objects.create_user(username='janedoe', password='janedoe1')
+        task = Task.objects.create(title='Other', deadline=date.today(), user=other)
+        self.assertEqual(self.client.patch(f'/tasks/archive/{task.id}').status_code, 404)
+        self.assertEqual(self.client.patch(f'/tasks/archive/{self.upcoming.id}').status_code, 200)
+        self.upcoming.refresh_from_db()
+        self.assertFalse(self.upcoming.is_active)
+
+
+# tests for the conditional GET support of the task and note endpoints
+class ConditionalGetTests(APITestBase):
+    def setUp(self):
+        super().setUp()
+        self.task = Task.objects.create(title='Task', deadline=date.today(), user=self.user)
+
+    def test_list_returns_304_while_nothing_changed(self):
+        etag = self.client.get(reverse('task-list'))['ETag']
+        # the 304 is answered with the authentication and the aggregate query only
+        with self.assertNumQueries(1):
+            response = self.client.get(reverse('task-list'), HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.content, b'')
+
+        self.client.patch(f'/tasks/archive/{self.task.id}')
+        self.assertEqual(self.client.get(reverse('task-list'), HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+    def test_list_etag_changes_when_a_row_is_deleted(self):
+        Task.objects.create(title='Second', deadline=date.today(), user=self.user)
+        etag = self.client.get(reverse('task-list'))['ETag']
+        self.task.delete()
+        self.assertEqual(self.client.get(reverse('task-list'), HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+    def test_detail_supports_last_modified(self):
+        response = self.client.get(reverse('task-detail', args=[self.task.pk]))
+        self.assertIn('private', response['Cache-Control'])
+        response = self.client.get(reverse('task-detail', args=[self.task.pk]), HTTP_IF_MODIFIED_SINCE=response['Last-Modified'])
+        self.assertEqual(response.status_code, 304)
+
+    def test_detail_of_another_user_is_still_404(self):
+        other = User.objects.create_user(username='janedoe', password='janedoe1')
+        note = Note.objects.create(title='Note', user=other)
+        self.assertEqual(self.client.get(reverse('note-detail', args=[note.pk])).status_code, 404)
+
+
+# tests for the delta sync endpoint
+class SyncTests(APITestBase):
+    def test_sync_returns_only_the_changes_since_the_watermark(self):
+        kept = Task.objects.create(title='Kept', deadline=date.today(), user=self.user)
+        removed = Task.objects.create(title='Removed', deadline=date.today(), user=self.user)
+        body = self.client.get(reverse('sync')).json()['data']
+        self.assertTrue(body['full'])
+        self.assertEqual(len(body['tasks']), 2)
+
+        with self.settings(SYNC_WATERMARK_LAG_SECONDS=0):
+            watermark = self.client.get(reverse('sync')).json()['data']['watermark']
+        note = Note.objects.create(title='New note', user=self.user)
+        self.send('delete', reverse('task-detail', args=[removed.pk]), {})
+
+        body = self.client.get(reverse('sync'), {'since': watermark}).json()['data']
+        self.assertFalse(body['full'])
+        self.assertEqual(body['tasks'], [])
+        self.assertEqual([item['id'] for item in body['notes']], [str(note.pk)])
+        self.assertEqual(body['deleted'], {'tasks': [str(removed.pk)], 'notes': []})
+        self.assertTrue(Task.objects.filter(pk=kept.pk).exists())
+
+    def test_invalid_watermark_is_rejected(self):
+        self.assertEqual(self.client.get(reverse('sync'), {'since': 'yesterday'}).status_code, 400)
+
+    def test_deleting_a_user_does_not_record_tombstones(self):
+        Task.objects.create(title='Task', deadline=date.today(), user=self.user)
+        self.user.delete()
+        self.assertFalse(Tombstone.objects.exists())
+
+
+# tests for the per user list response cache
+@override_settings(RESPONSE_CACHE={'ENABLED': True})
+class ResponseCacheTests(APITestBase):
+    def setUp(self):
+        super().setUp()
+        self.task = Task.objects.create(title='Task', deadline=date.today(), user=self.user)
+
+    def test_repeated_list_is_served_without_queries(self):
+        first = self.client.get(reverse('task-list'))
+        with self.assertNumQueries(0):
+            second = self.client.get(reverse('task-list'))
+            not_modified = self.client.get(reverse('task-list'), HTTP_IF_NONE_MATCH=first['ETag'])
+        self.assertEqual(second.content, first.content)
+        self.assertEqual(second['ETag'], first['ETag'])
+        self.assertEqual(not_modified.status_code, 304)
+
+    def test_writes_invalidate_the_cached_lists_of_the_user(self):
+        self.client.get(reverse('task-list'))
+        with self.captureOnCommitCallbacks(execute=True):
+            self.create_task('Second')
+        self.assertEqual(len(self.client.get(reverse('task-list')).json()['data']), 2)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.send('patch', reverse('archive_tasks'), {'ids': [str(self.task.id)]})
+        titles = [item['attributes']['title'] for item in self.client.get(reverse('task-list')).json()['data'] if not item['attributes']['is_active']]
+        self.assertEqual(titles, ['Task'])
+
+    def test_query_parameters_are_part_of_the_key(self):
+        Task.objects.create(title='Another', deadline=date.today(), user=self.user)
+        ascending = self.client.get(reverse('task-list') + '?sort=title').json()['data']
+        descending = self.client.get(reverse('task-list') + '?sort=-title').json()['data']
+        self.assertEqual([item['attributes']['title'] for item in ascending], ['Another', 'Task'])
+        self.assertEqual([item['attributes']['title'] for item in descending], ['Task', 'Another'])
+
+
+# tests for the async views of the ASGI deployment, every response is compared to the one of the sync view
+class AsyncViewTests(APITestBase):
+    def setUp(self):
+        super().setUp()
+        self.task = Task.objects.create(title='Task', deadline=date.today(), user=self.user)
+        self.note = Note.objects.create(title='Note', description='content', user=self.user)
+
+    # sends the same request to the sync and to the async URL configuration
+    def request_both(self, method, url, data=None, **extra):
+        responses = []
+        for urlconf in ('todoListNotes.urls', 'todoListNotes.asgi_urls'):
+            with self.settings(ROOT_URLCONF=urlconf):
+                kwargs = {'data': json.dumps(data), 'content_type': 'application/json'} if data is not None else {}
+                responses.append(getattr(self.client, method)(url, **kwargs, **extra))
+        return responses
+
+    def assertSameResponse(self, method, url, data=None, **extra):
+        sync_response, async_response = self.request_both(method, url, data, **extra)
+        self.assertEqual(async_response.status_code, sync_response.status_code)
+        self.assertEqual(async_response.get('Content-Type'), sync_response.get('Content-Type'))
+        self.assertEqual(async_response.content, sync_response.content)
+        return async_response
+
+    def test_asgi_settings_close_the_connections(self):
+        from todoListNotes import settings_asgi, settings as wsgi_settings
+        self.assertEqual(settings_asgi.DATABASES['default']['CONN_MAX_AGE'], 0)
+        # the settings of the WSGI deployment are not changed
+        self.assertEqual(wsgi_settings.DATABASES['default']['CONN_MAX_AGE'], int(os.environ.get('DB_CONN_MAX_AGE', 600)))
+
+    def test_lists_and_details_match_the_sync_views(self):
+        with self.settings(ROOT_URLCONF='todoListNotes.asgi_urls'):
+            self.assertEqual(resolve('/task/').func.__module__, 'core.async_views')
+        self.assertSameResponse('get', '/task/')
+        self.assertSameResponse('get', '/note/')
+        response = self.assertSameResponse('get', f'/task/{self.task.pk}/')
+        self.assertSameResponse('get', f'/note/{self.note.pk}/')
+        self.assertSameResponse('get', f'/task/{self.task.pk}/', HTTP_IF_NONE_MATCH=response['ETag'])
+        # not found, filters and a missing token are handled by the sync views
+        self.assertSameResponse('get', f'/task/{uuid7()}/')
+        self.assertSameResponse('get', '/task/?filter[search]=Task')
+        self.client.credentials()
+        self.assertSameResponse('get', '/task/')
+
+    def test_create_matches_the_sync_views(self):
+        with self.settings(ROOT_URLCONF='todoListNotes.asgi_urls'):
+            response = self.create_task('Async task')
+            self.assertEqual(response.status_code, 201)
+            self.assertEqual(response.json()['data']['details']['title'], 'Async task')
+            self.assertEqual(self.create_note('Async note').status_code, 200)
+        self.assertTrue(Task.objects.filter(user=self.user, title='Async task').exists())
+        # the errors are returned by the sync views
+        self.assertSameResponse('post', '/task/', {'title': 'Task', 'description': 'desc', 'deadline': self.deadline, 'color': 'blue'})
+        self.assertSameResponse('post', '/note/', {'title': 'Note'})
+
+    def test_login_matches_the_sync_view(self):
+        self.assertSameResponse('post', '/users/login', {'username': 'johndoe', 'password': 'johndoe1'})
+        self.assertSameResponse('post', '/users/login', {'username': 'johndoe', 'password': 'wrong'})
+        self.assertSameResponse('post', '/users/login', {'username': ' johndoe ', 'password': 'johndoe1'})
+        self.assertSameResponse('post', '/users/login', {'username': 'nobody', 'password': 'johndoe1'})
+        self.assertSameResponse('post', '/users/login', {'username': 'johndoe'})
+
+    def test_admin_lists_match_the_sync_views(self):
+        self.assertSameResponse('get', '/all_tasks')
+        self.user.is_superuser = True
+        self.user.save()
+        Task.objects.create(title='Second', deadline=date.today(), user=self.user)
+        self.assertSameResponse('get', '/all_tasks?page[size]=1')
+        self.assertSameResponse('get', '/all_notes')
+        self.assertSameResponse('get', '/all_users')
+        self.assertSameResponse('get', '/all_tasks?page[cursor]=not-a-cursor')
+
+
+# tests for the streaming exports of the admin endpoints
+class ExportTests(APITestBase):
+    def setUp(self):
+        super().setUp()
+        self.user.is_superuser = True
+        self.user.save()
+        for index in range(5):
+            Task.objects.create(title=f'Task {index}', deadline=date.today(), user=self.user)
+
+    def test_json_export_streams_every_row_in_chunks(self):
+        with self.settings(EXPORT_CHUNK_SIZE=2):
+            response = self.client.get(reverse('export', args=['tasks']))
+            self.assertTrue(response.streaming)
+            rows = json.loads(b''.join(response.streaming_content))
+        self.assertEqual([row['title'] for row in rows], [f'Task {index}' for index in range(5)])
+        self.assertEqual(rows[0]['user'], 'johndoe')
+        self.assertEqual(rows[0]['id'], str(Task.objects.order_by('created', 'id').first().pk))
+
+    def test_ndjson_export_has_one_row_per_line(self):
+        response = self.client.get(reverse('export', args=['users']), {'output': 'ndjson'})
+        self.assertEqual(response['Content-Type'], 'application/x-ndjson')
+        lines = b''.join(response.streaming_content).decode('utf-8').splitlines()
+        self.assertEqual([json.loads(line)['username'] for line in lines], ['johndoe'])
+
+    def test_export_through_the_asgi_handler(self):
+        with self.settings(EXPORT_CHUNK_SIZE=2):
+            status_code, body = self.asgi_get('/export/tasks')
+        self.assertEqual(status_code, 200)
+        self.assertEqual([row['title'] for row in json.loads(body)], [f'Task {index}' for index in range(5)])
+        status_code, body = self.asgi_get('/export/users', 'output=ndjson')
+        self.assertEqual([json.loads(line)['username'] for line in body.decode('utf-8').splitlines()], ['johndoe'])
+
+    def test_empty_export_is_valid_json(self):
+        response = self.client.get(reverse('export', args=['notes']))
+        self.assertEqual(json.loads(b''.join(response.streaming_content)), [])
+
+    def test_invalid_requests(self):
+        self.assertEqual(self.client.get(reverse('export', args=['tokens'])).status_code, 404)
+        self.assertEqual(self.client.get(reverse('export', args=['tasks']), {'output': 'xml'}).status_code, 400)
+        self.user.is_superuser = False
+        self.user.save()
+        self.assertEqual(self.client.get(reverse('export', args=['tasks'])).status_code, 403)
+
+
+# tests for the bulk CSV export and import of tasks and notes
+class CSVTransferTests(APITestBase):
+    def setUp(self):
+        super().setUp()
+        self.user.is_superuser = True
+        self.user.save()
+        Task.objects.create(title='Task, with comma', description='', deadline=date.today(), user=self.user)
+        Task.objects.create(title='Second', description='multi\nline', deadline=date.today(), color=None, user=self.user)
+
+    def export_csv(self):
+        response = self.client.get(reverse('export', args=['tasks']), {'output': 'csv'})
+        self.assertEqual(response['Content-Type'], 'text/csv')
+        return b''.join(response.streaming_content)
+
+    def import_csv(self, content):
+        return self.client.post(reverse('import', args=['tasks']), data=content, content_type='text/csv')
+
+    def test_csv_export_through_the_asgi_handler(self):
+        with self.settings(EXPORT_CHUNK_SIZE=1):
+            status_code, body = self.asgi_get('/export/tasks', 'output=csv')
+        self.assertEqual(status_code, 200)
+        self.assertEqual(body, self.export_csv())
+        self.assertEqual(len(list(csv.reader(io.StringIO(body.decode('utf-8'))))), 3)
+
+    def test_export_then_import_restores_the_rows(self):
+        rows = list(Task.objects.order_by('created', 'id').values())
+        content = self.export_csv()
+        Task.objects.all().delete()
+
+        started = timezone.now()
+        response = self.import_csv(content)
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.json()['data']['count'], 2)
+        restored = list(Task.objects.order_by('created', 'id').values())
+        # the imported rows are modified at the time of the import
+        for row in restored:
+            self.assertGreaterEqual(row.pop('modified'), started)
+        for row in rows:
+            del row['modified']
+        # the empty description of the first task is a nullable column, so it comes back as NULL
+        rows[0]['description'] = None
+        self.assertEqual(restored, rows)
+
+    def test_sync_returns_the_imported_rows(self):
+        content = self.export_csv()
+        Task.objects.all().delete()
+        with self.settings(SYNC_WATERMARK_LAG_SECONDS=0):
+            watermark = self.client.get(reverse('sync')).json()['data']['watermark']
+
+        self.assertEqual(self.import_csv(content).status_code, 201)
+        body = self.client.get(reverse('sync'), {'since': watermark}).json()['data']
+        self.assertFalse(body['full'])
+        self.assertEqual(sorted(item['id'] for item in body['tasks']), sorted(str(pk) for pk in Task.objects.values_list('pk', flat=True)))
+        # the rows imported again are not reported as deleted anymore
+        self.assertEqual(body['deleted'], {'tasks': [], 'notes': []})
+
+    def test_failed_import_does_not_insert_any_row(self):
+        content = self.export_csv()
+        Task.objects.filter(title='Second').delete()
+        # the first row already exists, so the whole file is rejected
+        response = self.import_csv(content)
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(Task.objects.count(), 1)
+
+    def test_invalid_files_are_rejected(self):
+        self.assertEqual(self.import_csv(b'title,description\nTask,desc\n').status_code, 400)
+        header = self.export_csv().split(b'\n')[0]
+        response = self.import_csv(header + b'\nnot-a-uuid' + b',' * header.count(b',') + b'\n')
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('Line 2', str(response.json()))
+
+    def test_management_commands(self):
+        path = f'/tmp/{uuid7()}.csv'
+        call_command('export_csv', 'tasks', output=path, stdout=StringIO())
+        Task.objects.all().delete()
+        out = StringIO()
+        call_command('import_csv', 'tasks', path, stdout=out)
+        self.assertIn('Imported 2 tasks', out.getvalue())
+        self.assertEqual(Task.objects.count(), 2)
+
+
+# tests for the fast serializer of the list endpoints
+class FastListSerializerTests(APITestBase):
+    def setUp(self):
+        super().setUp()
+        Task.objects.create(title='Task', description='desc', deadline=date.today(), color='red', user=self.user)
+        Task.objects.create(title='Ünïcode "quoted"', description=None, deadline=date(2030, 1, 31), color=None, is_active=False, user=self.user)
+        Note.objects.create(title='Note', description='content', color='blue', user=self.user)
+        Note.objects.create(title='Empty note', description=None, user=self.user)
+
+    # returns the list response with the fast serializer and with the serializer_class of the viewset
+    def get_both(self, url, viewset):
+        fast = self.client.get(url)
+        with mock.patch.object(viewset, 'fast_list_serializer', None):
+            slow = self.client.get(url)
+        return fast, slow
+
+    def test_output_matches_the_serializer_byte_for_byte(self):
+        for url, viewset in ((reverse('task-list'), TaskViewSet), (reverse('note-list'), NoteViewSet), (reverse('task-list') + '?sort=-title', TaskViewSet)):
+            fast, slow = self.get_both(url, viewset)
+            self.assertEqual(fast.status_code, 200)
+            self.assertEqual(fast.content, slow.content)
+
+    def test_missing_related_object_is_left_out_like_the_serializer(self):
+        task = Task.objects.create(title='Orphan', deadline=date.today(), user=None)
+        fast = FastListSerializer(TaskSerializer).serialize(Task.objects.filter(pk=task.pk))
+        self.assertEqual(fast[0]['attributes'], TaskSerializer(task).data)
+
+    def test_browsable_api_uses_the_serializer(self):
+        response = self.client.get(reverse('task-list'), HTTP_ACCEPT='text/html')
+        self.assertEqual(response.status_code, 200)
+
+
+# tests for the filter[search] search of the list endpoints, SQLite uses the icontains fallback
+class SearchTests(APITestBase):
+    def setUp(self):
+        super().setUp()
+        Task.objects.create(title='Buy groceries', description='milk and eggs', deadline=date.today(), user=self.user)
+        Task.objects.create(title='Write report', description='quarterly numbers', deadline=date.today(), user=self.user)
+        Note.objects.create(title='Recipes', description='pancakes need milk', user=self.user)
+
+    def search(self, url, term, **params):
+        return [item['attributes']['title'] for item in self.client.get(url, {'filter[search]': term, **params}).json()['data']]
+
+    def test_search_matches_titles_and_descriptions(self):
+        self.assertEqual(self.search(reverse('task-list'), 'report'), ['Write report'])
+        self.assertEqual(self.search(reverse('task-list'), 'milk'), ['Buy groceries'])
+        self.assertEqual(self.search(reverse('note-list'), 'milk'), ['Recipes'])
+        self.assertEqual(self.search(reverse('task-list'), 'holiday'), [])
+
+    def test_search_only_returns_the_rows_of_the_user(self):
+        other = User.objects.create_user(username='janedoe', password='janedoe1')
+        Task.objects.create(title='Buy groceries', deadline=date.today(), user=other)
+        self.assertEqual(self.search(reverse('task-list'), 'groceries'), ['Buy groceries'])
+
+    def test_search_can_be_sorted(self):
+        Task.objects.create(title='Another report', deadline=date.today(), user=self.user)
+        self.assertEqual(self.search(reverse('task-list'), 'report', sort='title'), ['Another report', 'Write report'])
+
+
+# tests for the filter[...] filters of the list endpoints
+class FilterTests(APITestBase):
+    def setUp(self):
+        super().setUp()
+        today = date.today()
+        Task.objects.create(title='Done', status='Done', deadline=today, color='red', user=self.user)
+        Task.objects.create(title='Later', deadline=today + timedelta(days=10), color='blue', user=self.user)
+        Task.objects.create(title='Archived', deadline=today + timedelta(days=3), color='blue', is_active=False, user=self.user)
+        Note.objects.create(title='Red note', color='red', user=self.user)
+        Note.objects.create(title='Blue note', color='blue', user=self.user)
+
+    def titles(self, url, **params):
+        response = self.client.get(url, params)
+        self.assertEqual(response.status_code, 200)
+        return [item['attributes']['title'] for item in response.json()['data']]
+
+    def test_task_filters(self):
+        url = reverse('task-list')
+        in_a_week = (date.today() + timedelta(days=7)).strftime('%Y-%m-%d')
+        self.assertEqual(self.titles(url, **{'filter[status]': 'Done'}), ['Done'])
+        self.assertEqual(self.titles(url, **{'filter[is_active]': 'false'}), ['Archived'])
+        self.assertEqual(self.titles(url, **{'filter[deadline.gt]': date.today().strftime('%Y-%m-%d'), 'filter[deadline.lt]': in_a_week}), ['Archived'])
+        self.assertEqual(self.titles(url, **{'filter[color.in]': 'red,green'}), ['Done'])
+        self.assertEqual(self.titles(url, **{'filter[color]': 'blue', 'filter[is_active]': 'true'}), ['Later'])
+        self.assertEqual(len(self.titles(url, **{'filter[created.gte]': (timezone.now() - timedelta(hours=1)).isoformat()})), 3)
+        self.assertEqual(self.titles(url, **{'filter[modified.lt]': (timezone.now() - timedelta(hours=1)).isoformat()}), [])
+
+    def test_note_filters(self):
+        self.assertEqual(self.titles(reverse('note-list'), **{'filter[color]': 'red'}), ['Red note'])
+
+    def test_invalid_filters_return_400(self):
+        self.assertEqual(self.client.get(reverse('task-list'), {'filter[title]': 'Done'}).status_code, 400)
+        self.assertEqual(self.client.get(reverse('task-list'), {'filter[deadline.gte]': 'tomorrow'}).status_code, 400)
+        self.assertEqual(self.client.get(reverse('note-list'), {'filter[status]': 'Done'}).status_code, 400)
+
+
+# tests for the dashboard statistics
+class StatsTests(APITestBase):
+    def setUp(self):
+        super().setUp()
+        today = date.today()
+        Task.objects.create(title='Overdue', deadline=today - timedelta(days=1), user=self.user)
+        Task.objects.create(title='Due today', deadline=today, user=self.user)
+        Task.objects.create(title='Done', status='Done', deadline=today + timedelta(days=30), user=self.user)
+        Task.objects.create(title='Archived', deadline=today - timedelta(days=1), is_active=False, user=self.user)
+        Note.objects.create(title='Blue', color='blue', user=self.user)
+        Note.objects.create(title='Red', color='red', user=self.user)
+        other = User.objects.create_user(username='janedoe', password='janedoe1')
+        Task.objects.create(title='Other', deadline=today, user=other)
+        Note.objects.create(title='Other', color='blue', user=other)
+
+    def test_user_stats(self):
+        # warm up the token authentication cache, then one grouped query per table
+        self.client.get(reverse('stats'))
+        with self.assertNumQueries(2):
+            stats = self.client.get(reverse('stats')).json()['data']
+        self.assertEqual(stats['tasks'], {
+            'total': 4, 'active': 3, 'archived': 1, 'overdue': 1, 'due_this_week': 1,
+            'by_status': {'Done': 1, 'Pending': 3},
+        })
+        self.assertEqual(stats['notes'], {'total': 2, 'by_color': {'blue': 1, 'red': 1}})
+
+    def test_summary_matches_the_live_stats(self):
+        self.assertEqual(self.client.get(reverse('all_stats')).status_code, 403)
+        self.user.is_superuser = True
+        self.user.save()
+        call_command('refresh_stats', stdout=StringIO())
+
+        live = self.client.get(reverse('all_stats'), {'source': 'live'}).json()['data']
+        summary = self.client.get(reverse('all_stats'), {'source': 'summary'}).json()['data']
+        self.assertEqual(live['tasks']['total'], 5)
+        self.assertEqual(live['notes']['by_color'], {'blue': 2, 'red': 1})
+        self.assertIsNotNone(summary.pop('refreshed'))
+        self.assertEqual(summary, live)
+        with self.settings(STATS_USE_SUMMARY=True):
+            self.assertIn('refreshed', self.client.get(reverse('all_stats')).json()['data'])
+
+
+# tests for the per user counters of tasks and notes
+class CounterTests(APITestBase):
+    def counters(self):
+        return self.client.get(reverse('counters')).json()['data']
+
+    # the counters kept by the writes are the ones computed from the tables
+    def assertCountersAreExact(self):
+        counters = self.counters()
+        out = StringIO()
+        call_command('reconcile_counters', stdout=out)
+        self.assertIn('Repaired the counters of 0 user(s)', out.getvalue())
+        self.assertEqual(self.counters(), counters)
+
+    def test_counters_follow_every_write(self):
+        task = self.create_task('First').json()['data']['details']
+        first = Task.objects.get(title='First')
+        self.create_task('Second')
+        self.create_note('Note')
+        self.assertEqual(self.counters(), {'tasks': 2, 'active_tasks': 2, 'pending_tasks': 2, 'notes': 1})
+
+        self.send('patch', reverse('task-detail', args=[first.pk]), dict(task, status='Done'))
+        self.client.patch(f'/tasks/archive/{first.pk}')
+        self.assertEqual(self.counters(), {'tasks': 2, 'active_tasks': 1, 'pending_tasks': 1, 'notes': 1})
+        self.send('patch', reverse('activate_tasks'), {'ids': [str(first.pk)]})
+        self.assertEqual(self.counters()['active_tasks'], 2)
+
+        self.send('post', reverse('task-bulk'), [{'title': 'Bulk', 'description': 'desc', 'deadline': self.deadline, 'color': 'blue'}])
+        self.send('delete', reverse('task-bulk'), [str(first.pk)])
+        self.client.delete(reverse('note-detail', args=[Note.objects.get().pk]))
+        self.assertEqual(self.counters(), {'tasks': 2, 'active_tasks': 2, 'pending_tasks': 2, 'notes': 0})
+        self.assertCountersAreExact()
+
+    def test_concurrent_archives_and_deletes_are_counted_once(self):
+        self.create_task('First')
+        self.create_note('Note')
+        # two requests that read the same rows before either one writes
+        task, stale_task = Task.objects.get(), Task.objects.get()
+        note, stale_note = Note.objects.get(), Note.objects.get()
+        self.assertEqual(set_task_active(task, False), 1)
+        self.assertEqual(set_task_active(stale_task, False), 0)
+        with transaction.atomic():
+            self.assertEqual(delete_counted(note), 1)
+            self.assertEqual(delete_counted(stale_note), 0)
+        self.assertEqual(self.counters(), {'tasks': 1, 'active_tasks': 0, 'pending_tasks': 1, 'notes': 0})
+        # the second delete request of the same task gets 404
+        self.assertEqual(self.client.delete(reverse('task-detail', args=[task.pk])).status_code, 200)
+        self.assertEqual(self.client.delete(reverse('task-detail', args=[task.pk])).status_code, 404)
+        self.assertCountersAreExact()
+
+    def test_update_does_not_write_back_a_stale_archive_or_status(self):
+        self.create_task('First')
+        # the request read the task before a concurrent archive
+        stale = Task.objects.get()
+        set_task_active(Task.objects.get(), False)
+        serializer = TaskSerializer(stale, data={'title': 'Renamed'}, partial=True)
+        self.assertTrue(serializer.is_valid())
+        serializer.update(stale, serializer.validated_data)
+        task = Task.objects.get()
+        self.assertEqual((task.title, task.is_active), ('Renamed', False))
+        self.assertEqual(self.counters()['active_tasks'], 0)
+        self.assertCountersAreExact()
+
+    def test_concurrent_bulk_delete_is_counted_once(self):
+        self.create_task('First')
+        self.create_task('Second')
+        first = Task.objects.get(title='First')
+        in_bulk = QuerySet.in_bulk
+
+        # another request deletes the first task after this one read it, which SQLite does not prevent with a lock
+        def read_then_delete(queryset, *args, **kwargs):
+            rows = in_bulk(queryset, *args, **kwargs)
+            delete_counted(Task.objects.get(pk=first.pk))
+            return rows
+
+        with mock.patch.object(QuerySet, 'in_bulk', read_then_delete):
+            response = self.send('delete', reverse('task-bulk'), [str(first.pk), str(Task.objects.get(title='Second').pk)])
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.counters(), {'tasks': 0, 'active_tasks': 0, 'pending_tasks': 0, 'notes': 0})
+        self.assertCountersAreExact()
+
+    def test_failed_write_does_not_change_the_counters(self):
+        self.create_task('First')
+        self.assertEqual(self.create_task('First').status_code, 400)
+        self.assertEqual(self.counters()['tasks'], 1)
+
+    def test_counters_are_a_single_lookup(self):
+        self.create_task('First')
+        self.client.get(reverse('counters'))
+        with self.assertNumQueries(1):
+            self.client.get(reverse('counters'))
+
+    def test_reconcile_repairs_drifted_and_missing_counters(self):
+        # rows written without the API are not counted
+        Task.objects.create(title='Admin', deadline=date.today(), is_active=False, user=self.user)
+        self.assertEqual(self.counters()['tasks'], 0)
+        out = StringIO()
+        call_command('reconcile_counters', user=[self.user.pk], stdout=out)
+        self.assertIn('Repaired the counters of 1 user(s)', out.getvalue())
+        self.assertEqual(self.counters(), {'tasks': 1, 'active_tasks': 0, 'pending_tasks': 1, 'notes': 0})
+
+        # a user created before the counters existed gets them on the first read or write
+        self.user.counters.delete()
+        self.create_note('Note')
+        self.assertEqual(self.counters(), {'tasks': 1, 'active_tasks': 0, 'pending_tasks': 1, 'notes': 1})
+
+
+# tests for the request metrics middleware and the /metrics endpoint, every request is measured
+@override_settings(METRICS={'SAMPLE_RATE': 1.0})
+class MetricsTests(APITestBase):
+    def setUp(self):
+        super().setUp()
+        registry.reset()
+        self.create_task('Task')
+        self.client.get(reverse('task-list'))
+
+    def test_requests_are_recorded_per_endpoint(self):
+        stats = registry.endpoints['task-list']
+        self.assertEqual(stats.requests, 2)
+        self.assertGreater(stats.sql_queries, 0)
+        self.assertGreater(stats.phases['serializer'], 0)
+        self.assertGreater(stats.phases['render'], 0)
+        self.assertGreater(stats.response_bytes, 0)
+        self.assertEqual(sum(stats.buckets), 2)
+
+    def test_metrics_endpoint_is_for_superusers(self):
+        self.assertEqual(self.client.get(reverse('metrics')).status_code, 403)
+        self.user.is_superuser = True
+        self.user.save()
+        response = self.client.get(reverse('metrics'))
+        self.assertEqual(response.status_code, 200)
+        content = response.content.decode()
+        self.assertIn('api_request_duration_seconds_count{endpoint="task-list"} 2', content)
+        self.assertIn('api_request_duration_seconds_bucket{endpoint="task-list",le="+Inf"} 2', content)
+        self.assertIn('api_sql_queries_total{endpoint="task-list"}', content)
+
+    def test_requests_are_not_recorded_when_sampling_is_off(self):
+        with self.settings(METRICS={'SAMPLE_RATE': 0}):
+            self.client.get(reverse('task-list'))
+        self.assertEqual(registry.endpoints['task-list'].requests, 2)
+
+    def test_requests_are_not_recorded_by_default(self):
+        with self.settings(METRICS={}):
+            self.client.get(reverse('task-list'))
+        self.assertEqual(registry.endpoints['task-list'].requests, 2)
+
+    def test_async_requests_are_recorded(self):
+        with self.settings(ROOT_URLCONF='todoListNotes.asgi_urls'):
+            request = RequestFactory().get('/task/', HTTP_AUTHORIZATION=f'Token {Token.objects.get(user=self.user).key}')
+            request.resolver_match = resolve('/task/')
+            response = async_to_sync(MetricsMiddleware(request.resolver_match.func))(request)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(registry.endpoints['task-list'].requests, 3)
+        self.assertGreater(registry.endpoints['task-list'].phases['auth'], 0)
+
+
+# tests for the load test of the API routes
+class BenchmarkTests(APITestBase):
+    def test_benchmark_reports_every_endpoint(self):
+        path = f'/tmp/{uuid7()}.json'
+        out = StringIO()
+        call_command(
+            'benchmark_api', users=2, tasks=5, notes=3, clients=1, requests=6,
+            endpoints='task-list,task-detail,task-update,all_task,stats', output=path, stdout=out,
+        )
+        with open(path) as file:
+            results = json.load(file)
+        self.assertEqual(list(results['endpoints']), ['task-list', 'task-detail', 'task-update', 'all_task', 'stats'])
+        for result in results['endpoints'].values():
+            self.assertEqual((result['requests'], result['errors']), (6, 0))
+            self.assertLessEqual(result['p50_ms'], result['p95_ms'])
+            self.assertGreater(result['queries_mean'], 0)
+        # the benchmark users are deleted with their tasks
+        self.assertEqual(list(User.objects.values_list('username', flat=True)), ['johndoe'])
+        self.assertEqual(Task.objects.count(), 0)
+
+        call_command('benchmark_api', users=1, tasks=1, notes=1, clients=1, requests=2, endpoints='stats', compare=path, stdout=out)
+        self.assertIn('throughput', out.getvalue().splitlines()[-1])
+
+
+# tests for the detector of repeated, slow and large queries
+class QueryDetectorTests(APITestBase):
+    def setUp(self):
+        super().setUp()
+        for index in range(6):
+            self.create_task(f'Task {index}')
+            self.create_note(f'Note {index}')
+        self.user.is_superuser = True
+        self.user.save()
+
+    def test_endpoints_have_no_repeated_queries(self):
+        for url in ('/task/', '/note/', '/sync', '/all_tasks', '/all_notes', '/stats'):
+            with self.assertNoQueryProblems(repeated_queries=2):
+                self.assertEqual(self.client.get(url).status_code, 200)
+
+    def test_repeated_query_is_reported_with_its_call_site(self):
+        with detect_queries() as detector:
+            # an N+1 query: the user of every task is loaded with its own query
+            usernames = [task.user.username for task in Task.objects.all()]
+        self.assertEqual(len(usernames), 6)
+        problems = detector.get_problems()
+        self.assertEqual([(problem['kind'], problem['count']) for problem in problems], [('repeated', 6)])
+        self.assertIn('auth_user', problems[0]['sql'])
+        self.assertTrue(problems[0]['call_site'].startswith('core/tests.py:'))
+        with self.assertRaises(AssertionError):
+            with self.assertNoQueryProblems():
+                [task.user.username for task in Task.objects.all()]
+
+    def test_slow_queries_and_large_results_are_reported(self):
+        with detect_queries(slow_query_ms=0) as detector:
+            Task.objects.count()
+        self.assertEqual([problem['kind'] for problem in detector.get_problems()], ['slow'])
+
+        # the row count of a SELECT as reported by Postgres
+        cursor = mock.Mock(rowcount=5000)
+        with detect_queries(max_rows=1000) as detector:
+            detect_query(lambda *args: None, 'SELECT id FROM core_task WHERE id IN (%s, %s)', (1, 2), False, {'cursor': cursor})
+        self.assertEqual(detector.get_problems()[0]['rows'], 5000)
+        self.assertEqual(detector.get_problems()[0]['sql'], 'SELECT id FROM core_task WHERE id IN (%s, ...)')
+
+    def test_sampled_requests_are_logged_with_the_endpoint(self):
+        with self.settings(QUERY_DETECTOR={'SAMPLE_RATE': 1, 'SLOW_QUERY_MS': 0}):
+            with self.assertLogs('core.queries', 'WARNING') as logs:
+                self.client.get('/task/')
+        self.assertIn('slow query in task-list GET /task/', logs.output[0])
+        with self.assertNoLogs('core.queries', 'WARNING'):
+            self.client.get('/task/')
+
+
+# tests for the rate limits and the concurrency limits
+class RateLimitTests(APITestBase):
+    limits = {
+        'SCOPES': {
+            'user': {'rate': '1/hour', 'burst': 3},
+            'admin': {'rate': '1/hour', 'burst': 1},
+            'login': {'rate': '1/hour', 'burst': 2},
+        },
+    }
+
+    def test_user_rate_limit_returns_429_with_retry_after(self):
+        with self.settings(RATE_LIMITS=self.limits):
+            statuses = [self.client.get('/task/').status_code for _ in range(4)]
+            response = self.client.get('/note/')
+        self.assertEqual(statuses, [200, 200, 200, 429])
+        self.assertEqual(response.status_code, 429)
+        self.assertGreater(int(response['Retry-After']), 0)
+        # the bucket is per user
+        other = User.objects.create_user(username='janedoe', password='janedoe1')
+        self.client.credentials(HTTP_AUTHORIZATION=f'Token {Token.objects.get(user=other).key}')
+        with self.settings(RATE_LIMITS=self.limits):
+            self.assertEqual(self.client.get('/task/').status_code, 200)
+
+    def test_login_and_admin_limits(self):
+        credentials = {'username': 'johndoe', 'password': 'johndoe1'}
+        with self.settings(RATE_LIMITS=self.limits):
+            statuses = [self.send('post', '/users/login', credentials).status_code for _ in range(3)]
+            self.assertEqual(statuses, [200, 200, 429])
+            self.user.is_superuser = True
+            self.user.save()
+            self.assertEqual(self.client.get('/all_tasks').status_code, 200)
+            self.assertEqual(self.client.get('/all_users').status_code, 429)
+
+    def test_spoofed_forwarded_for_does_not_bypass_the_login_limit(self):
+        credentials = json.dumps({'username': 'johndoe', 'password': 'wrong'})
+        with self.settings(RATE_LIMITS=self.limits):
+            statuses = [
+                self.client.post('/users/login', credentials, content_type='application/json', HTTP_X_FORWARDED_FOR=f'10.0.0.{index}').status_code
+                for index in range(3)
+            ]
+        self.assertEqual(statuses, [400, 400, 429])
+
+    def test_async_views_apply_the_same_limits(self):
+        with self.settings(RATE_LIMITS=self.limits, ROOT_URLCONF='todoListNotes.asgi_urls'):
+            statuses = [self.client.get('/task/').status_code for _ in range(4)]
+        self.assertEqual(statuses, [200, 200, 200, 429])
+
+    def test_async_fallback_to_the_sync_view_is_charged_once(self):
+        self.user.is_superuser = True
+        self.user.save()
+        with self.settings(RATE_LIMITS=self.limits, ROOT_URLCONF='todoListNotes.asgi_urls'):
+            # the admin bucket is empty after the first request, the user bucket is only charged by the async view
+            self.assertEqual(self.client.get('/all_tasks').status_code, 200)
+            self.assertEqual(self.client.get('/all_tasks').status_code, 429)
+            # a missing task is returned by the sync view
+            self.assertEqual(self.client.get(f'/task/{uuid7()}/').status_code, 404)
+            self.assertEqual(self.client.get('/task/').status_code, 429)
+
+    def test_shared_store(self):
+        limits = dict(self.limits, STORE='core.throttling.CacheBucketStore')
+        for urlconf in ('todoListNotes.urls', 'todoListNotes.asgi_urls'):
+            cache.clear()
+            with self.settings(RATE_LIMITS=limits, ROOT_URLCONF=urlconf):
+                statuses = [self.client.get('/task/').status_code for _ in range(4)]
+            self.assertEqual(statuses, [200, 200, 200, 429])
+
+    def test_concurrency_limit_sheds_with_503(self):
+        self.user.is_superuser = True
+        self.user.save()
+        limits = {'admin': {'endpoints': ['all_task', 'export'], 'limit': 1}}
+        with self.settings(CONCURRENCY_LIMITS=limits):
+            # another request of the class is running
+            semaphore = limiter.get_semaphore('all_task')
+            semaphore.acquire()
+            response = self.client.get('/all_tasks')
+            self.assertEqual(response.status_code, 503)
+            self.assertEqual(response['Retry-After'], '1')
+            # the cheap endpoints are not limited
+            self.assertEqual(self.client.get('/task/').status_code, 200)
+            semaphore.release()
+
+            self.assertEqual(self.client.get('/all_tasks').status_code, 200)
+            # a streaming response keeps its slot until it is closed
+            response = self.client.get('/export/tasks')
+            self.assertEqual(self.client.get('/all_tasks').status_code, 503)
+            response.close()
+            self.assertEqual(self.client.get('/all_tasks').status_code, 200)
+
+
+# tests for the password hashing pool of login and register
+@override_settings(PASSWORD_HASHING={'WORKERS': 1, 'MAX_PENDING': 1})
+class PasswordHashingTests(APITestBase):
+    credentials = {'username': 'johndoe', 'password': 'johndoe1'}
+
+    @classmethod
+    def tearDownClass(cls):
+        # stops the worker process
+        shutdown_pools()
+        super().tearDownClass()
+
+    def register(self):
+        data = {'username': 'janedoe', 'email': 'jane@example.com', 'first_name': 'Jane', 'last_name': 'Doe', 'password': 'janedoe1', 'password2': 'janedoe1'}
+        return self.send('post', '/users/register', data)
+
+    def test_register_and_login_hash_on_the_pool(self):
+        self.assertEqual(self.register().status_code, 201)
+        self.assertTrue(User.objects.get(username='janedoe').check_password('janedoe1'))
+        credentials = {'username': 'janedoe', 'password': 'janedoe1'}
+        self.assertEqual(self.send('post', '/users/login', credentials).status_code, 200)
+        with self.settings(ROOT_URLCONF='todoListNotes.asgi_urls'):
+            self.assertEqual(self.send('post', '/users/login', credentials).status_code, 200)
+            self.assertEqual(self.send('post', '/users/login', dict(credentials, password='wrong')).status_code, 400)
+        # the slot of every password is released
+        self.assertTrue(get_pool().slots.acquire(blocking=False))
+        get_pool().slots.release()
+
+    def test_full_pool_returns_503(self):
+        # another password is hashed
+        get_pool().slots.acquire()
+        try:
+            response = self.send('post', '/users/login', self.credentials)
+            self.assertEqual(response.status_code, 503)
+            self.assertEqual(response['Retry-After'], '1')
+            with self.settings(ROOT_URLCONF='todoListNotes.asgi_urls'):
+                self.assertEqual(self.send('post', '/users/login', self.credentials).status_code, 503)
+            self.assertEqual(self.register().status_code, 503)
+            self.assertFalse(User.objects.filter(username='janedoe').exists())
+            # the admin site and the other authenticate() callers do not use the pool
+            self.assertEqual(authenticate(username='johndoe', password='johndoe1'), self.user)
+        finally:
+            get_pool().slots.release()
+        self.assertEqual(self.send('post', '/users/login', self.credentials).status_code, 200)
+
+    def test_login_upgrades_an_older_hash(self):
+        for urlconf in ('todoListNotes.urls', 'todoListNotes.asgi_urls'):
+            self.user.password = make_password('johndoe1', hasher='pbkdf2_sha1')
+            self.user.save()
+            with self.settings(ROOT_URLCONF=urlconf):
+                self.assertEqual(self.send('post', '/users/login', self.credentials).status_code, 200)
+            self.user.refresh_from_db()
+            self.assertTrue(self.user.password.startswith('pbkdf2_sha256$'))
+
+    def test_inline_hashing_without_workers(self):
+        with self.settings(PASSWORD_HASHING={'WORKERS': 0}):
+            self.assertIsNone(get_pool())
+            self.assertEqual(self.send('post', '/users/login', self.credentials).status_code, 200)
+            self.assertEqual(self.send('post', '/users/login', dict(self.credentials, password='wrong')).status_code, 400)
@@ -0,0 +1,243 @@
+# import dependencies from rest_framework
+from rest_framework.throttling          import BaseThrottle
+
+# import settings, the cache registry and the dotted path loader
+from django.conf                        import settings
+from django.core.cache                  import caches
+from django.http                        import JsonResponse
+from django.utils.module_loading        import import_string
+
+# import the bounded in-process cache from utils
+from utils.cache                        import LRUCache
+
+# import other dependencies
+import math
+import threading
+import time
+
+
+# Rate limiting and admission control.
+#
+# The rate limits are token buckets: every scope has a rate (e.g. 10/min) and a burst, the bucket of a client starts full with
+# `burst` tokens, every request takes one token and the tokens come back at the rate. ClientRateThrottle keys the buckets by the
+# client address (login, register), UserRateThrottle by the authenticated user, or the address of an anonymous client.
+# The buckets are kept in the RATE_LIMITS['STORE'] class: LocalBucketStore keeps them in the memory of the process, so every
+# worker process has its own buckets, CacheBucketStore keeps them in a Django cache (e.g. Redis) shared by the workers.
+#
+# The concurrency limits shed the requests of an endpoint class (e.g. the password hashing of login/register, the admin lists)
+# with 503 as soon as the process is already running `limit` requests of that class, instead of queueing them in front of the
+# cheap endpoints. See ConcurrencyLimitMiddleware.
+
+
+# read the RATE_LIMITS setting with its defaults
+def get_rate_limit_settings():
+    options = {
+        'ENABLED': True,
+        'STORE': 'core.throttling.LocalBucketStore',
+        # the cache of CacheBucketStore
+        'CACHE_ALIAS': 'default',
+        # the rate and burst of every scope, a scope without an entry is not limited
+        'SCOPES': {},
+    }
+    options.update(getattr(settings, 'RATE_LIMITS', {}))
+    return options
+
+
+# parses a rate like "10/min" into tokens per second
+def parse_rate(rate):
+    count, period = rate.split('/')
+    seconds = {'s': 1, 'sec': 1, 'm': 60, 'min': 60, 'h': 3600, 'hour': 3600, 'd': 86400, 'day': 86400}[period]
+    return int(count) / seconds
+
+
+# refills a bucket (None for a new bucket) up to now, returns its (tokens, updated)
+def refill(bucket, rate, burst, now):
+    if bucket is None:
+        return burst, now
+    tokens, updated = bucket
+    return min(burst, tokens + (now - updated) * rate), now
+
+
+# the seconds until the bucket has a token again
+def get_wait(tokens, rate):
+    return max(0.0, (1 - tokens) / rate)
+
+
+# Token buckets in the memory of the process. The least recently used buckets are dropped past MAX_SIZE, a dropped bucket
+# starts full again, which is the state it would have reached anyway once the bucket is idle for burst / rate seconds.
+class LocalBucketStore:
+    MAX_SIZE = 100000
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.buckets = LRUCache(max_size=self.MAX_SIZE, ttl=86400)
+
+    # takes a token from the bucket of the key, returns (allowed, seconds to wait when not allowed)
+    def consume(self, key, rate, burst):
+        with self.lock:
+            tokens, now = refill(self.buckets.get(key), rate, burst, time.monotonic())
+            allowed = tokens >= 1
+            self.buckets.set(key, (tokens - 1 if allowed else tokens, now))
+        return allowed, 0.0 if allowed else get_wait(tokens, rate)
+
+    # the buckets are in memory, the lock is only held for the update of a bucket
+    async def aconsume(self, key, rate, burst):
+        return self.consume(key, rate, burst)
+
+    def clear(self):
+        self.buckets.clear()
+
+
+# Token buckets in a Django cache shared by the worker processes. The read and the write of a bucket are two cache calls, so
+# concurrent requests of the same client can each take the same token: the limit is approximate under contention.
+class CacheBucketStore:
+
+    def __init__(self):
+        self.cache = caches[get_rate_limit_settings()['CACHE_ALIAS']]
+
+    def consume(self, key, rate, burst):
+        key = f'rate-limit:{key}'
+        tokens, now = refill(self.cache.get(key), rate, burst, time.time())
+        allowed = tokens >= 1
+        # the bucket is full again after burst / rate seconds, it does not need to be kept longer
+        self.cache.set(key, (tokens - 1 if allowed else tokens, now), math.ceil(burst / rate))
+        return allowed, 0.0 if allowed else get_wait(tokens, rate)
+
+    # same as consume() for the async views, the cache calls do not block the event loop
+    async def aconsume(self, key, rate, burst):
+        key = f'rate-limit:{key}'
+        tokens, now = refill(await self.cache.aget(key), rate, burst, time.time())
+        allowed = tokens >= 1
+        await self.cache.aset(key, (tokens - 1 if allowed else tokens, now), math.ceil(burst / rate))
+        return allowed, 0.0 if allowed else get_wait(tokens, rate)
+
+
+# the store of the buckets, created on first use
+stores = {}
+
+
+def get_store():
+    path = get_rate_limit_settings()['STORE']
+    if path not in stores:
+        stores[path] = import_string(path)()
+    return stores[path]
+
+
+# Base class of the token bucket throttles, the rate and burst of `scope` are read from RATE_LIMITS['SCOPES'].
+# The async views take the tokens with aallow_request() and record the scopes they charged on the request, so that the sync
+# view that handles the request after them (e.g. a 404 or an invalid body) does not take a second token of these scopes.
+class TokenBucketThrottle(BaseThrottle):
+    scope = None
+
+    def get_key(self, request):
+        raise NotImplementedError
+
+    # returns (key of the bucket, rate, burst), or None if the request is not limited by this throttle
+    def get_bucket(self, request):
+        options = get_rate_limit_settings()
+        limit = options['SCOPES'].get(self.scope)
+        if not options['ENABLED'] or limit is None or self.scope in getattr(request, 'charged_scopes', ()):
+            return None
+        return f'{self.scope}:{self.get_key(request)}', parse_rate(limit['rate']), limit.get('burst', 1)
+
+    def allow_request(self, request, view):
+        bucket = self.get_bucket(request)
+        if bucket is None:
+            return True
+        allowed, self.wait_seconds = get_store().consume(*bucket)
+        return allowed
+
+    async def aallow_request(self, request):
+        bucket = self.get_bucket(request)
+        if bucket is None:
+            return True
+        allowed, self.wait_seconds = await get_store().aconsume(*bucket)
+        if allowed:
+            request.charged_scopes = getattr(request, 'charged_scopes', set()) | {self.scope}
+        return allowed
+
+    def wait(self):
+        return self.wait_seconds
+
+
+# rate limit per client address, for the endpoints that are used before the client has a token. get_ident() only reads
+# X-Forwarded-For with REST_FRAMEWORK['NUM_PROXIES'] trusted proxies, otherwise it is REMOTE_ADDR.
+class ClientRateThrottle(TokenBucketThrottle):
+    def get_key(self, request):
+        return f'client:{self.get_ident(request)}'
+
+
+# rate limit per authenticated user, an anonymous client is limited by its address. It is the default throttle of every view.
+class UserRateThrottle(TokenBucketThrottle):
+    scope = 'user'
+
+    def get_key(self, request):
+        user = getattr(request, 'user', None)
+        if user is not None and user.is_authenticated:
+            return f'user:{user.pk}'
+        return f'client:{self.get_ident(request)}'
+
+
+# the password hashing of the login and the register endpoints, per client address
+class LoginRateThrottle(ClientRateThrottle):
+    scope = 'login'
+
+
+class RegisterRateThrottle(ClientRateThrottle):
+    scope = 'register'
+
+
+# the admin endpoints that read or write all the rows, per user
+class AdminRateThrottle(UserRateThrottle):
+    scope = 'admin'
+
+
+# the throttles of the admin endpoints, the requests also count in the bucket of the user
+ADMIN_THROTTLES = [UserRateThrottle, AdminRateThrottle]
+
+
+# returns True if the request is within all the rate limits of the throttles, for the async views that do not go through the
+# DRF throttling. A request over a limit does not take a token of that scope, so the sync view can check it again and return
+# the 429 error, and the scopes already charged are not charged again by the sync view.
+async def acheck_rate_limits(request, throttles):
+    for throttle_class in throttles:
+        if not await throttle_class().aallow_request(request):
+            return False
+    return True
+
+
+# read the CONCURRENCY_LIMITS setting, {endpoint class: {'endpoints': [URL names], 'limit': number of concurrent requests}}
+def get_concurrency_settings():
+    return getattr(settings, 'CONCURRENCY_LIMITS', {})
+
+
+# the semaphores of the endpoint classes of the process
+class ConcurrencyLimiter:
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.semaphores = {}
+
+    # returns the semaphore of the endpoint class of the URL name, or None if it is not limited
+    def get_semaphore(self, url_name):
+        for name, options in get_concurrency_settings().items():
+            if url_name in options['endpoints']:
+                key = (name, options['limit'])
+                with self.lock:
+                    if key not in self.semaphores:
+                        self.semaphores[key] = threading.BoundedSemaphore(options['limit'])
+                    return self.semaphores[key]
+        return None
+
+
+limiter = ConcurrencyLimiter()
+
+
+# the response of a shed request, the client should retry after Retry-After seconds
+def get_busy_response(retry_after=1):
+    response = JsonResponse({
+        'result': 'error',
+        'message': 'The server is busy, please retry later'
+    }, status=503)
+    response['Retry-After'] = str(retry_after)
+    return response
@@ -0,0 +1,143 @@
+# import dependencies from django
+from django.core.exceptions             import ValidationError
+from django.db                          import connection, transaction, IntegrityError
+from django.db.models                   import CharField, TextField
+from django.utils                       import timezone
+
+# import needed model/s
+from . models                           import Task, Note, Tombstone
+
+# import the invalidation of the cached list responses
+from . response_cache                   import bump_list_version
+
+# import the reconciliation of the per user counters
+from . counters                         import reconcile_counters
+
+# import other dependencies
+from itertools                          import islice
+import csv
+import io
+
+
+# Bulk CSV export and import of the tasks and notes. The files hold the database columns of every row (ids, user_id and the
+# created/modified dates included), so a file can be moved to another database and loaded back as it is. Both directions work
+# on plain tuples: the export reads values_list() rows and the import writes the rows with a single COPY (Postgres) or
+# executemany() INSERT per batch, without creating model instances. An empty cell is NULL in the nullable columns.
+# The imported rows are modified at the time of the import (and not at the date of the file), so that the sync endpoint sends
+# them to the clients like any other change.
+
+MODELS = {
+    'tasks': Task,
+    'notes': Note,
+}
+
+
+class CSVImportError(ValueError):
+    pass
+
+
+# the columns of the CSV file, in the order of the model fields
+def get_fields(model):
+    return list(model._meta.concrete_fields)
+
+
+def get_columns(model):
+    return [field.attname for field in get_fields(model)]
+
+
+# writes the rows to a string with the csv module and returns it as bytes
+def write_rows(rows):
+    buffer = io.StringIO()
+    csv.writer(buffer).writerows(rows)
+    return buffer.getvalue().encode('utf-8')
+
+
+# yields the CSV file of all the rows of the model, one chunk of rows at a time. The chunks read the database, under ASGI they
+# are read in the thread of the sync views by core.handlers.StreamingASGIHandler.
+def stream_csv(model, chunk_size):
+    columns = get_columns(model)
+    yield write_rows([columns])
+    rows = model.objects.order_by('created', 'id').values_list(*columns).iterator(chunk_size=chunk_size)
+    while True:
+        chunk = list(islice(rows, chunk_size))
+        if not chunk:
+            return
+        yield write_rows(chunk)
+
+
+# converts the cells of a CSV row to the python values of the fields
+def parse_row(fields, row, line):
+    if len(row) != len(fields):
+        raise CSVImportError(f'Line {line}: expected {len(fields)} columns but got {len(row)}')
+
+    values = []
+    for field, cell in zip(fields, row):
+        try:
+            value = field.to_python(cell) if cell != '' else None
+        except ValidationError as exc:
+            raise CSVImportError(f'Line {line}: invalid {field.attname}, {exc.messages[0]}')
+        if value is None and not field.null:
+            # an empty cell is an empty string in the required text columns
+            if not isinstance(field, (CharField, TextField)):
+                raise CSVImportError(f'Line {line}: {field.attname} is required')
+            value = ''
+        values.append(value)
+    return values
+
+
+# inserts a batch of parsed rows with a single statement
+def insert_rows(model, fields, rows):
+    quote_name = connection.ops.quote_name
+    table = quote_name(model._meta.db_table)
+    columns = ', '.join(quote_name(field.column) for field in fields)
+
+    with connection.cursor() as cursor:
+        if connection.vendor == 'postgresql':
+            # COPY parses the CSV in the database server, an empty unquoted cell is NULL except in the NOT NULL columns
+            not_null = ', '.join(quote_name(field.column) for field in fields if not field.null)
+            buffer = io.StringIO()
+            csv.writer(buffer).writerows(rows)
+            buffer.seek(0)
+            cursor.copy_expert(f'COPY {table} ({columns}) FROM STDIN WITH (FORMAT csv, FORCE_NOT_NULL ({not_null}))', buffer)
+        else:
+            placeholders = ', '.join(['%s'] * len(fields))
+            values = [[field.get_db_prep_save(value, connection) for field, value in zip(fields, row)] for row in rows]
+            cursor.executemany(f'INSERT INTO {table} ({columns}) VALUES ({placeholders})', values)
+
+
+# imports the rows of a CSV file (an iterable of lines) in batches of batch_size rows, inside a single transaction so that
+# either every row or no row is imported. Returns the number of imported rows.
+def import_csv(model, lines, batch_size):
+    fields = get_fields(model)
+    reader = csv.reader(lines)
+    header = next(reader, None)
+    if header != get_columns(model):
+        raise CSVImportError(f'The header should be: {",".join(get_columns(model))}')
+
+    columns = get_columns(model)
+    id_index, user_index, modified_index = columns.index('id'), columns.index('user_id'), columns.index('modified')
+    now = timezone.now()
+    count = 0
+    user_ids = set()
+    try:
+        with transaction.atomic():
+            while True:
+                rows = [parse_row(fields, row, reader.line_num) for row in islice(reader, batch_size)]
+                if not rows:
+                    break
+                for row in rows:
+                    row[modified_index] = now
+                insert_rows(model, fields, rows)
+                count += len(rows)
+                user_ids.update(row[user_index] for row in rows)
+                # a row deleted before and imported again is not reported as deleted by the sync endpoint anymore
+                Tombstone.objects.filter(resource=model._meta.model_name, object_id__in=[row[id_index] for row in rows]).delete()
+
+            # the rows are inserted without the ORM, so the counters are recomputed and the cached lists of their users are invalidated here
+            reconcile_counters([user_id for user_id in user_ids if user_id is not None])
+            for user_id in user_ids:
+                bump_list_version(user_id)
+    except IntegrityError as exc:
+        # an id or a (user, title) pair that already exists, or a user that does not exist
+        raise CSVImportError(f'The rows could not be imported: {exc}')
+    return count
@@ -5,7 +5,7 @@ from django.urls                        import path
 from rest_framework                     import routers
 
 # import all views
-from . views                            import (CustomAuthToken, RegisterAPIView, TaskViewSet, archive_task, activate_task, NoteViewSet, get_all_tasks, get_all_notes, get_all_users, set_as_admin, set_as_normal_user)
+from . views                            import (CustomAuthToken, RegisterAPIView, TaskViewSet, archive_task, activate_task, archive_tasks, activate_tasks, NoteViewSet, get_all_tasks, get_all_notes, get_all_users, get_all_stats, stats, counters, metrics, export, import_rows, set_as_admin, set_as_normal_user, sync)
 
 # A new instance of the DefaultRouter is created using router = routers.DefaultRouter(). This is a convenience class that automatically generates the URL patterns for the API views registered with it.
 router = routers.DefaultRouter()
@@ -21,9 +21,18 @@ urlpatterns += [
     path('users/register', RegisterAPIView.as_view(), name='register'),
     path('tasks/archive/<uuid:pk>', archive_task, name='archive'),
     path('tasks/activate/<uuid:pk>', activate_task, name='archive'),
+    path('tasks/archive', archive_tasks, name='archive_tasks'),
+    path('tasks/activate', activate_tasks, name='activate_tasks'),
+    path('sync', sync, name='sync'),
     path('all_tasks', get_all_tasks, name='all_task'),
     path('all_notes', get_all_notes, name='all_notes'),
     path('all_users', get_all_users, name='all_users'),
+    path('stats', stats, name='stats'),
+    path('counters', counters, name='counters'),
+    path('all_stats', get_all_stats, name='all_stats'),
+    path('metrics', metrics, name='metrics'),
+    path('export/<str:resource>', export, name='export'),
+    path('import/<str:resource>', import_rows, name='import'),
     path('set_as_admin/<int:pk>', set_as_admin, name='set_as_admin'),
     path('set_as_normal_user/<int:pk>', set_as_normal_user, name='set_as_normal_user')
 ]
\ No newline at end of file
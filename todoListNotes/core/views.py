@@ -2,14 +2,14 @@ from django.shortcuts   import render
 
 # import JSONDecodeError and JsonResponse
 from json                               import JSONDecodeError
-from django.http                        import JsonResponse
+from django.http                        import HttpResponse, JsonResponse, StreamingHttpResponse, Http404
 
 # import dependencies from rest_framework
 from rest_framework.authtoken.models    import Token
 from rest_framework.response            import Response
 from rest_framework.parsers             import JSONParser
 from rest_framework                     import views, viewsets, status
-from rest_framework.decorators          import api_view, permission_classes
+from rest_framework.decorators          import api_view, permission_classes, throttle_classes, action
 from rest_framework.permissions         import IsAuthenticated
 from rest_framework.authtoken.views     import ObtainAuthToken
 
@@ -17,26 +17,72 @@ from rest_framework.authtoken.views     import ObtainAuthToken
 from rest_framework.mixins              import (ListModelMixin, UpdateModelMixin, RetrieveModelMixin, CreateModelMixin, DestroyModelMixin)
 
 # import needed serializers
-from . serializers                      import RegistrationSerializer, TaskSerializer, NoteSerializer, UserSerializer
+from . serializers                      import LoginSerializer, RegistrationSerializer, TaskSerializer, NoteSerializer, UserSerializer, TaskBatchSerializer, FastListSerializer
 
 # import needed model/s
 from django.contrib.auth.models         import User
-from . models                           import Task, Note
+from . models                           import Task, Note, Tombstone
 
+# import the filter[...] filters of the list endpoints
+from . filters                          import TaskFilterSet, NoteFilterSet
+
+# import the statistics of the dashboards
+from . stats                            import get_user_stats, get_global_stats
+
+# import the per user counters, they are updated in the same transaction as the tasks and notes
+from . counters                         import adjust_counters, get_counters, delete_counted
+
+# import the rate limits of the password hashing and admin endpoints
+from . throttling                       import LoginRateThrottle, RegisterRateThrottle, ADMIN_THROTTLES, get_busy_response
+
+# import the error of a full password hashing pool
+from . hashing                          import HashingPoolBusy
+
+# import the registry of the request metrics
+from . metrics                          import registry
+
+# import keyset pagination for the admin endpoints
+from . pagination                       import KeysetPagination
+# import the bulk operations handler
+from . bulk                             import BulkHandler
+# import the conditional GET support, the response cache and the fast serializer of the list and retrieve actions
+from . mixins                           import ConditionalGetMixin, ResponseCacheMixin, FastListMixin
+from . response_cache                   import bump_list_version
+# import the streaming exports of the admin endpoints
+from . export                           import EXPORTS, STREAMS, CONTENT_TYPES
+# import the bulk CSV export and import of tasks and notes
+from . transfer                         import MODELS, CSVImportError, stream_csv, import_csv
 
 # import other dependencies
 from datetime                           import date
-from django.db                          import IntegrityError
+from django.db                          import IntegrityError, transaction
+from django.utils                       import timezone
+from django.utils.dateparse             import parse_datetime
+from django.conf                        import settings
+from datetime                           import timedelta
+import codecs
+import csv
 
 
 # custom login view to include the 'is_superuser' field of a user
 class CustomAuthToken(ObtainAuthToken):
+    # the password is checked on the hashing pool
+    serializer_class = LoginSerializer
+    # the password check is slow on purpose, so the login is rate limited per client
+    throttle_classes = [LoginRateThrottle]
+
     def post(self, request, *args, **kwargs):
         # get the username and password from the request body
         serializer = self.serializer_class(data=request.data, context={'request': request})
 
-        # check if serializer is valid
-        if serializer.is_valid(raise_exception=True):
+        try:
+            # check if serializer is valid, the password is checked on the hashing pool
+            valid = serializer.is_valid(raise_exception=True)
+        except HashingPoolBusy:
+            # the hashing pool is full, the client should retry later
+            return get_busy_response()
+
+        if valid:
             # store the validated user to the 'user' variable
             user = serializer.validated_data['user']
             # using get_or_create to get the token of the user or create a new one if there is not existing token
@@ -57,6 +103,8 @@ class CustomAuthToken(ObtainAuthToken):
 class RegisterAPIView(views.APIView):
     # specifies the serializer class to use for the view.
     serializer_class = RegistrationSerializer
+    # the password hashing is slow on purpose, so the register is rate limited per client
+    throttle_classes = [RegisterRateThrottle]
 
     # a method that returns a dictionary of context information to be passed to the serializer.
     def get_serializer_context(self):
@@ -109,10 +157,16 @@ class RegisterAPIView(views.APIView):
             return Response({
                 'message': 'Username already exists'
             }, status=status.HTTP_400_BAD_REQUEST)
+        except HashingPoolBusy:
+            # the hashing pool is full, the client should retry later
+            return get_busy_response()
       
 
-# ViewSet for Task which inherits mixins for list, retrieve, update, create and delete
+# ViewSet for Task which inherits mixins for the response cache, conditional GET, fast list, list, retrieve, update, create and delete
 class TaskViewSet(
+        ResponseCacheMixin,
+        ConditionalGetMixin,
+        FastListMixin,
         ListModelMixin,
         RetrieveModelMixin,
         UpdateModelMixin,
@@ -124,13 +178,60 @@ class TaskViewSet(
     # allow only authenticated users to access the endpoints.
     permission_classes = (IsAuthenticated,)
 
-    # specifies TaskSerializer as the serializer class
+    # specifies TaskSerializer as the serializer class, and the fast serializer that outputs the same list from .values() rows
     serializer_class = TaskSerializer
+    fast_list_serializer = FastListSerializer(TaskSerializer)
+
+    # fields of the filter[search] full-text search, see core.filters.FullTextSearchFilter
+    search_fields = ['title', 'description']
+    # filter[...] filters of the list, see core.filters.TaskFilterSet
+    filterset_class = TaskFilterSet
 
     # The get_queryset() method is overridden to return all task for the authenticated user.
+    # select_related('user') joins the owner in the same query, since the serializer outputs the username of every task
     def get_queryset(self):
         user = self.request.user
-        return Task.objects.filter(user = user)
+        return Task.objects.filter(user = user).select_related('user')
+
+    # handles the bulk operations of the tasks on /task/bulk/, all the items are validated first and written in a single transaction
+    # POST creates, PATCH updates and DELETE deletes the tasks listed in the 'data' list of the request body
+    bulk_handler = BulkHandler(Task, TaskSerializer, create_fields=['title', 'description', 'deadline', 'color'], update_fields=['title', 'description', 'status', 'deadline', 'color'])
+
+    @action(detail=False, methods=['post', 'patch', 'delete'], url_path='bulk')
+    def bulk(self, request, *args, **kwargs):
+        try:
+            # parses the data from request body and get the list of items
+            items = self.bulk_handler.get_items(JSONParser().parse(request))
+            if items is None:
+                return Response([{'status': '400', 'detail': 'Expected a list of tasks in data', 'source': {'pointer': '/data'}}], status=status.HTTP_400_BAD_REQUEST)
+
+            if request.method == 'POST':
+                tasks, errors = self.bulk_handler.create(request.user, items)
+                message, status_code = f'Successfully added {len(items)} tasks', status.HTTP_201_CREATED
+            elif request.method == 'PATCH':
+                tasks, errors = self.bulk_handler.update(request.user, items)
+                message, status_code = f'Successfully updated {len(items)} tasks', status.HTTP_200_OK
+            else:
+                count, errors = self.bulk_handler.delete(request.user, items)
+                if not errors:
+                    return Response({'message': f'Successfully deleted {count} tasks'}, status=status.HTTP_200_OK)
+
+            # if any item is invalid nothing is written and the errors of every item are returned with 400 status code
+            if errors:
+                return Response(errors, status=status.HTTP_400_BAD_REQUEST)
+
+            # dict to store the message and serialized data
+            result = {
+                'message': message,
+                'details': TaskSerializer(tasks, many=True).data
+            }
+            return Response(result, status=status_code)
+        except JSONDecodeError:
+            # returns a JsonResponse if there is an issue with JSON decoding
+            return JsonResponse({
+                'result': 'error',
+                'message': 'JSON decoding error'
+            }, status=400)
 
     # The create() method is also overridden to handle the creation of new task
     def create(self, request, *args, **kwargs):
@@ -205,8 +306,12 @@ class TaskViewSet(
         try:
             # retrieve the task object to be deleted
             instance = self.get_object()
-            # delete the instance from the database
-            self.perform_destroy(instance)
+            # delete the instance from the database and remove it from the counters of its user in the same transaction
+            with transaction.atomic():
+                deleted = delete_counted(instance)
+            if not deleted:
+                # a concurrent request already deleted it
+                raise Http404
 
             # dict to store the message
             result = {
@@ -223,24 +328,38 @@ class TaskViewSet(
             }, status=400)
 
 
+# sets is_active of a single task if it is not already set, together with the active tasks counter of its user in the same
+# transaction, and returns the number of updated rows (0 when a concurrent request already changed it)
+def set_task_active(task, is_active):
+    modified = timezone.now()
+    with transaction.atomic():
+        count = Task.objects.filter(pk=task.pk, is_active=not is_active).update(is_active=is_active, modified=modified)
+        adjust_counters(task.user_id, active_tasks=count if is_active else -count)
+    if count:
+        task.is_active, task.modified = is_active, modified
+        # update() does not send post_save, so the cached lists are invalidated here
+        bump_list_version(task.user_id)
+    return count
+
+
 # function based APIview for archive and activate task
 # allow only authenticated users to access the endpoint
 @api_view(['PATCH'])
 @permission_classes([IsAuthenticated])
 def archive_task(request, pk):
     try:
-        # get the task object using its pk
-        task = Task.objects.get(id=pk)
+        # get the task object of the authenticated user using its pk, together with its user for the serializer
+        task = Task.objects.select_related('user').get(id=pk, user=request.user)
 
         # checks if the HTTP method is PATCH
         if request.method == 'PATCH':
             # reverse the status of a task from True to False
             if task.is_active == True:
-                task.is_active = False
                 message = 'Task archived successfully'
 
-                # save the task
-                task.save()
+                # a conditional UPDATE, so that a concurrent request that changed the same task first is not counted twice
+                if not set_task_active(task, False):
+                    return Response({'error': 'Task is already archived'}, status=status.HTTP_400_BAD_REQUEST)
                 # serialize the data
                 serializer = TaskSerializer(task)
 
@@ -272,18 +391,18 @@ def archive_task(request, pk):
 @permission_classes([IsAuthenticated])
 def activate_task(request, pk):
     try:
-        # get the task object using its pk
-        task = Task.objects.get(id=pk)
+        # get the task object of the authenticated user using its pk, together with its user for the serializer
+        task = Task.objects.select_related('user').get(id=pk, user=request.user)
 
         # checks if the HTTP method is PATCH
         if request.method == 'PATCH':
             # reverse the status of a task from False to True
             if task.is_active == False:
-                task.is_active = True
                 message = 'Task activated successfully'
 
-                # save the task
-                task.save()
+                # a conditional UPDATE, so that a concurrent request that changed the same task first is not counted twice
+                if not set_task_active(task, True):
+                    return Response({'error': 'Task is already activated'}, status=status.HTTP_400_BAD_REQUEST)
                 # serialize the data
                 serializer = TaskSerializer(task)
 
@@ -309,8 +428,71 @@ def activate_task(request, pk):
         return Response({'error': 'Task not found'}, status=status.HTTP_404_NOT_FOUND)
     
 
-# ViewSet for Note which inherits mixins for list, retrieve, update, create and delete
+# sets is_active on all the tasks of the authenticated user selected by the request body with a single UPDATE statement
+def set_tasks_active(request, is_active):
+    try:
+        # parses the data from request body
+        data = JSONParser().parse(request)
+        # creates a new instance of the serializer with the parsed data
+        serializer = TaskBatchSerializer(data=data)
+
+        # checks if the serializer is valid, passing 'raise_exception=True' will allow the serializer to raise an exception when needed
+        if serializer.is_valid(raise_exception=True):
+            # only the tasks that are not already archived/activated are updated, together with the active tasks counter
+            with transaction.atomic():
+                count = Task.objects.filter(
+                    user=request.user,
+                    is_active=not is_active,
+                    **serializer.get_filters()
+                ).update(is_active=is_active, modified=timezone.now())
+                adjust_counters(request.user.pk, active_tasks=count if is_active else -count)
+            # update() does not send post_save, so the cached lists are invalidated here
+            if count:
+                bump_list_version(request.user.pk)
+            return count
+    except JSONDecodeError:
+        return None
+
+
+# function based APIview for archiving many tasks at once
+# allow only authenticated users to access the endpoint
+@api_view(['PATCH'])
+@permission_classes([IsAuthenticated])
+def archive_tasks(request):
+    count = set_tasks_active(request, False)
+    if count is None:
+        # returns a JsonResponse if there is an issue with JSON decoding
+        return JsonResponse({
+            'result': 'error',
+            'message': 'JSON decoding error'
+        }, status=400)
+
+    # return the number of archived tasks with 200 status code
+    return Response({'message': f'{count} task(s) archived successfully', 'count': count}, status=status.HTTP_200_OK)
+
+
+# function based APIview for activating many tasks at once
+# allow only authenticated users to access the endpoint
+@api_view(['PATCH'])
+@permission_classes([IsAuthenticated])
+def activate_tasks(request):
+    count = set_tasks_active(request, True)
+    if count is None:
+        # returns a JsonResponse if there is an issue with JSON decoding
+        return JsonResponse({
+            'result': 'error',
+            'message': 'JSON decoding error'
+        }, status=400)
+
+    # return the number of activated tasks with 200 status code
+    return Response({'message': f'{count} task(s) activated successfully', 'count': count}, status=status.HTTP_200_OK)
+
+
+# ViewSet for Note which inherits mixins for the response cache, conditional GET, fast list, list, retrieve, update, create and delete
 class NoteViewSet(
+    ResponseCacheMixin,
+    ConditionalGetMixin,
+    FastListMixin,
     ListModelMixin,
     RetrieveModelMixin,
     UpdateModelMixin,
@@ -322,13 +504,60 @@ class NoteViewSet(
     # allow only authenticated users to access the endpoints.
     permission_classes = (IsAuthenticated,)
 
-    # specifies NoteSerializer as the serializer class
+    # specifies NoteSerializer as the serializer class, and the fast serializer that outputs the same list from .values() rows
     serializer_class = NoteSerializer
+    fast_list_serializer = FastListSerializer(NoteSerializer)
+
+    # fields of the filter[search] full-text search, see core.filters.FullTextSearchFilter
+    search_fields = ['title', 'description']
+    # filter[...] filters of the list, see core.filters.NoteFilterSet
+    filterset_class = NoteFilterSet
 
     # The get_queryset() method is overridden to return all notes for the authenticated user.
+    # select_related('user') joins the owner in the same query, since the serializer outputs the username of every note
     def get_queryset(self):
         user = self.request.user
-        return Note.objects.filter(user=user)
+        return Note.objects.filter(user=user).select_related('user')
+
+    # handles the bulk operations of the notes on /note/bulk/, all the items are validated first and written in a single transaction
+    # POST creates, PATCH updates and DELETE deletes the notes listed in the 'data' list of the request body
+    bulk_handler = BulkHandler(Note, NoteSerializer, create_fields=['title', 'description', 'color'], update_fields=['title', 'description', 'color'])
+
+    @action(detail=False, methods=['post', 'patch', 'delete'], url_path='bulk')
+    def bulk(self, request, *args, **kwargs):
+        try:
+            # parses the data from request body and get the list of items
+            items = self.bulk_handler.get_items(JSONParser().parse(request))
+            if items is None:
+                return Response([{'status': '400', 'detail': 'Expected a list of notes in data', 'source': {'pointer': '/data'}}], status=status.HTTP_400_BAD_REQUEST)
+
+            if request.method == 'POST':
+                notes, errors = self.bulk_handler.create(request.user, items)
+                message, status_code = f'Successfully added {len(items)} notes', status.HTTP_201_CREATED
+            elif request.method == 'PATCH':
+                notes, errors = self.bulk_handler.update(request.user, items)
+                message, status_code = f'Successfully updated {len(items)} notes', status.HTTP_200_OK
+            else:
+                count, errors = self.bulk_handler.delete(request.user, items)
+                if not errors:
+                    return Response({'message': f'Successfully deleted {count} notes'}, status=status.HTTP_200_OK)
+
+            # if any item is invalid nothing is written and the errors of every item are returned with 400 status code
+            if errors:
+                return Response(errors, status=status.HTTP_400_BAD_REQUEST)
+
+            # dict to store the message and serialized data
+            result = {
+                'message': message,
+                'details': NoteSerializer(notes, many=True).data
+            }
+            return Response(result, status=status_code)
+        except JSONDecodeError:
+            # returns a JsonResponse if there is an issue with JSON decoding
+            return JsonResponse({
+                'result': 'error',
+                'message': 'JSON decoding error'
+            }, status=400)
     
     # The create() method is also overridden to handle the creation of new note
     def create(self, request, *args, **kwargs):
@@ -403,8 +632,12 @@ class NoteViewSet(
         try:
             # retrieve the note object to be deleted
             instance = self.get_object()
-            # delete the instance from the database
-            self.perform_destroy(instance)
+            # delete the instance from the database and remove it from the counters of its user in the same transaction
+            with transaction.atomic():
+                deleted = delete_counted(instance)
+            if not deleted:
+                # a concurrent request already deleted it
+                raise Http404
 
             # dict to store the message
             result = {
@@ -421,20 +654,135 @@ class NoteViewSet(
             }, status=400)
         
 
+# serializes the rows of a sync response, the id is added since TaskSerializer and NoteSerializer do not include it
+def serialize_with_ids(serializer_class, queryset):
+    rows = list(queryset)
+    return [dict(data, id=str(row.pk)) for row, data in zip(rows, serializer_class(rows, many=True).data)]
+
+
+# function based APIview for the delta sync of tasks and notes
+# returns the tasks and notes created or modified since the 'since' watermark, and the ids of the deleted ones
+# allow only authenticated users to access the endpoint
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def sync(request):
+    now = timezone.now()
+    since = request.query_params.get('since')
+    retention = timedelta(days=settings.SYNC_TOMBSTONE_RETENTION_DAYS)
+
+    if since is not None:
+        try:
+            since = parse_datetime(since)
+        except ValueError:
+            since = None
+        if since is None:
+            # returns an error if the watermark is not a valid ISO 8601 date time with 400 status code
+            return Response({'error': 'since should be an ISO 8601 date time'}, status=status.HTTP_400_BAD_REQUEST)
+        if timezone.is_naive(since):
+            since = timezone.make_aware(since)
+
+    # a watermark older than the tombstone retention may have missed deletions, so the client has to start over
+    full = since is None or since < now - retention
+
+    tasks = Task.objects.filter(user=request.user).select_related('user')
+    notes = Note.objects.filter(user=request.user).select_related('user')
+    deleted = {'tasks': [], 'notes': []}
+    if not full:
+        # the (user, modified) and (user, deleted) indexes keep these queries proportional to the number of changes
+        tasks = tasks.filter(modified__gte=since)
+        notes = notes.filter(modified__gte=since)
+        for resource, object_id in Tombstone.objects.filter(user=request.user, deleted__gte=since).values_list('resource', 'object_id'):
+            deleted[f'{resource}s'].append(str(object_id))
+
+    # dict to store the changes and the watermark of the next sync
+    result = {
+        'full': full,
+        'tasks': serialize_with_ids(TaskSerializer, tasks),
+        'notes': serialize_with_ids(NoteSerializer, notes),
+        'deleted': deleted,
+        # the watermark is moved back a few seconds so that the writes still in flight are returned by the next sync,
+        # the clients receive these rows twice and apply them idempotently
+        'watermark': (now - timedelta(seconds=settings.SYNC_WATERMARK_LAG_SECONDS)).isoformat().replace('+00:00', 'Z'),
+    }
+
+    # return the 'result' dict with 200 status code
+    return Response(result, status=status.HTTP_200_OK)
+
+
+# function based APIview for the dashboard statistics of the authenticated user
+# the tasks and notes are aggregated with one grouped query each, without loading them
+# allow only authenticated users to access the endpoint
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def stats(request):
+    # return the statistics with 200 status code
+    return Response(get_user_stats(request.user), status=status.HTTP_200_OK)
+
+
+# function based APIview for the number of tasks, active tasks, pending tasks and notes of the authenticated user
+# the counters are kept up to date by every write, so they are read with a single primary key lookup instead of counting the rows
+# allow only authenticated users to access the endpoint
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def counters(request):
+    # return the counters with 200 status code
+    return Response(get_counters(request.user), status=status.HTTP_200_OK)
+
+
+# function based APIview for the dashboard statistics of all users
+# with STATS_USE_SUMMARY (or ?source=summary) the statistics are read from the summary tables rebuilt by the refresh_stats command,
+# so the response time does not depend on the number of tasks and notes
+# allow only authenticated users to access the endpoint
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+@throttle_classes(ADMIN_THROTTLES)
+def get_all_stats(request):
+    # checks if the authenticated user is a superuser
+    if not request.user.is_superuser:
+        # if not a superuser, provide an error with 403 status code
+        return Response({'forbidden': 'You are not allowed to access this endpoint'}, status=status.HTTP_403_FORBIDDEN)
+
+    source = request.query_params.get('source', 'summary' if settings.STATS_USE_SUMMARY else 'live')
+    if source not in ('summary', 'live'):
+        # returns an error if the source is not valid with 400 status code
+        return Response({'error': 'source should be summary or live'}, status=status.HTTP_400_BAD_REQUEST)
+
+    # return the statistics with 200 status code
+    return Response(get_global_stats(use_summary=source == 'summary'), status=status.HTTP_200_OK)
+
+
+# function based APIview for the request metrics of this process in the Prometheus text format, e.g. for a Prometheus scrape
+# job with an 'authorization' of type Token. Every worker process has its own metrics.
+# allow only authenticated users to access the endpoint
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def metrics(request):
+    # checks if the authenticated user is a superuser
+    if not request.user.is_superuser:
+        # if not a superuser, provide an error with 403 status code
+        return Response({'forbidden': 'You are not allowed to access this endpoint'}, status=status.HTTP_403_FORBIDDEN)
+
+    # return the metrics as plain text with 200 status code
+    return HttpResponse(registry.render_prometheus(), content_type='text/plain; version=0.0.4; charset=utf-8')
+
+
 # function based APIview for getting all task of all users
 # allow only authenticated users to access the endpoint
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
+@throttle_classes(ADMIN_THROTTLES)
 def get_all_tasks(request):
     if request.method == 'GET':
         # checks if the authenticated user is a superuser
         if request.user.is_superuser:
-            # get all task
-            all_tasks = Task.objects.all()
+            # paginate on (created, id) so that only a single page is loaded in memory
+            paginator = KeysetPagination(ordering=('created', 'id'))
+            # get the requested page of tasks
+            all_tasks = paginator.paginate_queryset(Task.objects.select_related('user'), request)
             # serialize it
             serializer = TaskSerializer(all_tasks, many=True)
-            # return the serialized data with 200 status code
-            return Response(serializer.data, status=status.HTTP_200_OK)
+            # return the serialized page with the links to the next page
+            return paginator.get_paginated_response(serializer.data)
         else:
             # if not a superuser, provide an error with 403 status code
             return Response({'forbidden': 'You are not allowed to access this endpoint'}, status=status.HTTP_403_FORBIDDEN)
@@ -447,16 +795,19 @@ def get_all_tasks(request):
 # allow only authenticated users to access the endpoint
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
+@throttle_classes(ADMIN_THROTTLES)
 def get_all_notes(request):
     if request.method == 'GET':
         # checks if the authenticated user is a superuser
         if request.user.is_superuser:
-            # get all note
-            all_notes = Note.objects.all()
+            # paginate on (created, id) so that only a single page is loaded in memory
+            paginator = KeysetPagination(ordering=('created', 'id'))
+            # get the requested page of notes
+            all_notes = paginator.paginate_queryset(Note.objects.select_related('user'), request)
             # serialize it
             serializer = NoteSerializer(all_notes, many=True)
-            # return the serialized data with 200 status code
-            return Response(serializer.data, status=status.HTTP_200_OK)
+            # return the serialized page with the links to the next page
+            return paginator.get_paginated_response(serializer.data)
         else:
             # if not a superuser, provide an error with 403 status code
             return Response({'forbidden': 'You are not allowed to access this endpoint'}, status=status.HTTP_403_FORBIDDEN)
@@ -469,16 +820,19 @@ def get_all_notes(request):
 # allow only authenticated users to access the endpoint
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
+@throttle_classes(ADMIN_THROTTLES)
 def get_all_users(request):
     if request.method == 'GET':
         # checks if the authenticated user is a superuser
         if request.user.is_superuser:
-            # get all note
-            all_user = User.objects.all()
+            # paginate on the auto increment id, it follows the creation order and is already indexed
+            paginator = KeysetPagination(ordering=('id',))
+            # get the requested page of users
+            all_user = paginator.paginate_queryset(User.objects.all(), request)
             # serialize it
             serializer = UserSerializer(all_user, many=True)
-            # return the serialized data with 200 status code
-            return Response(serializer.data, status=status.HTTP_200_OK)
+            # return the serialized page with the links to the next page
+            return paginator.get_paginated_response(serializer.data)
         else:
             # if not a superuser, provide an error with 403 status code
             return Response({'forbidden': 'You are not allowed to access this endpoint'}, status=status.HTTP_403_FORBIDDEN)
@@ -487,6 +841,70 @@ def get_all_users(request):
         return Response({'error', 'Incorrect HTTP method'}, status=status.HTTP_405_METHOD_NOT_ALLOWED)
 
 
+# function based APIview for exporting all tasks, notes or users as a stream
+# the rows are read and serialized in chunks of EXPORT_CHUNK_SIZE, so the memory used does not depend on the size of the table
+# allow only authenticated users to access the endpoint
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+@throttle_classes(ADMIN_THROTTLES)
+def export(request, resource):
+    # checks if the authenticated user is a superuser
+    if not request.user.is_superuser:
+        # if not a superuser, provide an error with 403 status code
+        return Response({'forbidden': 'You are not allowed to access this endpoint'}, status=status.HTTP_403_FORBIDDEN)
+
+    # 'format' is already used by rest_framework to select the renderer, so the export format is read from 'output'
+    output = request.query_params.get('output', 'json')
+    if resource not in EXPORTS:
+        # returns an error if the resource cannot be exported with 404 status code
+        return Response({'error': f'Cannot export {resource}, use one of: {", ".join(EXPORTS)}'}, status=status.HTTP_404_NOT_FOUND)
+
+    if output == 'csv':
+        # the CSV export holds the database columns of the rows, it is only available for tasks and notes
+        if resource not in MODELS:
+            return Response({'error': f'Only {" and ".join(MODELS)} can be exported as csv'}, status=status.HTTP_400_BAD_REQUEST)
+        stream = stream_csv(MODELS[resource], settings.EXPORT_CHUNK_SIZE)
+        content_type = 'text/csv'
+    elif output in STREAMS:
+        get_queryset, serializer_class = EXPORTS[resource]
+        stream = STREAMS[output](get_queryset(), serializer_class, settings.EXPORT_CHUNK_SIZE)
+        content_type = CONTENT_TYPES[output]
+    else:
+        # returns an error if the format is not supported with 400 status code
+        return Response({'error': f'output should be one of: {", ".join(list(STREAMS) + ["csv"])}'}, status=status.HTTP_400_BAD_REQUEST)
+
+    response = StreamingHttpResponse(stream, content_type=content_type)
+    response['Content-Disposition'] = f'attachment; filename="{resource}.{output}"'
+    return response
+
+
+# function based APIview for importing tasks or notes from a CSV file in the request body, in the format of /export/<resource>?output=csv
+# the rows are read from the request stream and inserted in batches of IMPORT_BATCH_SIZE rows, either all of them or none
+# allow only authenticated users to access the endpoint
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+@throttle_classes(ADMIN_THROTTLES)
+def import_rows(request, resource):
+    # checks if the authenticated user is a superuser
+    if not request.user.is_superuser:
+        # if not a superuser, provide an error with 403 status code
+        return Response({'forbidden': 'You are not allowed to access this endpoint'}, status=status.HTTP_403_FORBIDDEN)
+    if resource not in MODELS:
+        # returns an error if the resource cannot be imported with 404 status code
+        return Response({'error': f'Cannot import {resource}, use one of: {", ".join(MODELS)}'}, status=status.HTTP_404_NOT_FOUND)
+
+    try:
+        # decode the request body line by line instead of loading it in memory
+        lines = codecs.iterdecode(request.stream or [], 'utf-8')
+        count = import_csv(MODELS[resource], lines, settings.IMPORT_BATCH_SIZE)
+    except (CSVImportError, UnicodeDecodeError, csv.Error) as exc:
+        # returns the first invalid row with 400 status code
+        return Response({'error': str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+
+    # return the number of imported rows with 201 status code
+    return Response({'message': f'Successfully imported {count} {resource}', 'count': count}, status=status.HTTP_201_CREATED)
+
+
 # function based APIview for setting user as admin
 # allow only authenticated users to access the endpoint
 @api_view(['PATCH'])
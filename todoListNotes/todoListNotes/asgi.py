@@ -3,14 +3,23 @@ ASGI config for todoListNotes project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
 
+It uses the settings_asgi settings, which route the hot endpoints to the native async views (core/async_views.py).
+The WSGI deployment (wsgi.py) keeps using the sync views. The handler reads the streaming responses (the exports) in a
+thread instead of the event loop (see core/handlers.py).
+
 For more information on this file, see
 https://docs.djangoproject.com/en/4.1/howto/deployment/asgi/
 """
 
 import os
 
-from django.core.asgi import get_asgi_application
+import django
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'todoListNotes.settings_asgi')
+
+# the same setup as django.core.asgi.get_asgi_application(), with the handler of the project
+django.setup(set_prefix=False)
 
-os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'todoListNotes.settings')
+from core.handlers import StreamingASGIHandler
 
-application = get_asgi_application()
+application = StreamingASGIHandler()
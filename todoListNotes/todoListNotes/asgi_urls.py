@@ -0,0 +1,26 @@
+"""todoListNotes URL Configuration for ASGI
+
+Routes the hot endpoints to the native async views of core.async_views and everything else to the same URLs as the
+sync deployment (todoListNotes.urls). The paths are the same as the ones generated by the router, so the clients do not
+need to know which deployment they are talking to.
+"""
+# import default dependencies
+from django.urls        import include, path
+
+# import the async views
+from core               import async_views
+
+# the async routes come first so that they take precedence over the sync routes with the same path, they have the same names
+# as the sync routes so that reverse() and the request metrics see a single endpoint
+urlpatterns = [
+    path('users/login', async_views.login, name='login'),
+    path('task/', async_views.task_list, name='task-list'),
+    # only ids are matched, so that /task/bulk/ and the other extra actions still reach the viewset
+    path('task/<uuid:pk>/', async_views.task_detail, name='task-detail'),
+    path('note/', async_views.note_list, name='note-list'),
+    path('note/<uuid:pk>/', async_views.note_detail, name='note-detail'),
+    path('all_tasks', async_views.all_tasks, name='all_task'),
+    path('all_notes', async_views.all_notes, name='all_notes'),
+    path('all_users', async_views.all_users, name='all_users'),
+    path('', include('todoListNotes.urls'))
+]
@@ -53,6 +53,12 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    # measures the requests first so that the latency includes the other middlewares
+    'core.middleware.MetricsMiddleware',
+    # logs the repeated, slow and large queries of a sample of the requests
+    'core.middleware.QueryDetectorMiddleware',
+    # sheds the expensive endpoints with 503 when too many of their requests are running
+    'core.middleware.ConcurrencyLimitMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'whitenoise.middleware.WhiteNoiseMiddleware',
     'corsheaders.middleware.CorsMiddleware',
@@ -98,9 +104,25 @@ WSGI_APPLICATION = 'todoListNotes.wsgi.application'
 #     }
 # }
 
+# DB_CONN_MAX_AGE keeps the connection of a worker open between requests for that many seconds (0 closes it after every
+# request), DB_CONN_HEALTH_CHECKS checks a reused connection before a request uses it so that a dropped connection is replaced.
+# Under ASGI every request runs in its own thread, so settings_asgi.py sets CONN_MAX_AGE to 0 (ASGI_DB_CONN_MAX_AGE), use an
+# external pooler such as pgbouncer in transaction mode there, with DB_DISABLE_SERVER_SIDE_CURSORS=True.
 DATABASES = {
-    'default': dj_database_url.parse(os.environ.get("DATABASE_URL"))
+    'default': dj_database_url.parse(
+        os.environ.get("DATABASE_URL"),
+        conn_max_age=int(os.environ.get("DB_CONN_MAX_AGE", 600)),
+        conn_health_checks=os.environ.get("DB_CONN_HEALTH_CHECKS", "True") == "True",
+    )
 }
+DATABASES['default']['DISABLE_SERVER_SIDE_CURSORS'] = os.environ.get("DB_DISABLE_SERVER_SIDE_CURSORS", "False") == "True"
+
+
+# Primary keys
+# 'uuid7' generates time ordered UUIDs so that new rows are appended to the end of the primary key index,
+# 'uuid4' restores the previous random UUIDs. Both are stored in the same uuid column.
+
+MODEL_ID_VERSION = os.environ.get("MODEL_ID_VERSION", "uuid7")
 
 
 # Password validation
@@ -157,22 +179,170 @@ REST_FRAMEWORK = {
         'rest_framework_json_api.parsers.JSONParser',
     ),
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework.authentication.TokenAuthentication'
+        'core.authentication.CachedTokenAuthentication'
     ],
     'DEFAULT_RENDERER_CLASSES': (
-        'rest_framework_json_api.renderers.JSONRenderer',
+        'core.renderers.JSONRenderer',
         'rest_framework.renderers.BrowsableAPIRenderer'
     ),
+    'DEFAULT_THROTTLE_CLASSES': [
+        'core.throttling.UserRateThrottle'
+    ],
+    # the number of trusted proxies in front of the app (e.g. 1 behind the load balancer of the host). The client address of the
+    # rate limits is read from X-Forwarded-For only with trusted proxies, with 0 it is REMOTE_ADDR, since the client can send
+    # any X-Forwarded-For header
+    'NUM_PROXIES': int(os.environ.get("NUM_PROXIES", 0)),
     'DEFAULT_METADATA_CLASS': 'rest_framework_json_api.metadata.JSONAPIMetadata',
     'DEFAULT_FILTER_BACKENDS': (
         'rest_framework_json_api.filters.QueryParameterValidationFilter',
         'rest_framework_json_api.filters.OrderingFilter',
         'rest_framework_json_api.django_filters.DjangoFilterBackend',
-        'rest_framework.filters.SearchFilter',
+        'core.filters.FullTextSearchFilter',
     ),
     'SEARCH_PARAM': 'filter[search]',
     'TEST_REQUEST_RENDERER_CLASSES': (
         'rest_framework_json_api.renderers.JSONRenderer',
     ),
     'TEST_REQUEST_DEFAULT_FORMAT': 'vnd.api+json'
-}
\ No newline at end of file
+}
+
+
+# Cache
+# local memory by default (and in the tests), set CACHE_BACKEND and CACHE_LOCATION to share the cache between processes,
+# e.g. CACHE_BACKEND=django.core.cache.backends.redis.RedisCache and CACHE_LOCATION=redis://127.0.0.1:6379
+
+CACHES = {
+    'default': {
+        'BACKEND': os.environ.get("CACHE_BACKEND", 'django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': os.environ.get("CACHE_LOCATION", ''),
+    }
+}
+
+# Task and note list response cache
+# the rendered list responses are cached per user for RESPONSE_CACHE_TIMEOUT seconds in the RESPONSE_CACHE_ALIAS cache and
+# invalidated on every write of the user. A write only invalidates the lists in the cache of the process that handled it, so
+# the response cache is off by default with a local memory cache, where the other worker processes would keep serving the
+# stale lists. It is on by default with a shared CACHE_BACKEND (e.g. Redis).
+
+LOCAL_CACHE_BACKENDS = ['django.core.cache.backends.locmem.LocMemCache', 'django.core.cache.backends.dummy.DummyCache']
+
+RESPONSE_CACHE = {
+    'ENABLED': os.environ.get("RESPONSE_CACHE_ENABLED", str(CACHES['default']['BACKEND'] not in LOCAL_CACHE_BACKENDS)) == "True",
+    'CACHE_ALIAS': os.environ.get("RESPONSE_CACHE_ALIAS", 'default'),
+    'TIMEOUT': int(os.environ.get("RESPONSE_CACHE_TIMEOUT", 300)),
+}
+
+
+# Token authentication cache
+# validated tokens are kept in an in-process LRU of TOKEN_AUTH_CACHE_MAX_SIZE entries for TOKEN_AUTH_CACHE_LOCAL_TTL seconds,
+# so a token deleted or a user deactivated or demoted by another process stops working everywhere that fast. Set
+# TOKEN_AUTH_CACHE_ALIAS to the alias of an entry of CACHES to share the validated tokens between processes for
+# TOKEN_AUTH_CACHE_TTL seconds, the in-process misses are then served by the shared cache instead of the database.
+
+TOKEN_AUTH_CACHE = {
+    'MAX_SIZE': int(os.environ.get("TOKEN_AUTH_CACHE_MAX_SIZE", 10000)),
+    'TTL': int(os.environ.get("TOKEN_AUTH_CACHE_TTL", 300)),
+    'CACHE_ALIAS': os.environ.get("TOKEN_AUTH_CACHE_ALIAS"),
+    'LOCAL_TTL': int(os.environ.get("TOKEN_AUTH_CACHE_LOCAL_TTL", 5)),
+}
+
+
+# Pagination of the admin endpoints
+# PAGINATION_PAGE_SIZE is used when the client does not send page[size], PAGINATION_MAX_PAGE_SIZE caps what the client can ask for
+
+PAGINATION_PAGE_SIZE = int(os.environ.get("PAGINATION_PAGE_SIZE", 100))
+PAGINATION_MAX_PAGE_SIZE = int(os.environ.get("PAGINATION_MAX_PAGE_SIZE", 1000))
+
+# the exports of the admin endpoints are read, serialized and sent EXPORT_CHUNK_SIZE rows at a time
+EXPORT_CHUNK_SIZE = int(os.environ.get("EXPORT_CHUNK_SIZE", 2000))
+# the CSV imports insert IMPORT_BATCH_SIZE rows per statement
+IMPORT_BATCH_SIZE = int(os.environ.get("IMPORT_BATCH_SIZE", 5000))
+
+
+
+# Dashboard statistics
+# with STATS_USE_SUMMARY the admin statistics are read from the summary tables, refresh them periodically with
+# python manage.py refresh_stats
+
+STATS_USE_SUMMARY = os.environ.get("STATS_USE_SUMMARY", "False") == "True"
+
+
+
+# Delta sync
+# tombstones of deleted tasks and notes are kept SYNC_TOMBSTONE_RETENTION_DAYS days (see the prune_tombstones command),
+# a client with an older watermark gets a full sync. SYNC_WATERMARK_LAG_SECONDS covers the transactions still in flight.
+
+SYNC_TOMBSTONE_RETENTION_DAYS = int(os.environ.get("SYNC_TOMBSTONE_RETENTION_DAYS", 30))
+SYNC_WATERMARK_LAG_SECONDS = int(os.environ.get("SYNC_WATERMARK_LAG_SECONDS", 5))
+
+
+
+# Request metrics
+# METRICS_SAMPLE_RATE of the requests are measured (latency, SQL queries, serializer and renderer time, response size) per
+# endpoint and exposed by the /metrics endpoint, with METRICS_LOG a line per measured request is logged on core.metrics.
+# The measures cost every sampled request, so they are off until a deployment sets a rate (e.g. 0.01 for 1% of the requests)
+
+METRICS = {
+    'ENABLED': os.environ.get("METRICS_ENABLED", "True") == "True",
+    'SAMPLE_RATE': float(os.environ.get("METRICS_SAMPLE_RATE", 0.0)),
+    'LOG': os.environ.get("METRICS_LOG", "False") == "True",
+}
+
+
+
+# Query detector
+# QUERY_DETECTOR_SAMPLE_RATE of the requests are checked for a query shape repeated QUERY_DETECTOR_REPEATED_QUERIES times
+# (N+1 queries), queries slower than QUERY_DETECTOR_SLOW_QUERY_MS and queries returning more than QUERY_DETECTOR_MAX_ROWS
+# rows, the problems are logged on core.queries with the endpoint and the call site
+
+QUERY_DETECTOR = {
+    'SAMPLE_RATE': float(os.environ.get("QUERY_DETECTOR_SAMPLE_RATE", 0.0)),
+    'REPEATED_QUERIES': int(os.environ.get("QUERY_DETECTOR_REPEATED_QUERIES", 5)),
+    'SLOW_QUERY_MS': float(os.environ.get("QUERY_DETECTOR_SLOW_QUERY_MS", 100)),
+    'MAX_ROWS': int(os.environ.get("QUERY_DETECTOR_MAX_ROWS", 1000)),
+}
+
+
+
+# Rate limits and concurrency limits
+# the rate limits are token buckets per user (user, admin) or per client address (login, register): a client can send `burst`
+# requests at once, then `rate` requests. RATE_LIMITS_STORE keeps the buckets in the process (core.throttling.LocalBucketStore)
+# or in the RATE_LIMITS_CACHE_ALIAS cache shared by the workers (core.throttling.CacheBucketStore).
+# Each process runs at most CONCURRENCY_LIMIT_* requests of an endpoint class at once, the others get 503 right away.
+
+RATE_LIMITS = {
+    'ENABLED': os.environ.get("RATE_LIMITS_ENABLED", "True") == "True",
+    'STORE': os.environ.get("RATE_LIMITS_STORE", 'core.throttling.LocalBucketStore'),
+    'CACHE_ALIAS': os.environ.get("RATE_LIMITS_CACHE_ALIAS", 'default'),
+    'SCOPES': {
+        'user': {'rate': os.environ.get("RATE_LIMIT_USER", '1200/min'), 'burst': 200},
+        'admin': {'rate': os.environ.get("RATE_LIMIT_ADMIN", '30/min'), 'burst': 10},
+        'login': {'rate': os.environ.get("RATE_LIMIT_LOGIN", '10/min'), 'burst': 10},
+        'register': {'rate': os.environ.get("RATE_LIMIT_REGISTER", '10/hour'), 'burst': 5},
+    },
+}
+
+CONCURRENCY_LIMITS = {
+    # the password hashing of login and register
+    'password': {
+        'endpoints': ['login', 'register'],
+        'limit': int(os.environ.get("CONCURRENCY_LIMIT_PASSWORD", 4 * (os.cpu_count() or 1))),
+    },
+    # the admin endpoints that read or write all the rows
+    'admin': {
+        'endpoints': ['all_task', 'all_notes', 'all_users', 'all_stats', 'export', 'import'],
+        'limit': int(os.environ.get("CONCURRENCY_LIMIT_ADMIN", 2)),
+    },
+}
+
+
+# Password hashing
+# the passwords of the login and register endpoints are hashed on a pool of PASSWORD_HASHING_WORKERS processes (0 hashes in
+# the request thread), at most PASSWORD_HASHING_MAX_PENDING passwords are hashed or waiting, the next ones get 503 right away.
+# The pool is per web worker process: the default of one spawned process per core gives N x cores extra processes with N
+# gunicorn/uvicorn workers, set PASSWORD_HASHING_WORKERS to about cores / N there.
+
+PASSWORD_HASHING = {
+    'WORKERS': int(os.environ.get("PASSWORD_HASHING_WORKERS", os.cpu_count() or 1)),
+    'MAX_PENDING': int(os.environ.get("PASSWORD_HASHING_MAX_PENDING", 4 * (os.cpu_count() or 1))),
+}
@@ -0,0 +1,16 @@
+# settings of the ASGI deployment, see todoListNotes/asgi.py
+from .settings import *
+
+import os
+
+# route the hot endpoints to the async views
+ROOT_URLCONF = 'todoListNotes.asgi_urls'
+
+# WhiteNoiseMiddleware is sync only, a single sync middleware makes Django run every async view through async_to_sync in a
+# thread, so it is removed here and the static files are served by the proxy in front of the ASGI server from STATIC_ROOT
+MIDDLEWARE = [middleware for middleware in MIDDLEWARE if middleware != 'whitenoise.middleware.WhiteNoiseMiddleware']
+
+# every request runs its sync code in a thread of sync_to_async, a persistent connection would be left open per thread, so the
+# connections are closed after every request. ASGI_DB_CONN_MAX_AGE is only meant for a pooler that accepts it (e.g. pgbouncer).
+# The dicts are copied, the ones of settings.py are shared through the star import.
+DATABASES = dict(DATABASES, default=dict(DATABASES['default'], CONN_MAX_AGE=int(os.environ.get("ASGI_DB_CONN_MAX_AGE", 0))))
@@ -0,0 +1,51 @@
+import os
+import threading
+import time
+import uuid
+
+from django.conf import settings
+
+
+_lock = threading.Lock()
+_last_timestamp = 0
+_counter = 0
+
+
+def uuid7():
+    """
+    Time ordered UUID following the UUIDv7 layout: a 48 bit unix timestamp in milliseconds, the version,
+    a 12 bit counter that keeps ids created in the same millisecond ordered, the variant and 62 random bits.
+    Consecutive ids land next to each other in a B-tree index instead of on a random page.
+    """
+    global _last_timestamp, _counter
+
+    with _lock:
+        timestamp = time.time_ns() // 1_000_000
+        if timestamp > _last_timestamp:
+            # start the counter at a random value in the lower half so that it rarely overflows
+            _counter = int.from_bytes(os.urandom(2), 'big') & 0x7FF
+            _last_timestamp = timestamp
+        else:
+            # same millisecond (or the clock went back): keep the ids increasing
+            _counter += 1
+            if _counter > 0xFFF:
+                _counter = 0
+                _last_timestamp += 1
+            timestamp = _last_timestamp
+        counter = _counter
+
+    random_bits = int.from_bytes(os.urandom(8), 'big') & ((1 << 62) - 1)
+
+    value = timestamp << 80
+    value |= 0x7 << 76
+    value |= counter << 64
+    value |= 0b10 << 62
+    value |= random_bits
+    return uuid.UUID(int=value)
+
+
+def generate_id():
+    """Primary key default of utils.model_abstracts.Model, set MODEL_ID_VERSION to 'uuid4' for random ids."""
+    if getattr(settings, 'MODEL_ID_VERSION', 'uuid7') == 'uuid4':
+        return uuid.uuid4()
+    return uuid7()
@@ -1,9 +1,11 @@
-import uuid
 from django.db import models
 
+from utils.ids import generate_id
+
 class Model(models.Model):
 
-    id = models.UUIDField(primary_key=True, default=uuid.uuid4)
+    # time ordered UUIDs by default, see utils.ids.generate_id
+    id = models.UUIDField(primary_key=True, default=generate_id)
 
     class Meta:
-        abstract = True
\ No newline at end of file
+        abstract = True